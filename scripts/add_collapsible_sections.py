@@ -5,14 +5,50 @@ import bisect
 import sys
 import argparse
 import difflib
+import json
+import time
+import cProfile
+import pstats
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import zip_longest
 from html import unescape
 
+import build_manifest as bm
+import section_index as sidx
+from section_index import H2_PATTERN
+
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONTENT_DIR = os.path.join(ROOT, 'Content')
 
-H2_PATTERN = re.compile(r"<h2(\s+[^>]*)?>(.*?)</h2>", re.IGNORECASE | re.DOTALL)
+# Name under which results are stored in the shared build manifest
+MANIFEST_KEY = 'add_collapsible_sections'
+
 BODY_PATTERN = re.compile(r"(<body[^>]*>)(.*?)(</body>)", re.IGNORECASE | re.DOTALL)
 
+# Iterations of loops whose trip count is not visible from the section index, read by --profile
+LOOP_COUNTS = {'cleanup_nested_dupes': 0}
+
+# Passes describe their changes as (start, end, replacement) edits against the text they
+# were given (start == end inserts); apply_edits builds the result in one pass, so no pass
+# copies the body once per change.
+def apply_edits(text: str, edits: list[tuple[int, int, str]], start: int = 0, end: int | None = None) -> str:
+    """
+    text[start:end] with the edits applied. Edits must lie within that range and not overlap;
+    insertions at the same offset keep their order and come before a replacement starting there.
+    """
+    end = len(text) if end is None else end
+    out = []
+    pos = start
+    for s, e, repl in sorted(edits, key=lambda ed: (ed[0], ed[1])):
+        if s < pos or e > end:
+            raise ValueError(f"overlapping or out-of-range edit ({s}, {e})")
+        out.append(text[pos:s])
+        out.append(repl)
+        pos = e
+    out.append(text[pos:end])
+    return ''.join(out)
+
 def slugify(text: str) -> str:
     # Roughly match scripts/loadContent.js slugify
     import unicodedata
@@ -39,231 +75,222 @@ def normalize_title(title: str) -> str:
     # Keep original title; do not force canonicalization to avoid unintended changes
     return (title or '').strip()
 
-def add_attrs_to_existing_sections(body_html: str) -> str:
+def add_attrs_edits(body_html: str, index: dict | None = None) -> list[tuple[int, int, str]]:
     # Add section-title attribute to existing <section> tags when missing (do not modify ids)
-    # Find opening <section ...> tags
-    out = []
-    i = 0
-    open_tag_pattern = re.compile(r"<\s*section\b([^>]*)>", re.IGNORECASE)
-    close_tag_pattern = re.compile(r"</\s*section\s*>", re.IGNORECASE)
+    if index is None:
+        index = sidx.build_section_index(body_html)
+    edits = []
     heading_pattern = re.compile(r"<\s*h[1-6]\b[^>]*>(.*?)</\s*h[1-6]\s*>", re.IGNORECASE | re.DOTALL)
 
-    pos = 0
-    while True:
-        m = open_tag_pattern.search(body_html, pos)
-        if not m:
-            out.append(body_html[pos:])
-            break
-        # Append content before this tag
-        out.append(body_html[pos:m.start()])
-        attrs = m.group(1) or ''
-        # Detect id for special-casing demo sections
-        id_m = re.search(r"\bid=\"([^\"]+)\"", attrs, re.IGNORECASE)
-        section_id = (id_m.group(1) if id_m else '').lower()
+    for sec in index['opens']:
+        attrs = sec['attrs']
         # If already has section-title or data-section-title, leave as is
         if re.search(r"\b(section-title|data-section-title)\s*=", attrs, re.IGNORECASE):
-            out.append(m.group(0))
-            pos = m.end()
             continue
-        # Find end of this section to limit heading search
-        close_m = close_tag_pattern.search(body_html, m.end())
-        section_end = close_m.start() if close_m else len(body_html)
-        content_after = body_html[m.end():section_end]
         # Special case: demo sections should be titled as Interactive Demo
-        if section_id.startswith('demo'):
+        if sec['id'].lower().startswith('demo'):
             title_text = 'Interactive Demo'
         else:
-            hm = heading_pattern.search(content_after)
+            # Limit the heading search to the end of this section
+            close = sidx.first_close_after(index, sec['open_end'])
+            section_end = close[0] if close else len(body_html)
+            hm = heading_pattern.search(body_html, sec['open_end'], section_end)
             raw_title = extract_title_text(hm.group(1)) if hm else ''
             title_text = normalize_title(raw_title)
         new_attrs = attrs
-        if title_text and not re.search(r"\b(section-title|data-section-title)\s*=", attrs, re.IGNORECASE):
+        if title_text:
             new_attrs += f' section-title="{title_text}"'
         # Reconstruct opening tag
-        out.append(f"<section{new_attrs}>")
-        pos = m.end()
-    return ''.join(out)
+        tag = f"<section{new_attrs}>"
+        if tag != body_html[sec['start']:sec['open_end']]:
+            edits.append((sec['start'], sec['open_end'], tag))
+    return edits
+
+def add_attrs_to_existing_sections(body_html: str, index: dict | None = None) -> str:
+    return apply_edits(body_html, add_attrs_edits(body_html, index))
 
-def wrap_sections_in_body(body_html: str) -> str:
+def wrap_sections_in_body(body_html: str, index: dict | None = None) -> str:
     # Always ensure existing <section> tags have attributes first
-    body_html = add_attrs_to_existing_sections(body_html)
+    new_html = add_attrs_to_existing_sections(body_html, index)
+    if index is None or new_html != body_html:
+        index = sidx.build_section_index(new_html)
+    body_html = new_html
 
-    # Find all h2 occurrences with their positions
-    sections = []
-    for m in H2_PATTERN.finditer(body_html):
-        sections.append((m.start(), m.end(), m.group(0), m.group(2)))
+    # All h2 occurrences with their positions
+    sections = index['h2s']
 
     # If no h2s, no change
     if not sections:
         return body_html
 
-    # Precompute positions of <section and </section> to detect nesting
-    open_positions = [m.start() for m in re.finditer(r"<\s*section\b", body_html, re.IGNORECASE)]
-    close_positions = [m.start() for m in re.finditer(r"</\s*section\s*>", body_html, re.IGNORECASE)]
+    # Positions of <section and </section> detect nesting
+    section_starts = index['section_starts']
 
-    def inside_section(index: int) -> bool:
-        opens_before = bisect.bisect_left(open_positions, index)
-        closes_before = bisect.bisect_left(close_positions, index)
-        return (opens_before - closes_before) > 0
-
-    result = []
-    idx = 0
+    # Each wrapped h2 gets an opening tag before it and a closing tag where its section ends;
+    # h2s inside an existing section and everything between sections stay as they are
+    edits = []
     for i, (start, end, h2_full, h2_inner) in enumerate(sections):
-        # Append any content before the first h2 unchanged
-        if i == 0:
-            result.append(body_html[:start])
-        # If this h2 is inside an existing section, do not wrap; just append content until next h2
-        if inside_section(start):
-            next_start = sections[i+1][0] if i+1 < len(sections) else len(body_html)
-            result.append(body_html[start:next_start])
-            idx = next_start
+        if sidx.inside_section(index, start):
             continue
         # Determine the end of this section (start of next h2 or end of body)
         next_start = sections[i+1][0] if i+1 < len(sections) else len(body_html)
         # Avoid swallowing the start of an existing <section> that appears before the next H2.
         # If we wrap across an existing section-open, we can detach that section's heading/content.
-        next_section_m = re.search(r"<\s*section\b", body_html[start:next_start], re.IGNORECASE)
-        wrap_end = start + next_section_m.start() if next_section_m else next_start
-        pre_segment = body_html[start:wrap_end]
-        post_segment = body_html[wrap_end:next_start]
+        k = bisect.bisect_left(section_starts, start)
+        wrap_end = section_starts[k] if k < len(section_starts) and section_starts[k] < next_start else next_start
 
         title_text = normalize_title(extract_title_text(h2_inner))
         sec_id = slugify(title_text)
 
-        wrapped = f'<section id="{sec_id}" section-title="{title_text}">\n{pre_segment}\n</section>'
-        result.append(wrapped)
-        # Preserve any existing <section> openers (and intermediate content) that occurred before next H2
-        if post_segment:
-            result.append(post_segment)
+        open_tag = f'<section id="{sec_id}" section-title="{title_text}">\n'
 
-        idx = next_start
+        # Stray </section>s can leave an h2 that directly follows its own section's open tag looking unwrapped;
+        # wrapping it again would only be undone by the duplicate cleanup below, one close tag off
+        j = bisect.bisect_right(index['open_ends'], start)
+        if j and body_html[index['opens'][j - 1]['open_end']:start].strip() == '':
+            prev_open = body_html[index['opens'][j - 1]['start']:start]
+            dupe = NESTED_DUPE_PATTERN.match(prev_open + open_tag)
+            if dupe and dupe.end() == len(prev_open) + len(open_tag):
+                continue
 
-    # Append any remaining tail (should be none)
-    if idx < len(body_html):
-        result.append(body_html[idx:])
+        edits.append((start, start, open_tag))
+        edits.append((wrap_end, wrap_end, '\n</section>'))
 
-    final_html = ''.join(result)
+    # Cleanup simple nested duplicate open/close if they arose; removing a close tag can line up another pair
+    final_html = apply_edits(body_html, edits)
+    while True:
+        dupes = nested_dupe_edits(final_html)
+        if not dupes:
+            return final_html
+        final_html = apply_edits(final_html, dupes)
+
+NESTED_DUPE_PATTERN = re.compile(
+    r'(<\s*section\b[^>]*\bid="([^"]+)"[^>]*\bsection-title="([^"]+)"[^>]*>\s*)'  # outer open
+    r'(<\s*section\b[^>]*\bid="\2"[^>]*\bsection-title="\3"[^>]*>\s*)',
+    re.IGNORECASE
+)
+
+SECTION_OPEN_TAG_PATTERN = re.compile(r'<\s*section\b[^>]*>', re.IGNORECASE)
+SECTION_OPEN_AHEAD_PATTERN = re.compile(r'\s*<\s*section\b', re.IGNORECASE)
+
+def _joins_opens(s: str, close_start: int, close_end: int) -> bool:
+    # Whether removing this </section> leaves two section open tags separated only by whitespace
+    i = close_start
+    while i and s[i - 1].isspace():
+        i -= 1
+    lt = s.rfind('<', 0, i)
+    return (lt >= 0 and SECTION_OPEN_TAG_PATTERN.fullmatch(s, lt, i) is not None
+            and SECTION_OPEN_AHEAD_PATTERN.match(s, close_end) is not None)
+
+def nested_dupe_edits(s: str) -> list[tuple[int, int, str]]:
+    """
+    Removals of a <section> opened directly inside one with the same id and section-title,
+    each with the first </section> after it not already removed. Repeats stacked on the
+    same outer section are removed together; the scan then resumes after them. It stops at
+    a match that a removed </section> could change (one it touches, or any after a removal
+    that joins two open tags), so apply the edits and scan again until there are none.
+    """
+    closes = [(m.start(), m.end()) for m in sidx.SECTION_CLOSE_PATTERN.finditer(s)]
+    close_starts = [start for start, _end in closes]
+    removed_closes: set[int] = set()
+    touched: set[int] = set()
+    edits = []
+    limit = len(s) + 1
+
+    def remove_with_close(open_start: int, open_end: int) -> None:
+        nonlocal limit
+        edits.append((open_start, open_end, ''))
+        k = bisect.bisect_left(close_starts, open_end)
+        while k < len(closes) and k in removed_closes:
+            k += 1
+        if k < len(closes):
+            removed_closes.add(k)
+            edits.append((closes[k][0], closes[k][1], ''))
+            touched.add(closes[k][0])
+            if _joins_opens(s, *closes[k]):
+                limit = min(limit, closes[k][0])
+
+    def unaffected(m) -> bool:
+        return m.start() < limit and m.end() not in touched
 
-    # Cleanup simple nested duplicate open/close if they arose
-    def cleanup_nested_dupes(s: str) -> str:
-        dup_open = re.compile(
-            r'(<\s*section\b[^>]*\bid="([^"]+)"[^>]*\bsection-title="([^"]+)"[^>]*>\s*)'  # outer open
-            r'(<\s*section\b[^>]*\bid="\2"[^>]*\bsection-title="\3"[^>]*>\s*)',
-            re.IGNORECASE
-        )
-        close_tag = re.compile(r'</\s*section\s*>', re.IGNORECASE)
-        while True:
-            m = dup_open.search(s)
-            if not m:
-                return s
-            inner_open_start, inner_open_end = m.start(4), m.end(4)
-            cm = close_tag.search(s, inner_open_end)
-            if cm:
-                s = s[:cm.start()] + s[cm.end():]
-            s = s[:inner_open_start] + s[inner_open_end:]
-
-    return cleanup_nested_dupes(final_html)
-
-def wrap_demos_with_section(body_html: str) -> str:
+    pos = 0
+    while True:
+        LOOP_COUNTS['cleanup_nested_dupes'] += 1
+        m = NESTED_DUPE_PATTERN.search(s, pos)
+        if not m or not unaffected(m):
+            return edits
+        remove_with_close(m.start(4), m.end(4))
+        pos = m.end(4)
+        repeat = re.compile(
+            rf'<\s*section\b[^>]*\bid="{re.escape(m.group(2))}"[^>]*\bsection-title="{re.escape(m.group(3))}"[^>]*>\s*',
+            re.IGNORECASE)
+        while (rm := repeat.match(s, pos)) and unaffected(rm):
+            LOOP_COUNTS['cleanup_nested_dupes'] += 1
+            remove_with_close(rm.start(), rm.end())
+            pos = rm.end()
+
+DEMO_SECTION_OPEN = '<section id="demo" section-title="Interactive Demo">\n'
+
+def wrap_demos_edits(body_html: str, index: dict | None = None) -> list[tuple[int, int, str]]:
     # Wrap standalone demo containers/iframes not already in a section
-    open_positions = [m.start() for m in re.finditer(r"<\s*section\b", body_html, re.IGNORECASE)]
-    close_positions = [m.start() for m in re.finditer(r"</\s*section\s*>", body_html, re.IGNORECASE)]
+    if index is None:
+        index = sidx.build_section_index(body_html)
 
-    def inside_section(index: int) -> bool:
-        opens_before = sum(1 for p in open_positions if p <= index)
-        closes_before = sum(1 for p in close_positions if p <= index)
-        return (opens_before - closes_before) > 0
-
-    changed = False
+    def inside_section(pos: int) -> bool:
+        return sidx.inside_section(index, pos, inclusive=True)
 
     # Prefer wrapping the container
-    result = []
+    edits = []
     pos = 0
-    pat_container = re.compile(r"<div\s+class=\"embeddedDemoContainer\"[^>]*>", re.IGNORECASE)
-    while True:
-        m = pat_container.search(body_html, pos)
-        if not m:
-            result.append(body_html[pos:])
-            break
-        start = m.start()
-        if inside_section(start):
-            result.append(body_html[pos:m.end()])
-            pos = m.end()
+    for cont in index['demo_containers']:
+        start = cont['start']
+        if start < pos:
             continue
-        end_m = re.search(r"</\s*div\s*>", body_html[m.end():], re.IGNORECASE)
-        if not end_m:
-            result.append(body_html[pos:m.end()])
-            pos = m.end()
+        if inside_section(start) or cont['end'] is None:
             continue
-        cont_end = m.end() + end_m.end()
-        segment = body_html[start:cont_end]
-        wrapped = f'<section id="demo" section-title="Interactive Demo">\n{segment}\n</section>'
-        result.append(body_html[pos:start])
-        result.append(wrapped)
-        pos = cont_end
-        changed = True
-    new_html = ''.join(result)
-
-    if changed:
-        return new_html
+        edits.append((start, start, DEMO_SECTION_OPEN))
+        edits.append((cont['end'], cont['end'], '\n</section>'))
+        pos = cont['end']
+
+    if edits:
+        return edits
 
     # Fallback: wrap raw iframe.embeddedDemo
-    result = []
-    pos = 0
-    pat_iframe = re.compile(r"<iframe\b[^>]*class=\"embeddedDemo\"[^>]*>.*?</iframe>", re.IGNORECASE | re.DOTALL)
-    while True:
-        m = pat_iframe.search(new_html, pos)
-        if not m:
-            result.append(new_html[pos:])
-            break
-        start = m.start()
+    for start, end in index['demo_iframes']:
         if inside_section(start):
-            result.append(new_html[pos:m.end()])
-            pos = m.end()
             continue
-        wrapped = f'<section id="demo" section-title="Interactive Demo">\n{new_html[m.start():m.end()]}\n</section>'
-        result.append(new_html[pos:start])
-        result.append(wrapped)
-        pos = m.end()
-        changed = True
-    return ''.join(result)
+        edits.append((start, start, DEMO_SECTION_OPEN))
+        edits.append((end, end, '\n</section>'))
+    return edits
+
+def wrap_demos_with_section(body_html: str, index: dict | None = None) -> str:
+    return apply_edits(body_html, wrap_demos_edits(body_html, index))
+
+def _trailing_demo(body_html: str, index: dict, start: int, end: int) -> tuple[int, int] | None:
+    # (start, end) of the demo container, else demo iframe, that body_html[start:end] ends with (up to whitespace)
+    containers = [(c['start'], c['end']) for c in index['demo_containers']]
+    for starts, spans in ((index['demo_container_starts'], containers), (index['demo_iframe_starts'], index['demo_iframes'])):
+        k = bisect.bisect_left(starts, end) - 1
+        if k < 0 or starts[k] < start:
+            continue
+        span_start, span_end = spans[k]
+        if span_end is not None and span_end <= end and body_html[span_end:end].strip() == '':
+            return span_start, span_end
+    return None
 
-def move_trailing_demos_out_of_sections(body_html: str) -> str:
+def move_trailing_demos_edits(body_html: str, index: dict | None = None) -> list[tuple[int, int, str]]:
     # If a demo container/iframe appears as trailing content of a section, move it into its own
     # <section id="demo" section-title="Interactive Demo"> placed immediately after that section.
-    open_pat = re.compile(r"<\s*section\b([^>]*)>", re.IGNORECASE)
-    close_pat = re.compile(r"</\s*section\s*>", re.IGNORECASE)
-    demo_container_pat = re.compile(r"<div\s+class=\"embeddedDemoContainer\"[^>]*>.*?</div>\s*$", re.IGNORECASE | re.DOTALL)
-    demo_iframe_pat = re.compile(r"<iframe\b[^>]*class=\"embeddedDemo\"[^>]*>.*?</iframe>\s*$", re.IGNORECASE | re.DOTALL)
-
-    # Build section ranges with stack
-    tokens = []
-    for m in open_pat.finditer(body_html):
-        tokens.append(('open', m.start(), m.end(), m.group(1) or ''))
-    for m in close_pat.finditer(body_html):
-        tokens.append(('close', m.start(), m.end(), ''))
-    tokens.sort(key=lambda t: t[1])
-
-    stack = []
-    sections = []
-    depth = 0
-    for typ, s, e, attrs in tokens:
-        if typ == 'open':
-            depth += 1
-            stack.append((s, e, attrs, depth))
-        else:
-            if not stack:
-                continue
-            os, oe, oattrs, d = stack.pop()
-            # locate content inside this section from oe to s (start of close tag)
-            sections.append({'start': os, 'open_end': oe, 'content_start': oe, 'content_end': s, 'close_start': s, 'close_end': e, 'attrs': oattrs, 'depth': d})
-            depth -= 1
-
+    if index is None:
+        index = sidx.build_section_index(body_html)
+    sections = index['sections']
     if not sections:
-        return body_html
+        return []
 
-    body = body_html
-    # Process from the end to keep indices valid
+    edits = []
+    # Ids only ever get added (by the demo sections inserted here); collected on the first move
+    used_ids = None
+    # Process from the end, so sections nested in this one have already been handled
     for sec in sorted(sections, key=lambda x: x['start'], reverse=True):
         # Ignore top-level demo sections already
         if re.search(r"section-title\s*=\s*\"Interactive Demo\"", sec['attrs'], re.IGNORECASE):
@@ -271,92 +298,92 @@ def move_trailing_demos_out_of_sections(body_html: str) -> str:
         # Also treat id="demo*" as demo sections
         if re.search(r'\bid\s*=\s*"demo[^"]*"', sec['attrs'], re.IGNORECASE):
             continue
-        content = body[sec['content_start']:sec['close_start']]
-        # Strip trailing whitespace
-        trail = content.rstrip()
-        trailing_part = content[len(trail):]  # spaces removed
-        content = trail
-        # Check if trailing content is exactly a demo container or iframe
-        mcont = demo_container_pat.search(content)
-        mifr = demo_iframe_pat.search(content)
-        hit = mcont or mifr
+        # Offsets come from the index, so they hold for the original text; demos inside nested sections are
+        # followed by that section's </section> and never count as trailing
+        hit = _trailing_demo(body_html, index, sec['open_end'], sec['close_start'])
         if not hit:
             continue
-        demo_html = hit.group(0).strip()
-        # Remove the demo_html from the end of the section's content
-        new_content = content[:hit.start()].rstrip()
-        # Rebuild the section without the trailing demo
-        before = body[:sec['content_start']]
-        after_close = body[sec['close_end']:]
-        section_rebuilt = before + new_content + body[sec['close_start']:sec['close_end']]
+        demo_html = body_html[hit[0]:hit[1]].strip()
+        # Edits already made inside this section are folded into its new content
+        inner = [ed for ed in edits if sec['open_end'] <= ed[0] and ed[1] <= sec['close_start']]
+        if not demo_html or any(ed[1] > hit[0] for ed in inner):
+            continue
+        # The section's content without the trailing demo
+        new_content = apply_edits(body_html, inner, sec['open_end'], hit[0]).rstrip()
 
         # Determine unique demo id
         desired_id = 'demo'
-        used_ids = set(m.group(1) for m in re.finditer(r"\bid=\"([^\"]+)\"", body, re.IGNORECASE))
+        if used_ids is None:
+            used_ids = set(m.group(1) for m in re.finditer(r"\bid=\"([^\"]+)\"", body_html, re.IGNORECASE))
         demo_id = desired_id if desired_id not in used_ids else (desired_id + '-2')
+        used_ids.add(demo_id)
         demo_section = f"\n<section id=\"{demo_id}\" section-title=\"Interactive Demo\">\n{demo_html}\n</section>\n"
-        # Insert demo section after this section
-        body = section_rebuilt + demo_section + after_close
+        # Section without the trailing demo, then the demo section right after it
+        edits = [ed for ed in edits if ed not in inner]
+        edits.append((sec['open_end'], sec['close_start'], new_content))
+        edits.append((sec['close_end'], sec['close_end'], demo_section))
 
-    return body
+    return edits
 
-def cleanup_empty_and_dedupe_demo_sections(body_html: str) -> str:
+def move_trailing_demos_out_of_sections(body_html: str, index: dict | None = None) -> str:
+    return apply_edits(body_html, move_trailing_demos_edits(body_html, index))
+
+def cleanup_empty_and_dedupe_edits(body_html: str, index: dict | None = None) -> list[tuple[int, int, str]]:
     # Remove completely empty sections (only whitespace inside)
-    open_pat = re.compile(r"<\s*section\b([^>]*)>", re.IGNORECASE)
-    close_pat = re.compile(r"</\s*section\s*>", re.IGNORECASE)
-    parts = []
+    if index is None:
+        index = sidx.build_section_index(body_html)
+    edits = []
+    dropped = set()
     pos = 0
-    changed = False
-    while True:
-        m = open_pat.search(body_html, pos)
-        if not m:
-            parts.append(body_html[pos:])
-            break
-        parts.append(body_html[pos:m.start()])
-        attrs = m.group(1) or ''
-        cm = close_pat.search(body_html, m.end())
-        if not cm:
-            # Malformed; append rest and break
-            parts.append(body_html[m.start():])
-            pos = len(body_html)
+    for i, sec in enumerate(index['opens']):
+        if sec['start'] < pos:
+            # Nested inside a section that is kept whole
+            continue
+        close = sidx.first_close_after(index, sec['open_end'])
+        if not close:
+            # Malformed; keep the rest as-is
             break
-        inner = body_html[m.end():cm.start()]
-        if inner.strip() == '':
+        if body_html[sec['open_end']:close[0]].strip() == '':
             # Drop this empty section
-            changed = True
-            pos = cm.end()
-            continue
-        # Keep as-is
-        parts.append(body_html[m.start():cm.end()])
-        pos = cm.end()
-    s = ''.join(parts)
+            dropped.add(i)
+            edits.append((sec['start'], close[1], ''))
+        pos = close[1]
     # If there is a demo-2 but no demo, rename demo-2 to demo
-    if re.search(r"<\s*section\b[^>]*\bid=\"demo-2\"", s, re.IGNORECASE) and not re.search(r"<\s*section\b[^>]*\bid=\"demo\"", s, re.IGNORECASE):
-        s = re.sub(r"(\bid=\")demo-2(\")", r"\1demo\2", s, flags=re.IGNORECASE)
-    return s
-
-def normalize_existing_sections(body_html: str) -> str:
+    kept_attrs = [sec['attrs'] for i, sec in enumerate(index['opens']) if i not in dropped]
+    has_demo_2 = any(re.search(r"\bid=\"demo-2\"", a, re.IGNORECASE) for a in kept_attrs)
+    if has_demo_2 and not any(re.search(r"\bid=\"demo\"", a, re.IGNORECASE) for a in kept_attrs):
+        removed = [(start, end) for start, end, _repl in edits]
+        for m in re.finditer(r"(\bid=\")demo-2(\")", body_html, re.IGNORECASE):
+            k = bisect.bisect_right(removed, (m.start(), len(body_html))) - 1
+            if k < 0 or removed[k][1] <= m.start():
+                edits.append((m.start(), m.end(), f"{m.group(1)}demo{m.group(2)}"))
+    return edits
+
+def cleanup_empty_and_dedupe_demo_sections(body_html: str, index: dict | None = None) -> str:
+    return apply_edits(body_html, cleanup_empty_and_dedupe_edits(body_html, index))
+
+def normalize_existing_edits(body_html: str, index: dict | None = None) -> list[tuple[int, int, str]]:
     # Only ensure a section-title exists if readable; do not change ids or titles
-    out = []
-    pos = 0
-    open_tag_pattern = re.compile(r"<\s*section\b([^>]*)>", re.IGNORECASE)
-    while True:
-        m = open_tag_pattern.search(body_html, pos)
-        if not m:
-            out.append(body_html[pos:])
-            break
-        out.append(body_html[pos:m.start()])
-        attrs = m.group(1) or ''
+    if index is None:
+        index = sidx.build_section_index(body_html)
+    edits = []
+    heading_pattern = re.compile(r"<\s*h[1-6]\b[^>]*>(.*?)</\s*h[1-6]\s*>", re.IGNORECASE | re.DOTALL)
+    for sec in index['opens']:
+        attrs = sec['attrs']
         if not re.search(r"\b(section-title|data-section-title)\s*=", attrs, re.IGNORECASE):
             # Try to pull a heading right after
-            end_tag = m.end()
-            hm = re.search(r"<\s*h[1-6]\b[^>]*>(.*?)</\s*h[1-6]\s*>", body_html[end_tag:end_tag+500], re.IGNORECASE | re.DOTALL)
+            end_tag = sec['open_end']
+            hm = heading_pattern.search(body_html, end_tag, end_tag + 500)
             if hm:
                 label = extract_title_text(hm.group(1))
                 attrs = attrs + f' section-title="{label}"'
-        out.append(f"<section{attrs}>")
-        pos = m.end()
-    return ''.join(out)
+        tag = f"<section{attrs}>"
+        if tag != body_html[sec['start']:sec['open_end']]:
+            edits.append((sec['start'], sec['open_end'], tag))
+    return edits
+
+def normalize_existing_sections(body_html: str, index: dict | None = None) -> str:
+    return apply_edits(body_html, normalize_existing_edits(body_html, index))
 
 def read_text_best_effort(path: str) -> str:
     try:
@@ -372,56 +399,137 @@ def write_text_utf8(path: str, text: str) -> None:
     with open(path, 'w', encoding='utf-8') as f:
         f.write(text)
 
-def flatten_canonical_sections(body_html: str) -> str:
+def flatten_canonical_sections(body_html: str, index: dict | None = None) -> str:
     # Disabled: flattening is risky without a real HTML parser.
     return body_html
 
-def compute_transformed_html(path: str):
+def compute_transformed_html(path: str, profile: list | None = None):
     """Return (new_html or None, original_html). If no body or no change, returns (None, original_html)."""
     html = read_text_best_effort(path)
-
+    return transform_html(html, profile), html
+
+# What each pass loops over, as index keys (its iteration count under --profile)
+PASS_ITERATES = {
+    'normalize_existing_sections': 'opens',
+    'wrap_demos_with_section': 'demo_containers',
+    'move_trailing_demos_out_of_sections': 'sections',
+    'wrap_sections_in_body': 'h2s',
+    'flatten_canonical_sections': None,
+    'cleanup_empty_and_dedupe_demo_sections': 'opens',
+}
+
+def _profiled(transform, body: str, index: dict, profile: list) -> str:
+    # One record per pass: wall time, sizes, loop iterations and whether it edited the body
+    LOOP_COUNTS['cleanup_nested_dupes'] = 0
+    key = PASS_ITERATES.get(transform.__name__)
+    start = time.perf_counter()
+    new_body = transform(body, index)
+    rec = {
+        'stage': transform.__name__,
+        'seconds': time.perf_counter() - start,
+        'in_bytes': len(body),
+        'out_bytes': len(new_body),
+        'iterations': len(index[key]) if key else 0,
+        'changed': new_body != body,
+    }
+    if transform is wrap_sections_in_body:
+        rec['cleanup_nested_dupes'] = LOOP_COUNTS['cleanup_nested_dupes']
+    profile.append(rec)
+    return new_body
+
+def transform_html(html: str, profile: list | None = None) -> str | None:
+    """
+    Return the transformed document, or None if it has no body or nothing changes.
+    With a profile list, a timing record per pass (and per index build) is appended to it.
+    """
     m = BODY_PATTERN.search(html)
     if not m:
-        return None, html
+        return None
     open_body, body_inner, close_body = m.group(1), m.group(2), m.group(3)
     original_body_inner = body_inner
 
-    # Normalize any existing sections' attributes first (non-destructive)
-    body_inner = normalize_existing_sections(body_inner)
-    # Then wrap standalone demos so they get their own section
-    body_inner = wrap_demos_with_section(body_inner)
-    # Then move trailing demos out of non-demo sections into their own section
-    body_inner = move_trailing_demos_out_of_sections(body_inner)
-    # Then normalize H2 sections and existing sections
-    body_inner = wrap_sections_in_body(body_inner)
-    # Finally, (disabled) flattening step
-    new_body_inner = flatten_canonical_sections(body_inner)
-    # Cleanup pass for empty sections and demo dedupe
-    new_body_inner = cleanup_empty_and_dedupe_demo_sections(new_body_inner)
+    def build_index(body: str) -> dict:
+        if profile is None:
+            return sidx.build_section_index(body)
+        start = time.perf_counter()
+        index = sidx.build_section_index(body)
+        profile.append({'stage': 'build_section_index', 'seconds': time.perf_counter() - start,
+                        'in_bytes': len(body), 'out_bytes': len(body), 'iterations': 1, 'changed': False})
+        return index
+
+    # Tokenize once; passes share the index and it is rebuilt only when a pass edits the body
+    index = build_index(body_inner)
+    for transform in (
+        # Normalize any existing sections' attributes first (non-destructive)
+        normalize_existing_sections,
+        # Then wrap standalone demos so they get their own section
+        wrap_demos_with_section,
+        # Then move trailing demos out of non-demo sections into their own section
+        move_trailing_demos_out_of_sections,
+        # Then normalize H2 sections and existing sections
+        wrap_sections_in_body,
+        # Finally, (disabled) flattening step
+        flatten_canonical_sections,
+        # Cleanup pass for empty sections and demo dedupe
+        cleanup_empty_and_dedupe_demo_sections,
+    ):
+        new_body = transform(body_inner, index) if profile is None else _profiled(transform, body_inner, index, profile)
+        if new_body != body_inner:
+            body_inner = new_body
+            index = build_index(body_inner)
+    new_body_inner = body_inner
     # Compare against the original unmodified body content to detect any change
     if new_body_inner == original_body_inner:
-        return None, html
+        return None
 
-    new_html = html[:m.start(2)] + new_body_inner + html[m.end(2):]
-    return new_html, html
+    return html[:m.start(2)] + new_body_inner + html[m.end(2):]
 
-def _strip_visible_text(s: str) -> str:
-    # Drop scripts/styles; remove tags; unescape entities; collapse whitespace
-    s = re.sub(r'<script[\s\S]*?</script>', '', s, flags=re.IGNORECASE)
-    s = re.sub(r'<style[\s\S]*?</style>', '', s, flags=re.IGNORECASE)
-    s = re.sub(r'<[^>]+>', ' ', s)
-    s = unescape(s)
-    s = re.sub(r'\s+', ' ', s).strip()
-    return s
+# Scripts and styles are dropped and every other tag counts as whitespace in the visible text
+VISIBLE_SPLIT_PATTERN = re.compile(r"(<script[\s\S]*?</script>|<style[\s\S]*?</style>)|<[^>]+>", re.IGNORECASE)
 
-def process_file(path: str, *, dry_run: bool = False, output_dir: str | None = None, verify_text: bool = False) -> tuple[bool, str]:
+def iter_visible_runs(html: str):
+    """Yield (text, offset) for each run of text between tags; runs split only by a script/style are joined."""
+    run = ''
+    start = pos = 0
+    for m in VISIBLE_SPLIT_PATTERN.finditer(html):
+        run += html[pos:m.start()]
+        pos = m.end()
+        if m.group(1) is None:
+            yield run, start
+            run = ''
+            start = pos
+    yield run + html[pos:], start
+
+def iter_visible_words(html: str):
+    """Yield (word, offset of its text run) for the document's visible words, entities unescaped."""
+    for text, offset in iter_visible_runs(html):
+        for word in unescape(text).split():
+            yield word, offset
+
+def first_text_difference(old_html: str, new_html: str) -> tuple[int, int, str, str] | None:
+    """
+    None when both documents have the same visible text, else where it first differs:
+    (old offset, new offset, old word, new word), with '' for a missing word.
+    """
+    # Both sides are read a text run at a time, so the scan stops at the first differing word
+    for a, b in zip_longest(iter_visible_words(old_html), iter_visible_words(new_html)):
+        if a is None or b is None or a[0] != b[0]:
+            return (a[1] if a else len(old_html), b[1] if b else len(new_html), a[0] if a else '', b[0] if b else '')
+    return None
+
+def _line_of(text: str, offset: int) -> int:
+    return text.count('\n', 0, offset) + 1
+
+def process_file(path: str, *, dry_run: bool = False, output_dir: str | None = None, verify_text: bool = False,
+                 profile: list | None = None) -> tuple[bool, str]:
     """
     Process a single HTML file.
     - If dry_run: returns (would_change, diff_text)
     - If output_dir is provided: writes changed file to that directory preserving structure
     - Else: writes in place
+    - With a profile list, per-pass timing records are appended to it
     """
-    new_html, old_html = compute_transformed_html(path)
+    new_html, old_html = compute_transformed_html(path, profile)
     if new_html is None:
         return False, ""
     if dry_run:
@@ -435,11 +543,13 @@ def process_file(path: str, *, dry_run: bool = False, output_dir: str | None = N
         )
         return True, "".join(diff)
     if verify_text:
-        old_txt = _strip_visible_text(old_html)
-        new_txt = _strip_visible_text(new_html)
-        if old_txt != new_txt:
+        diff = first_text_difference(old_html, new_html)
+        if diff is not None:
             rel = os.path.relpath(path, ROOT)
-            return True, f"[verify_text FAILED] Visible text changed for {rel}. No write performed."
+            old_at, new_at, old_word, new_word = diff
+            return True, (f"[verify_text FAILED] Visible text changed for {rel} "
+                          f"(line {_line_of(old_html, old_at)}: {old_word!r} -> line {_line_of(new_html, new_at)}: {new_word!r}). "
+                          "No write performed.")
     # Write output
     if output_dir:
         abs_out = os.path.join(output_dir, os.path.relpath(path, ROOT))
@@ -448,6 +558,52 @@ def process_file(path: str, *, dry_run: bool = False, output_dir: str | None = N
         write_text_utf8(path, new_html)
     return True, ""
 
+def profile_file(path: str, **kwargs) -> tuple[bool, str, dict]:
+    """process_file plus a profile record: {'path', 'seconds', 'bytes', 'changed', 'stages': [per-pass records]}."""
+    stages: list = []
+    start = time.perf_counter()
+    would_change, payload = process_file(path, profile=stages, **kwargs)
+    record = {
+        'path': os.path.relpath(path, ROOT).replace(os.sep, '/'),
+        'seconds': time.perf_counter() - start,
+        'bytes': os.path.getsize(path),
+        'changed': would_change,
+        'stages': stages,
+    }
+    return would_change, payload, record
+
+def profile_report(records: list[dict], top: int) -> dict:
+    """Per-stage totals over all files plus the top slowest files."""
+    totals: dict[str, dict] = {}
+    for rec in records:
+        for st in rec['stages']:
+            t = totals.setdefault(st['stage'], {'calls': 0, 'seconds': 0.0, 'changed': 0, 'iterations': 0})
+            t['calls'] += 1
+            t['seconds'] += st['seconds']
+            t['changed'] += st['changed']
+            t['iterations'] += st['iterations'] + st.get('cleanup_nested_dupes', 0)
+    slowest = sorted(records, key=lambda r: r['seconds'], reverse=True)[:top]
+    return {
+        'files': len(records),
+        'seconds': sum(r['seconds'] for r in records),
+        'totals': dict(sorted(totals.items(), key=lambda kv: kv[1]['seconds'], reverse=True)),
+        'slowest': [r['path'] for r in slowest],
+        'records': records,
+    }
+
+def print_profile_summary(report: dict) -> None:
+    print(f"Profiled {report['files']} file(s) in {report['seconds']:.3f}s.")
+    print("Per stage (all files):")
+    for name, t in report['totals'].items():
+        print(f"  {name}: {t['seconds'] * 1000:.1f} ms over {t['calls']} call(s), {t['iterations']} iteration(s), changed {t['changed']}")
+    by_path = {r['path']: r for r in report['records']}
+    print(f"Slowest {len(report['slowest'])} file(s):")
+    for path in report['slowest']:
+        rec = by_path[path]
+        worst = max(rec['stages'], key=lambda st: st['seconds'], default=None)
+        detail = f"; slowest stage {worst['stage']} {worst['seconds'] * 1000:.1f} ms" if worst else ''
+        print(f"  {rec['seconds'] * 1000:8.1f} ms  {path} ({rec['bytes']} bytes{detail})")
+
 def iter_target_files(files: list[str] | None, only_draft: bool) -> list[str]:
     targets: list[str] = []
     if files:
@@ -483,25 +639,76 @@ def iter_target_files(files: list[str] | None, only_draft: bool) -> list[str]:
             uniq.append(t)
     return sorted(uniq)
 
+def map_files(func, paths: list[str], jobs: int = 1):
+    """
+    Yield func(path) for each path, in the order given.
+    - jobs <= 1 runs in this process
+    - otherwise spreads the files across a process pool of that size (func must be picklable)
+    """
+    if jobs <= 1 or len(paths) < 2:
+        yield from map(func, paths)
+        return
+    jobs = min(jobs, len(paths))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(func, paths, chunksize=max(1, len(paths) // (jobs * 4)))
+
+def jobs_arg(value: str) -> int:
+    # argparse type for --jobs: a positive count, or 0 for one worker per CPU
+    n = int(value)
+    if n < 0:
+        raise argparse.ArgumentTypeError('must be >= 0')
+    return n or (os.cpu_count() or 1)
+
 def main(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(description='Add collapsible sections to HTML content with safe review options.')
     parser.add_argument('--dry-run', action='store_true', help='Do not write files; print unified diffs for changes.')
     parser.add_argument('--only-draft', action='store_true', help='Process only files with DRAFT in filename.')
     parser.add_argument('--output-dir', help='Write changed files to this directory instead of in-place.')
-    parser.add_argument('--verify-text', action='store_true', help='Abort write if visible text content would change.')
+    parser.add_argument('--verify-text', action='store_true', default=True, help='Abort a write if visible text content would change (the default).')
+    parser.add_argument('--no-verify-text', dest='verify_text', action='store_false', help='Write without checking that visible text is unchanged.')
+    parser.add_argument('-j', '--jobs', type=jobs_arg, default=1, help='Process files in N worker processes (0 = one per CPU). Output order is unchanged.')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the build manifest and process every file.')
+    parser.add_argument('--profile', metavar='REPORT.json', help='Time every pass for every file (cache ignored) and write a JSON report.')
+    parser.add_argument('--cprofile', action='store_true', help='With --profile, also run under cProfile (single process) and write REPORT.prof.')
+    parser.add_argument('--top', type=int, default=10, help='Slowest files listed in the profile summary (default: 10).')
     parser.add_argument('paths', nargs='*', help='Optional files or directories to process. Defaults to Content/.')
     args = parser.parse_args(argv)
+    if args.cprofile and not args.profile:
+        parser.error('--cprofile requires --profile')
 
     targets = iter_target_files(args.paths, args.only_draft)
     if not targets:
         print('No target files found.')
         return 0
 
+    # Skip files this version of the script already found to need no change
+    manifest = None if args.no_cache else bm.load_manifest()
+    version = bm.script_version(os.path.abspath(__file__), sidx.__file__)
+    pending = targets
+    if manifest is not None and not args.profile:
+        pending = [p for p in targets if bm.lookup(manifest, p, MANIFEST_KEY, version) != (True, 'unchanged')]
+
     changed = 0
-    scanned = 0
-    for path in targets:
-        scanned += 1
-        would_change, payload = process_file(path, dry_run=args.dry_run, output_dir=args.output_dir, verify_text=args.verify_text)
+    options = dict(dry_run=args.dry_run, output_dir=args.output_dir, verify_text=args.verify_text)
+    records: list[dict] = []
+    profiler = None
+    if args.profile:
+        if args.cprofile:
+            # cProfile only sees this process
+            args.jobs = 1
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        def collect(profiled):
+            for would_change, payload, record in profiled:
+                records.append(record)
+                yield would_change, payload
+        results = collect(map_files(partial(profile_file, **options), pending, args.jobs))
+    else:
+        results = map_files(partial(process_file, **options), pending, args.jobs)
+    for path, (would_change, payload) in zip(pending, results):
+        if manifest is not None and not would_change:
+            bm.record(manifest, path, MANIFEST_KEY, version, 'unchanged')
         rel = os.path.relpath(path, ROOT)
         if args.dry_run:
             if would_change:
@@ -520,7 +727,25 @@ def main(argv: list[str] | None = None):
                     dst = os.path.join(args.output_dir, rel) if args.output_dir else rel
                     print(f"Updated: {dst}")
 
+    if manifest is not None:
+        bm.save_manifest(manifest)
+
+    if args.profile:
+        if profiler is not None:
+            profiler.disable()
+            prof_path = os.path.splitext(args.profile)[0] + '.prof'
+            profiler.dump_stats(prof_path)
+            print(f"cProfile stats written to {prof_path}; top functions by cumulative time:")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+        report = profile_report(records, args.top)
+        with open(args.profile, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+        print_profile_summary(report)
+        print(f"Profile written to {args.profile}")
+
     summary_target = f"{len(targets)} file(s)" if not args.only_draft else f"{len(targets)} DRAFT file(s)"
+    if len(pending) < len(targets):
+        summary_target += f" ({len(targets) - len(pending)} unchanged since last run)"
     if args.dry_run:
         print(f"Scanned {summary_target}; {changed} would change.")
     else:
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmarks for the HTML tooling on synthetic corpora.
+
+The corpus generator scales the real Content pages and templates/ up to N pages:
+pages are drawn from those sources (so the section, h2 and demo densities follow
+the real ones, and DRAFT names keep their share), about half with their
+<section> wrappers stripped so the section transform has real work to do, and
+laid out in a chapter/topic tree like Content/. Corpora are written once under
+.bench/ and reused while the sources are unchanged.
+
+For each corpus size the per-page functions and the menu scan are timed, and
+peak memory is taken with tracemalloc in a separate pass over a sample of pages.
+Results go to JSON; with a baseline, files/s drops or memory growth beyond the
+tolerance are reported as regressions (exit status 1).
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import hashlib
+import argparse
+import platform
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import add_collapsible_sections as acs  # type: ignore
+import create_JSON  # type: ignore
+import report_demo_section_issues as rdsi  # type: ignore
+import strip_demos_collapsible as sdc  # type: ignore
+
+CONTENT_DIR = os.path.join(ROOT, 'Content')
+TEMPLATES_DIR = os.path.join(ROOT, 'templates')
+BENCH_DIR = os.path.join(ROOT, '.bench')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_SIZES = (1000, 10000, 100000)
+PAGES_PER_DIR = 25
+TOPICS_PER_CHAPTER = 12
+# Share of generated pages whose existing sections are unwrapped
+RAW_FRACTION = 0.5
+# Pages per function in the tracemalloc pass (it slows calls down several times)
+MEMORY_SAMPLE = 500
+# Allowed relative slowdown / memory growth against the baseline
+DEFAULT_TOLERANCE = 0.15
+
+SECTION_TAG_PATTERN = re.compile(r"</?section\b[^>]*>", re.IGNORECASE)
+BODY_OPEN_PATTERN = re.compile(r"<body\b[^>]*>", re.IGNORECASE)
+H2_PATTERN = re.compile(r"<h2\b", re.IGNORECASE)
+SECTION_PATTERN = re.compile(r"<section\b", re.IGNORECASE)
+DEMO_PATTERN = re.compile(r"<iframe\b[^>]*\bembeddedDemo\b", re.IGNORECASE)
+
+# name -> fn(path, text); text is read outside the timed call
+PAGE_BENCHMARKS = {
+    'add_collapsible_sections.compute_transformed_html': lambda path, text: acs.compute_transformed_html(path),
+    'report_demo_section_issues.analyze': lambda path, text: rdsi.analyze(text),
+    'strip_demos_collapsible.strip_attrs': lambda path, text: sdc.strip_attrs(text),
+}
+
+def source_pages() -> list[tuple[str, str]]:
+    """(file name, html) for every Content page and HTML template."""
+    out = []
+    for base in (CONTENT_DIR, TEMPLATES_DIR):
+        for r, dirs, fns in os.walk(base):
+            dirs.sort()
+            for fn in sorted(fns):
+                if fn.lower().endswith('.html'):
+                    out.append((fn, acs.read_text_best_effort(os.path.join(r, fn))))
+    return out
+
+def densities(texts) -> dict[str, float]:
+    """Average h2 / section / embedded-demo counts per page."""
+    counts = {'h2': 0, 'section': 0, 'demo': 0}
+    n = 0
+    for text in texts:
+        n += 1
+        counts['h2'] += len(H2_PATTERN.findall(text))
+        counts['section'] += len(SECTION_PATTERN.findall(text))
+        counts['demo'] += len(DEMO_PATTERN.findall(text))
+    return {k: round(v / max(n, 1), 2) for k, v in counts.items()}
+
+def _sources_digest(sources: list[tuple[str, str]]) -> str:
+    h = hashlib.sha256()
+    for name, text in sources:
+        h.update(name.encode('utf-8'))
+        h.update(text.encode('utf-8'))
+    return h.hexdigest()[:16]
+
+def generate_corpus(pages: int, seed: int = 0, bench_dir: str = BENCH_DIR) -> tuple[str, dict]:
+    """Directory holding a synthetic corpus of the given size (reused when current) and its info dict."""
+    sources = source_pages()
+    info = {'pages': pages, 'seed': seed, 'sources': _sources_digest(sources), 'raw_fraction': RAW_FRACTION}
+    out_dir = os.path.join(bench_dir, f'corpus-{pages}')
+    info_path = os.path.join(out_dir, 'corpus.json')
+    try:
+        with open(info_path, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+        if all(existing.get(k) == v for k, v in info.items()):
+            return out_dir, existing
+    except (OSError, ValueError):
+        pass
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    rng = random.Random(seed)
+    chapters = sorted(d for d in os.listdir(CONTENT_DIR) if os.path.isdir(os.path.join(CONTENT_DIR, d)))
+    total_bytes = 0
+    for i in range(pages):
+        name, text = rng.choice(sources)
+        if rng.random() < RAW_FRACTION:
+            text = SECTION_TAG_PATTERN.sub('', text)
+        # A marker keeps every page distinct without changing its structure
+        text = BODY_OPEN_PATTERN.sub(lambda m: f'{m.group(0)}\n<!-- synthetic page {i} -->', text, count=1)
+        d = i // PAGES_PER_DIR
+        rel_dir = os.path.join(chapters[(d // TOPICS_PER_CHAPTER) % len(chapters)], f'Topic {d}')
+        os.makedirs(os.path.join(out_dir, rel_dir), exist_ok=True)
+        stem, ext = os.path.splitext(name)
+        path = os.path.join(out_dir, rel_dir, f'{stem} {i}{ext}')
+        data = text.encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(data)
+        total_bytes += len(data)
+    info['bytes'] = total_bytes
+    info['densities'] = densities(text for _path, text in iter_corpus(out_dir))
+    info['source_densities'] = densities(text for _name, text in sources)
+    with open(info_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=1)
+    return out_dir, info
+
+def iter_corpus(corpus_dir: str):
+    for r, dirs, fns in os.walk(corpus_dir):
+        dirs.sort()
+        for fn in sorted(fns):
+            if fn.lower().endswith('.html'):
+                path = os.path.join(r, fn)
+                yield path, acs.read_text_best_effort(path)
+
+def time_page_function(fn, corpus_dir: str) -> tuple[float, int]:
+    """(seconds spent inside fn, pages) over the whole corpus."""
+    spent = 0.0
+    n = 0
+    for path, text in iter_corpus(corpus_dir):
+        start = time.perf_counter()
+        fn(path, text)
+        spent += time.perf_counter() - start
+        n += 1
+    return spent, n
+
+def peak_page_memory(fn, corpus_dir: str, sample: int = MEMORY_SAMPLE) -> int:
+    """Peak bytes allocated by a single call of fn over the first sample pages."""
+    peak = 0
+    for i, (path, text) in enumerate(iter_corpus(corpus_dir)):
+        if i >= sample:
+            break
+        tracemalloc.start()
+        fn(path, text)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return peak
+
+def scan(corpus_dir: str):
+    drafts = []
+    return create_JSON.scan_dir(corpus_dir, '', drafts), drafts
+
+def bench_corpus(corpus_dir: str, pages: int, repeat: int = 3) -> dict:
+    results = {}
+    for name, fn in PAGE_BENCHMARKS.items():
+        spent, n = time_page_function(fn, corpus_dir)
+        results[name] = {
+            'seconds': round(spent, 4),
+            'files_per_sec': round(n / spent, 1) if spent else None,
+            'peak_kib': round(peak_page_memory(fn, corpus_dir) / 1024, 1),
+        }
+        print(f"  {name}: {spent:.2f}s, {results[name]['files_per_sec']} files/s, peak {results[name]['peak_kib']} KiB")
+    # The whole tree is one call; best of a few runs (the OS caches the directory listings)
+    best = min(_timed(scan, corpus_dir) for _ in range(repeat))
+    tracemalloc.start()
+    scan(corpus_dir)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    results['create_JSON.scan_dir'] = {
+        'seconds': round(best, 4),
+        'files_per_sec': round(pages / best, 1) if best else None,
+        'peak_kib': round(peak / 1024, 1),
+    }
+    print(f"  create_JSON.scan_dir: {best:.2f}s, {results['create_JSON.scan_dir']['files_per_sec']} files/s, peak {results['create_JSON.scan_dir']['peak_kib']} KiB")
+    return results
+
+def _timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of current against baseline, one line each."""
+    problems = []
+    for size, run in current['runs'].items():
+        base_run = baseline.get('runs', {}).get(size)
+        if not base_run:
+            continue
+        for name, res in run['functions'].items():
+            base = base_run['functions'].get(name)
+            if not base:
+                continue
+            if base.get('files_per_sec') and res.get('files_per_sec') and res['files_per_sec'] < base['files_per_sec'] * (1 - tolerance):
+                problems.append(f"{size} pages, {name}: {res['files_per_sec']} files/s vs baseline {base['files_per_sec']}")
+            if base.get('peak_kib') and res['peak_kib'] > base['peak_kib'] * (1 + tolerance):
+                problems.append(f"{size} pages, {name}: peak {res['peak_kib']} KiB vs baseline {base['peak_kib']}")
+    return problems
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the HTML tooling on synthetic corpora built from the real pages.')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='Comma-separated corpus sizes in pages.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the corpus generator.')
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results.json'), help='Where to write the results JSON.')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Results JSON to compare against.')
+    parser.add_argument('--save-baseline', action='store_true', help='Also store these results as the baseline.')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='Allowed relative regression (default: 0.15).')
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': {},
+    }
+    for pages in sizes:
+        start = time.perf_counter()
+        corpus_dir, info = generate_corpus(pages, args.seed)
+        print(f"Corpus of {pages} page(s) ({info['bytes'] / 1e6:.1f} MB, densities {info['densities']}) "
+              f"ready in {time.perf_counter() - start:.1f}s")
+        report['runs'][str(pages)] = {'corpus': info, 'functions': bench_corpus(corpus_dir, pages)}
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"Results written to {os.path.relpath(args.output)}")
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        shutil.copyfile(args.output, args.baseline)
+        print(f"Baseline saved to {os.path.relpath(args.baseline)}")
+        return 0
+
+    try:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        print("No baseline to compare against (run with --save-baseline to store one).")
+        return 0
+    problems = compare(report, baseline, args.tolerance)
+    if problems:
+        print(f"Regressions beyond {args.tolerance:.0%}:")
+        for p in problems:
+            print(f"- {p}")
+        return 1
+    print(f"No regressions beyond {args.tolerance:.0%} against {os.path.relpath(args.baseline)}.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Single-pass site build: walk Content/ once, read each page once, run every registered
+stage over the in-memory text, and write a page back only if some stage changed it.
+The walk itself feeds the menu (chapters.json) and sitemap.
+"""
+import os
+import sys
+import json
+import argparse
+from functools import partial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import add_collapsible_sections as acs  # type: ignore
+import build_manifest as bm  # type: ignore
+import code_highlight  # type: ignore
+import create_JSON  # type: ignore
+import fingerprint  # type: ignore
+import glossary_wrap  # type: ignore
+import head_inject  # type: ignore
+import link_graph  # type: ignore
+import precompress  # type: ignore
+import report_demo_section_issues as rdsi  # type: ignore
+import responsive_images  # type: ignore
+import search_index  # type: ignore
+import service_worker  # type: ignore
+import strip_demos_collapsible as sdc  # type: ignore
+
+CONTENT_DIR = os.path.join(ROOT, 'Content')
+MANIFEST_KEY = 'build'
+
+# Registered stages, run in order. Each is {'name', 'applies': fn(rel) -> bool, 'run': fn(text, doc) -> text}
+# where rel is the Content-relative '/'-separated path and doc carries per-page state ('dry_run') and results
+# ('issues', 'search', 'links', and 'code_blocks' newly added to the highlight cache).
+STAGES: list[dict] = []
+
+def stage(name: str, applies=lambda rel: True):
+    def register(fn):
+        STAGES.append({'name': name, 'applies': applies, 'run': fn})
+        return fn
+    return register
+
+def _top(rel: str) -> str:
+    return rel.split('/', 1)[0].lower()
+
+@stage('sections', applies=lambda rel: _top(rel) != 'problems')
+def sections_stage(text: str, doc: dict) -> str:
+    new_text = acs.transform_html(text)
+    return text if new_text is None else new_text
+
+@stage('strip-demo-attrs', applies=lambda rel: rel.startswith('Demos/'))
+def strip_demo_attrs_stage(text: str, doc: dict) -> str:
+    return sdc.strip_attrs(text)
+
+@stage('highlight')
+def highlight_stage(text: str, doc: dict) -> str:
+    return code_highlight.highlight_page(text, doc['code_blocks'])
+
+_glossary_matcher = None
+
+@stage('glossary')
+def glossary_stage(text: str, doc: dict) -> str:
+    # Compiled once per process, on first use
+    global _glossary_matcher
+    if _glossary_matcher is None:
+        _glossary_matcher = glossary_wrap.compile_glossary(glossary_wrap.load_glossary())
+    return glossary_wrap.wrap_glossary_terms(text, _glossary_matcher, None if doc['dry_run'] else glossary_wrap.SHARD_DIR)
+
+_head_snippets = None
+
+@stage('head')
+def head_stage(text: str, doc: dict) -> str:
+    # Analytics and any other snippets configured in head-snippets.json
+    global _head_snippets
+    if _head_snippets is None:
+        _head_snippets = head_inject.load_snippets()
+    return head_inject.apply_snippets(text, _head_snippets)
+
+@stage('images')
+def images_stage(text: str, doc: dict) -> str:
+    return responsive_images.rewrite_images(text, 'Content/' + doc['rel'], write=not doc['dry_run'])
+
+_asset_hashes = None
+
+@stage('fingerprint')
+def fingerprint_stage(text: str, doc: dict) -> str:
+    # CSS/JS/JSON the pages link to are not written by the build, so hash them once per process
+    global _asset_hashes
+    if _asset_hashes is None:
+        _asset_hashes = fingerprint.asset_hashes()
+    return fingerprint.rewrite_references(text, 'Content/' + doc['rel'], _asset_hashes)
+
+@stage('issues', applies=lambda rel: _top(rel) not in ('problems', 'demos'))
+def issues_stage(text: str, doc: dict) -> str:
+    doc['issues'] = rdsi.analyze(text)
+    return text
+
+@stage('links')
+def links_stage(text: str, doc: dict) -> str:
+    doc['links'] = link_graph.extract_links(text)
+    return text
+
+@stage('search', applies=search_index.is_indexed)
+def search_stage(text: str, doc: dict) -> str:
+    # Runs last so it sees the final page; main() turns the extracts into the index
+    doc['search'] = search_index.extract_page(text)
+    return text
+
+def walk_content(content_dir: str = CONTENT_DIR) -> tuple[list[str], list[str]]:
+    """One walk of Content/: (top-level directory names, sorted Content-relative .html paths)."""
+    top_dirs: list[str] = []
+    pages: list[str] = []
+    for r, dirs, fns in os.walk(content_dir):
+        dirs.sort()
+        rel_dir = os.path.relpath(r, content_dir)
+        if rel_dir == '.':
+            top_dirs = list(dirs)
+        for fn in fns:
+            if fn.lower().endswith('.html'):
+                pages.append(os.path.relpath(os.path.join(r, fn), content_dir).replace(os.sep, '/'))
+    return top_dirs, sorted(pages)
+
+def run_stages(text: str, doc: dict, stage_names: tuple[str, ...]) -> str:
+    for st in STAGES:
+        if st['name'] not in stage_names or not st['applies'](doc['rel']):
+            continue
+        new_text = st['run'](text, doc)
+        if new_text != text:
+            doc['stages'].append(st['name'])
+            text = new_text
+    return text
+
+def build_page(rel: str, *, content_dir: str = CONTENT_DIR, stage_names: tuple[str, ...] = (), dry_run: bool = False,
+               check_stable: bool = False) -> dict:
+    """
+    Run the selected stages over one page; returns {'rel', 'changed', 'stages', 'issues', 'search', 'links', 'code_blocks', 'unstable'}.
+    With check_stable, a changed page is run through the stages again (in memory, like a dry run), and 'unstable' lists
+    the stages that would change it a second time.
+    """
+    path = os.path.join(content_dir, rel)
+    text = original = acs.read_text_best_effort(path)
+    doc = {'rel': rel, 'path': path, 'issues': None, 'search': None, 'links': None, 'code_blocks': {}, 'stages': [], 'dry_run': dry_run}
+    text = run_stages(text, doc, stage_names)
+    doc['changed'] = text != original
+    if doc['changed'] and not dry_run:
+        acs.write_text_utf8(path, text)
+    unstable = []
+    if check_stable and doc['changed']:
+        again = {**doc, 'code_blocks': {}, 'stages': [], 'dry_run': True}
+        if run_stages(text, again, stage_names) != text:
+            unstable = again['stages']
+    return {
+        'rel': rel, 'changed': doc['changed'], 'stages': doc['stages'],
+        'issues': doc['issues'], 'search': doc['search'], 'links': doc['links'], 'code_blocks': doc['code_blocks'],
+        'unstable': unstable,
+    }
+
+def main(argv: list[str] | None = None) -> int:
+    names = [st['name'] for st in STAGES]
+    parser = argparse.ArgumentParser(description='Build the site: one walk and one read/write per page for all stages.')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing anything.')
+    parser.add_argument('--stages', default=','.join(names), help=f'Comma-separated stages to run (default: all of {",".join(names)}).')
+    parser.add_argument('--skip', default='', help='Comma-separated stages to leave out.')
+    parser.add_argument('--no-menu', action='store_true', help='Do not rebuild chapters.json / sitemap.xml.')
+    parser.add_argument('-j', '--jobs', type=acs.jobs_arg, default=1, help='Process pages in N worker processes (0 = one per CPU).')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the build manifest and process every page.')
+    parser.add_argument('--no-compress', action='store_true', help='Do not refresh the .gz/.br sidecars.')
+    parser.add_argument('--check-stable', action='store_true', help='Fail if a second build would change any page this one changed.')
+    args = parser.parse_args(argv)
+
+    selected = {s.strip() for s in args.stages.split(',') if s.strip()} - {s.strip() for s in args.skip.split(',')}
+    unknown = selected - set(names)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    stage_names = tuple(n for n in names if n in selected)
+
+    top_dirs, pages = walk_content()
+
+    # Pages that came through this exact stage set unchanged last time reuse their recorded issues and search extract
+    manifest = None if args.no_cache else bm.load_manifest()
+    version = bm.script_version(
+        os.path.abspath(__file__), acs.__file__, acs.sidx.__file__, rdsi.__file__, sdc.__file__,
+        code_highlight.__file__, glossary_wrap.__file__, glossary_wrap.GLOSSARY_PATH, search_index.__file__,
+        fingerprint.__file__, responsive_images.__file__, link_graph.__file__,
+        head_inject.__file__, head_inject.SNIPPETS_PATH,
+    ) + ':' + ','.join(stage_names)
+    if 'fingerprint' in stage_names:
+        # Pages must be revisited when an asset they may reference changes
+        version += ':' + bm.text_sha256(json.dumps(fingerprint.asset_hashes()))[:16]
+    results: dict[str, dict] = {}
+    pending = []
+    for rel in pages:
+        hit, cached = bm.lookup(manifest, os.path.join(CONTENT_DIR, rel), MANIFEST_KEY, version) if manifest is not None else (False, None)
+        if hit:
+            results[rel] = {'rel': rel, 'changed': False, 'stages': [], 'code_blocks': {}, **cached}
+        else:
+            pending.append(rel)
+
+    worker = partial(build_page, stage_names=stage_names, dry_run=args.dry_run, check_stable=args.check_stable)
+    for res in acs.map_files(worker, pending, args.jobs):
+        results[res['rel']] = res
+        if manifest is not None and not res['changed']:
+            bm.record(manifest, os.path.join(CONTENT_DIR, res['rel']), MANIFEST_KEY, version,
+                      {'issues': res['issues'], 'search': res['search'], 'links': res['links']})
+    if manifest is not None:
+        bm.save_manifest(manifest)
+    if not args.dry_run:
+        code_highlight.save_cache({k: v for rel in pending for k, v in results[rel]['code_blocks'].items()})
+
+    changed = 0
+    for rel in pages:
+        res = results[rel]
+        if res['changed']:
+            changed += 1
+            verb = 'Would update' if args.dry_run else 'Updated'
+            print(f"{verb}: Content/{rel} ({', '.join(res['stages'])})")
+
+    if not args.no_menu:
+        chapters = create_JSON.chapters_from_paths(top_dirs, pages)
+        menu_paths = create_JSON.build_menu_paths(chapters)
+        if args.dry_run:
+            print(f"Menu: {len(menu_paths)} entries (not written).")
+        else:
+            wrote_json = create_JSON.write_if_changed(create_JSON.CHAPTERS_JSON, json.dumps(chapters, indent=2).encode('utf-8'))
+            wrote_sitemap = create_JSON.write_sitemap(menu_paths)
+            wrote_index = create_JSON.write_index_menu(chapters)
+            wrote_menu, _removed = create_JSON.write_menu_data(chapters)
+            status = lambda wrote: 'updated' if wrote else 'unchanged'
+            print(f"Menu: {len(menu_paths)} entries; chapters.json {status(wrote_json)}, sitemap.xml {status(wrote_sitemap)}, "
+                  f"index.html menu {status(wrote_index)}, menu/index.json {status(wrote_menu)}.")
+
+    if 'search' in stage_names:
+        extracts = {rel: results[rel]['search'] for rel in pages if results[rel]['search'] is not None}
+        meta, files = search_index.build_index(extracts)
+        if args.dry_run:
+            print(f"Search: {len(meta['pages'])} page(s), {len(files)} shard(s) (not written).")
+        else:
+            wrote, removed = search_index.write_index(meta, files)
+            print(f"Search: {len(meta['pages'])} page(s), {len(files)} shard(s); "
+                  f"index.json {'updated' if wrote else 'unchanged'}, {removed} stale shard(s) removed.")
+
+    if 'links' in stage_names:
+        menu_paths = create_JSON.build_menu_paths(create_JSON.chapters_from_paths(top_dirs, pages))
+        prefetch = link_graph.build_prefetch({rel: results[rel]['links'] or [] for rel in pages}, menu_paths)
+        if args.dry_run:
+            print(f"Prefetch: hints for {len(prefetch)} page(s) (not written).")
+        else:
+            wrote = link_graph.write_prefetch(prefetch)
+            print(f"Prefetch: hints for {len(prefetch)} page(s); prefetch.json {'updated' if wrote else 'unchanged'}.")
+
+    if 'images' in stage_names and not args.dry_run:
+        index_html = acs.read_text_best_effort(fingerprint.INDEX_HTML)
+        new_index_html = responsive_images.rewrite_images(index_html, 'index.html')
+        if new_index_html != index_html:
+            acs.write_text_utf8(fingerprint.INDEX_HTML, new_index_html)
+            print("Updated: index.html (images)")
+
+    if 'fingerprint' in stage_names and not args.dry_run:
+        # Last: hashes pages and generated files as finally written
+        versions, wrote_manifest, wrote_index = fingerprint.write_manifest()
+        status = lambda wrote: 'updated' if wrote else 'unchanged'
+        print(f"Assets: {len(versions)} file(s) fingerprinted; asset-manifest.json {status(wrote_manifest)}, index.html {status(wrote_index)}.")
+        # The worker's precache list is exactly these hashes
+        menu_paths = create_JSON.build_menu_paths(create_JSON.chapters_from_paths(top_dirs, pages))
+        sw_manifest, wrote_sw = service_worker.write_service_worker(versions, menu_paths)
+        print(f"Service worker: {len(sw_manifest['shell'])} shell file(s), {len(sw_manifest['pages'])} page(s); sw.js {status(wrote_sw)}.")
+
+    if not args.no_compress and not args.dry_run:
+        # After every writer, so the sidecars match what is finally on disk
+        done, skipped, removed = precompress.precompress_site(use_cache=not args.no_cache)
+        print(f"Compressed: {done} file(s); {skipped} unchanged, {removed} orphaned sidecar(s) removed.")
+
+    report = [(rel, results[rel]['issues']) for rel in pages if results[rel]['issues']]
+    if report:
+        print("Potential issues found:")
+        for rel, issues in report:
+            print(f"- Content/{rel}")
+            for iss in issues:
+                print("  *", iss)
+
+    summary = f"{changed} would change" if args.dry_run else f"updated {changed}"
+    print(f"Built {len(pages)} page(s) with stages {', '.join(stage_names) or '(none)'}; {summary}.")
+
+    unstable = [(rel, results[rel]['unstable']) for rel in pages if results[rel].get('unstable')]
+    if unstable:
+        print("Pages a second build would change again:")
+        for rel, stages in unstable:
+            print(f"- Content/{rel} ({', '.join(stages)})")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
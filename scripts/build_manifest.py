@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+On-disk manifest shared by the maintenance scripts so reruns skip unchanged pages.
+Entries are keyed by repo-relative path and hold the size, mtime and SHA-256 the
+file was last seen with, plus each script's last result for that content. A result
+is reused only while both the content and the script version (a hash of its source)
+are unchanged.
+"""
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = os.path.join(ROOT, '.build_manifest.json')
+MANIFEST_FORMAT = 1
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def script_version(*paths: str) -> str:
+    """Version string for a script: a hash over its source file(s) and their dependencies."""
+    h = hashlib.sha256()
+    for p in paths:
+        with open(p, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+def load_manifest(path: str = MANIFEST_PATH) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = None
+    if not isinstance(data, dict) or data.get('format') != MANIFEST_FORMAT:
+        data = {'format': MANIFEST_FORMAT, 'files': {}}
+    return data
+
+def save_manifest(manifest: dict, path: str = MANIFEST_PATH) -> None:
+    # Write to a temp file and rename so an interrupted run never leaves a torn manifest
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=0, sort_keys=True)
+    os.replace(tmp, path)
+
+def _key(path: str) -> str:
+    return os.path.relpath(os.path.abspath(path), ROOT).replace(os.sep, '/')
+
+def _current_entry(manifest: dict, path: str) -> dict | None:
+    """
+    Entry for path brought up to date with the file on disk.
+    Results are dropped when the content hash changed; None if the file is gone.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    files = manifest['files']
+    key = _key(path)
+    entry = files.get(key)
+    if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+        return entry
+    sha = file_sha256(path)
+    if not entry or entry['sha256'] != sha:
+        entry = {'results': {}}
+        files[key] = entry
+    entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns, sha256=sha)
+    return entry
+
+def lookup(manifest: dict, path: str, script: str, version: str) -> tuple[bool, object]:
+    """(True, result) if script@version already processed the current content of path, else (False, None)."""
+    entry = _current_entry(manifest, path)
+    if entry is None:
+        return False, None
+    res = entry['results'].get(script)
+    if not res or res.get('version') != version:
+        return False, None
+    return True, res.get('result')
+
+def record(manifest: dict, path: str, script: str, version: str, result) -> None:
+    """Remember script@version's (JSON-serializable) result for the current content of path."""
+    entry = _current_entry(manifest, path)
+    if entry is not None:
+        entry['results'][script] = {'version': version, 'result': result}
+
+def prune(manifest: dict) -> int:
+    """Drop entries for files that no longer exist; returns how many were removed."""
+    files = manifest['files']
+    gone = [k for k in files if not os.path.exists(os.path.join(ROOT, k))]
+    for k in gone:
+        del files[k]
+    return len(gone)
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Inspect or reset the shared incremental build manifest.')
+    parser.add_argument('--manifest', default=MANIFEST_PATH, help='Manifest file to operate on.')
+    parser.add_argument('--clear', action='store_true', help='Delete the manifest so the next runs process every file.')
+    parser.add_argument('--prune', action='store_true', help='Drop entries for files that no longer exist.')
+    args = parser.parse_args(argv)
+
+    if args.clear:
+        if os.path.exists(args.manifest):
+            os.remove(args.manifest)
+        print(f"Cleared {os.path.relpath(args.manifest, ROOT)}")
+        return 0
+    manifest = load_manifest(args.manifest)
+    if args.prune:
+        removed = prune(manifest)
+        save_manifest(manifest, args.manifest)
+        print(f"Pruned {removed} stale entr{'y' if removed == 1 else 'ies'}.")
+    counts: dict[str, int] = {}
+    for entry in manifest['files'].values():
+        for script in entry['results']:
+            counts[script] = counts.get(script, 0) + 1
+    print(f"{len(manifest['files'])} file(s) tracked in {os.path.relpath(args.manifest, ROOT)}")
+    for script in sorted(counts):
+        print(f"  {script}: {counts[script]} cached result(s)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Build-time syntax highlighting for <pre><code> blocks.
+
+Each block is tokenized here and written back as static highlight.js-style markup
+(<span class="hljs-keyword">, ...) on <code class="... hljs" data-highlighted="yes">,
+styled by css/code-highlight.css. highlight.js skips elements marked that way, so
+when every block on a page is pre-highlighted its CDN script and stylesheet are
+swapped for the local stylesheet. Blocks that already hold other markup are left
+for the runtime, and so is the runtime include on their pages.
+
+Languages come from the language-*/lang-* class (language-pseudocode for the site's
+pseudocode); unlabeled blocks are left for highlight.js to detect. Highlighted blocks are cached by a hash of (highlighter version,
+language, text) in .highlight_cache.json, so rebuilds only tokenize blocks that
+changed. Reruns rebuild blocks from their text, so output follows this file.
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from html import escape, unescape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import add_collapsible_sections as acs  # type: ignore
+import build_manifest as bm  # type: ignore
+import create_JSON  # type: ignore
+
+CONTENT_DIR = os.path.join(ROOT, 'Content')
+CACHE_PATH = os.path.join(ROOT, '.highlight_cache.json')
+STYLESHEET = '/Algorithms/css/code-highlight.css'
+VERSION = bm.script_version(os.path.abspath(__file__))
+
+BLOCK_PATTERN = re.compile(r"(<pre\b[^>]*>\s*)<code\b([^>]*)>(.*?)</code>(\s*</pre>)", re.IGNORECASE | re.DOTALL)
+CLASS_ATTR_PATTERN = re.compile(r"\bclass\s*=\s*\"([^\"]*)\"", re.IGNORECASE)
+OWN_SPAN_PATTERN = re.compile(r"<span class=\"hljs-[^\"]*\">|</span>")
+MARKUP_PATTERN = re.compile(r"<[A-Za-z/!]")
+RUNTIME_SCRIPT_PATTERN = re.compile(r"[ \t]*<script\b[^>]*\bsrc=\"[^\"]*highlight(?:\.min)?\.js\"[^>]*>\s*</script>[ \t]*\n?", re.IGNORECASE)
+RUNTIME_STYLE_PATTERN = re.compile(r"<link\b[^>]*\bhref=\"[^\"]*highlight\.js/[^\"]*/styles/[^\"]*\.css\"[^>]*>", re.IGNORECASE)
+# Also matches the relative href earlier builds wrote
+LOCAL_STYLE_PATTERN = re.compile(r"<link\b[^>]*\bhref=\"[^\"]*css/code-highlight\.css\"", re.IGNORECASE)
+
+C_COMMENT = r"//[^\n]*|/\*.*?\*/"
+NUMBER = r"\b(?:0[xX][0-9a-fA-F']+|\d[\d_']*(?:\.\d+)?(?:[eE][+-]?\d+)?)[fFlLuUdD]*\b"
+DQ_STRING = r"\"(?:\\.|[^\"\\\n])*\""
+SQ_STRING = r"'(?:\\.|[^'\\\n])*'"
+
+# Per language: token patterns tried in order before identifiers, plus word classes
+LANGUAGES = {
+    'java': {
+        'tokens': [('comment', C_COMMENT), ('string', f"{DQ_STRING}|{SQ_STRING}"), ('meta', r"@\w+"), ('number', NUMBER)],
+        'keyword': {
+            'abstract', 'assert', 'break', 'case', 'catch', 'class', 'continue', 'default', 'do', 'else',
+            'enum', 'extends', 'final', 'finally', 'for', 'if', 'implements', 'import', 'instanceof',
+            'interface', 'native', 'new', 'package', 'private', 'protected', 'public', 'record', 'return',
+            'static', 'super', 'switch', 'synchronized', 'this', 'throw', 'throws', 'transient', 'try',
+            'var', 'volatile', 'while', 'yield',
+        },
+        'type': {'boolean', 'byte', 'char', 'double', 'float', 'int', 'long', 'short', 'void'},
+        'literal': {'true', 'false', 'null'},
+        'built_in': set(),
+        'definers': {'class': 'title class_', 'interface': 'title class_', 'enum': 'title class_', 'new': 'title class_'},
+    },
+    'cpp': {
+        'tokens': [('comment', C_COMMENT), ('meta', r"^[ \t]*#[ \t]*\w+[^\n]*"), ('string', f"{DQ_STRING}|{SQ_STRING}"), ('number', NUMBER)],
+        'keyword': {
+            'alignas', 'auto', 'break', 'case', 'catch', 'class', 'const', 'constexpr', 'continue',
+            'default', 'delete', 'do', 'else', 'enum', 'explicit', 'extern', 'for', 'friend', 'goto', 'if',
+            'inline', 'mutable', 'namespace', 'new', 'noexcept', 'operator', 'private', 'protected',
+            'public', 'return', 'sizeof', 'static', 'static_cast', 'struct', 'switch', 'template', 'this',
+            'throw', 'try', 'typedef', 'typename', 'union', 'using', 'virtual', 'volatile', 'while',
+        },
+        'type': {'bool', 'char', 'double', 'float', 'int', 'long', 'short', 'signed', 'unsigned', 'void', 'size_t', 'wchar_t'},
+        'literal': {'true', 'false', 'nullptr', 'NULL'},
+        'built_in': {
+            'std', 'cout', 'cin', 'cerr', 'endl', 'string', 'vector', 'map', 'set', 'pair', 'queue',
+            'stack', 'deque', 'unordered_map', 'unordered_set', 'priority_queue', 'swap', 'min', 'max',
+            'sort', 'printf', 'scanf', 'malloc', 'free', 'memset',
+        },
+        'definers': {'class': 'title class_', 'struct': 'title class_'},
+    },
+    'python': {
+        'tokens': [
+            ('comment', r"#[^\n]*"),
+            ('string', r"(?i:[rbfu]{0,2})(?:\"\"\".*?\"\"\"|'''.*?'''|" + DQ_STRING + "|" + SQ_STRING + ")"),
+            ('meta', r"^[ \t]*@[\w.]+"), ('number', NUMBER),
+        ],
+        'keyword': {
+            'and', 'as', 'assert', 'async', 'await', 'break', 'class', 'continue', 'def', 'del', 'elif',
+            'else', 'except', 'finally', 'for', 'from', 'global', 'if', 'import', 'in', 'is', 'lambda',
+            'nonlocal', 'not', 'or', 'pass', 'raise', 'return', 'try', 'while', 'with', 'yield',
+        },
+        'type': set(),
+        'literal': {'True', 'False', 'None'},
+        'built_in': {
+            'abs', 'all', 'any', 'dict', 'enumerate', 'float', 'int', 'isinstance', 'len', 'list', 'map',
+            'max', 'min', 'open', 'print', 'range', 'reversed', 'set', 'sorted', 'str', 'sum', 'super',
+            'tuple', 'zip',
+        },
+        'definers': {'def': 'title function_', 'class': 'title class_'},
+    },
+    'javascript': {
+        'tokens': [('comment', C_COMMENT), ('string', f"{DQ_STRING}|{SQ_STRING}|`(?:\\\\.|[^`\\\\])*`"), ('number', NUMBER)],
+        'keyword': {
+            'async', 'await', 'break', 'case', 'catch', 'class', 'const', 'continue', 'debugger',
+            'default', 'delete', 'do', 'else', 'export', 'extends', 'finally', 'for', 'function', 'if',
+            'import', 'in', 'instanceof', 'let', 'new', 'of', 'return', 'super', 'switch', 'this', 'throw',
+            'try', 'typeof', 'var', 'void', 'while', 'with', 'yield',
+        },
+        'type': set(),
+        'literal': {'true', 'false', 'null', 'undefined', 'NaN', 'Infinity'},
+        'built_in': {'console', 'Math', 'Array', 'Object', 'JSON', 'Number', 'String', 'Promise', 'Map', 'Set', 'document', 'window'},
+        'definers': {'function': 'title function_', 'class': 'title class_'},
+    },
+    'pseudocode': {
+        'tokens': [('comment', r"//[^\n]*"), ('string', DQ_STRING), ('number', NUMBER)],
+        'keyword': {
+            'algorithm', 'and', 'break', 'continue', 'do', 'down', 'downto', 'each', 'else', 'elif', 'for',
+            'from', 'function', 'if', 'in', 'let', 'mod', 'not', 'or', 'procedure', 'repeat', 'return',
+            'then', 'to', 'until', 'while',
+        },
+        'type': set(),
+        'literal': {'true', 'false', 'null', 'nil', 'NIL', 'TRUE', 'FALSE', 'NULL'},
+        'built_in': set(),
+        'definers': {'function': 'title function_', 'procedure': 'title function_', 'algorithm': 'title function_'},
+    },
+}
+ALIASES = {'c++': 'cpp', 'c': 'cpp', 'cc': 'cpp', 'h': 'cpp', 'py': 'python', 'js': 'javascript', 'pseudo': 'pseudocode'}
+NO_HIGHLIGHT = {'nohighlight', 'no-highlight', 'plaintext', 'text'}
+
+_compiled: dict[str, re.Pattern] = {}
+
+def _lexer(lang: str) -> re.Pattern:
+    if lang not in _compiled:
+        parts = [f"(?P<{name}>{pat})" for name, pat in LANGUAGES[lang]['tokens']]
+        parts.append(r"(?P<word>[A-Za-z_$][\w$]*)")
+        parts.append(r"(?P<other>\s+|.)")
+        _compiled[lang] = re.compile('|'.join(parts), re.DOTALL | re.MULTILINE)
+    return _compiled[lang]
+
+def highlight(text: str, lang: str) -> str:
+    """hljs-style markup for text in one of LANGUAGES."""
+    spec = LANGUAGES[lang]
+    out = []
+    prev = ''        # previous significant token text
+    prev_kind = ''   # its kind: 'keyword', 'type', 'word', ...
+    pending_title = ''
+    for m in _lexer(lang).finditer(text):
+        kind = m.lastgroup
+        tok = m.group()
+        cls = None
+        if kind == 'word':
+            if tok in spec['keyword']:
+                cls = kind = 'keyword'
+            elif tok in spec['type']:
+                cls = kind = 'type'
+            elif tok in spec['literal']:
+                cls = kind = 'literal'
+            elif pending_title:
+                cls = pending_title
+            elif tok in spec['built_in']:
+                cls = 'built_in'
+            elif lang in ('java', 'cpp') and prev_kind in ('type', 'word') and text[m.end():m.end() + 1] == '(':
+                # A name after a type and before '(' is a function definition
+                cls = 'title function_'
+        elif kind != 'other':
+            cls = kind
+        if kind != 'other' or tok.strip():
+            pending_title = spec['definers'].get(tok, '') if kind == 'keyword' else ''
+            prev, prev_kind = tok, kind
+        out.append(f'<span class="hljs-{cls}">{escape(tok, quote=False)}</span>' if cls else escape(tok, quote=False))
+    return ''.join(out)
+
+def block_language(code_attrs: str) -> str | None:
+    """Language key for a <code> tag's attributes; None when it is unlabeled or asks not to be highlighted."""
+    m = CLASS_ATTR_PATTERN.search(code_attrs)
+    classes = m.group(1).split() if m else []
+    for c in classes:
+        low = c.lower()
+        if low in NO_HIGHLIGHT:
+            return None
+        if low.startswith(('language-', 'lang-')):
+            name = low.split('-', 1)[1]
+            name = ALIASES.get(name, name)
+            return name if name in LANGUAGES else None
+    return None
+
+def _code_tag(code_attrs: str) -> str:
+    attrs = re.sub(r"\s*\bdata-highlighted=\"[^\"]*\"", '', code_attrs)
+    m = CLASS_ATTR_PATTERN.search(attrs)
+    if m is None:
+        return f'<code class="hljs"{attrs} data-highlighted="yes">'
+    classes = m.group(1).split()
+    if 'hljs' not in classes:
+        classes.append('hljs')
+    attrs = attrs[:m.start(1)] + ' '.join(classes) + attrs[m.end(1):]
+    return f'<code{attrs} data-highlighted="yes">'
+
+_cache: dict | None = None
+
+def load_cache(path: str = CACHE_PATH) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = None
+    if not isinstance(data, dict) or data.get('version') != VERSION:
+        data = {'version': VERSION, 'blocks': {}}
+    return data
+
+def save_cache(new_blocks: dict[str, str], path: str = CACHE_PATH) -> None:
+    """Merge newly highlighted blocks into the on-disk cache."""
+    if not new_blocks:
+        return
+    cache = load_cache(path)
+    cache['blocks'].update(new_blocks)
+    create_JSON.write_if_changed(path, json.dumps(cache, sort_keys=True).encode('utf-8'))
+
+def highlight_blocks(html: str, new_blocks: dict[str, str] | None = None) -> tuple[str, bool]:
+    """
+    Return (html with every plain-text code block highlighted, True if no block was left for the runtime).
+    Blocks not found in the cache are added to new_blocks (hash -> markup).
+    """
+    global _cache
+    if _cache is None:
+        _cache = load_cache()
+    blocks = _cache['blocks']
+    all_done = True
+
+    def repl(m: re.Match) -> str:
+        nonlocal all_done
+        pre_open, code_attrs, inner, pre_close = m.groups()
+        lang = block_language(code_attrs)
+        if lang is None or MARKUP_PATTERN.search(OWN_SPAN_PATTERN.sub('', inner)):
+            all_done = False
+            return m.group(0)
+        text = unescape(OWN_SPAN_PATTERN.sub('', inner))
+        key = hashlib.sha256(f"{VERSION}\0{lang}\0{text}".encode('utf-8')).hexdigest()[:24]
+        markup = blocks.get(key)
+        if markup is None:
+            markup = highlight(text, lang)
+            blocks[key] = markup
+            if new_blocks is not None:
+                new_blocks[key] = markup
+        return f"{pre_open}{_code_tag(code_attrs)}{markup}</code>{pre_close}"
+
+    return BLOCK_PATTERN.sub(repl, html), all_done
+
+def drop_runtime(html: str) -> str:
+    """Swap the highlight.js CDN script and theme for the local stylesheet."""
+    html = RUNTIME_SCRIPT_PATTERN.sub('', html)
+    if LOCAL_STYLE_PATTERN.search(html):
+        return RUNTIME_STYLE_PATTERN.sub('', html)
+    return RUNTIME_STYLE_PATTERN.sub(f'<link rel="stylesheet" href="{STYLESHEET}">', html, count=1)
+
+def highlight_page(html: str, new_blocks: dict[str, str] | None = None) -> str:
+    """Pre-highlight a page that uses highlight.js (or was pre-highlighted before); other pages are returned as is."""
+    if not (RUNTIME_SCRIPT_PATTERN.search(html) or LOCAL_STYLE_PATTERN.search(html)):
+        return html
+    html, all_done = highlight_blocks(html, new_blocks)
+    if all_done and (RUNTIME_SCRIPT_PATTERN.search(html) or RUNTIME_STYLE_PATTERN.search(html)):
+        html = drop_runtime(html)
+    return html
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Pre-highlight code blocks in Content pages and drop the highlight.js runtime.')
+    parser.add_argument('--dry-run', action='store_true', help='Report pages that would change without writing.')
+    parser.add_argument('paths', nargs='*', help='Files or directories to process. Defaults to all Content/.')
+    args = parser.parse_args(argv)
+
+    targets = []
+    for p in args.paths or [CONTENT_DIR]:
+        ap = p if os.path.isabs(p) else os.path.join(ROOT, p)
+        if os.path.isdir(ap):
+            for r, _dirs, fns in os.walk(ap):
+                targets.extend(os.path.join(r, fn) for fn in fns if fn.lower().endswith('.html'))
+        else:
+            targets.append(ap)
+
+    changed = 0
+    new_blocks: dict[str, str] = {}
+    for path in sorted(set(targets)):
+        html = acs.read_text_best_effort(path)
+        new_html = highlight_page(html, new_blocks)
+        if new_html == html:
+            continue
+        changed += 1
+        if not args.dry_run:
+            acs.write_text_utf8(path, new_html)
+        print(f"{'Would update' if args.dry_run else 'Updated'}: {os.path.relpath(path, ROOT)}")
+    if not args.dry_run:
+        save_cache(new_blocks)
+    print(f"Scanned {len(set(targets))} file(s); {changed} {'would change' if args.dry_run else 'updated'}; "
+          f"{len(new_blocks)} block(s) highlighted, the rest from cache.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,16 @@
 #!/usr/bin/env python3
-import os, json, urllib.parse, xml.etree.ElementTree as ET
+import os, re, sys, html, json, hashlib, argparse, urllib.parse, xml.etree.ElementTree as ET
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTENT_DIR = os.path.join(ROOT, 'Content')
+CHAPTERS_JSON = os.path.join(ROOT, 'scripts', 'chapters.json')
+SITEMAP_XML = os.path.join(ROOT, 'scripts', 'sitemap.xml')
+INDEX_HTML = os.path.join(ROOT, 'index.html')
+# Per-chapter menu data for the client: index.json plus one content-hashed file per chapter
+MENU_DATA_DIR = os.path.join(ROOT, 'scripts', 'menu')
+# Directory listings from the previous run; a listing is reused while its directory mtime is unchanged
+SNAPSHOT_PATH = os.path.join(ROOT, '.create_JSON_snapshot.json')
+SNAPSHOT_FORMAT = 1
 
 # Edit this to match your actual root URL for the menu (include trailing slash if needed)
 SITE_ROOT = "https:///Algorithms/"
@@ -7,43 +18,191 @@ SITE_ROOT = "https:///Algorithms/"
 # Directories to exclude from menu generation (case-insensitive)
 IGNORE_DIRS = {"old", "images", "figures"}
 
-def scan_dir(current_path, path_prefix="", draft_accumulator=None):
+# Grouped menu order; keep in sync with the *_ORDER constants in loadContent.js
+TOP_LEVEL_ORDER = ['Home', 'Problems', 'Data Structures', 'Techniques', 'Algorithms', 'Demos', 'More']
+ALGORITHMS_ORDER = [
+    'Introduction', 'Brute Force', 'Exhaustive Search', 'Divide-and-Conquer', 'Decrease-and-Conquer',
+    'Greedy', 'Greedy Algorithms', 'Dynamic Programming', 'Transform-and-Conquer', 'Space-Time Tradeoff',
+    'Backtracking', 'Branch-and-Bound', 'Randomized',
+]
+MENU_ORDERS = {
+    'Problems/': ['Problem List', 'Foundational', 'Optimization', 'Geometry', 'Graphs', 'Other'],
+    'Algorithms/': ALGORITHMS_ORDER,
+    'Techniques/': ALGORITHMS_ORDER,
+    'Demos/': ALGORITHMS_ORDER,
+    'Techniques/Decrease-and-Conquer/': [
+        'Introduction', 'Decrease-by-a-Constant', 'Decrease-by-a-Constant-Factor', 'Variable-Size-Decrease', 'Summary',
+    ],
+}
+# The pre-rendered menu in index.html sits between these markers
+MENU_MARKER_PATTERN = re.compile(r"(<!-- menu:start -->)(.*?)(<!-- menu:end -->)", re.DOTALL)
+
+def list_dir(current_path, snapshot=None):
+    """
+    Sorted [name, is_dir] entries of current_path (directories and .html files only).
+    With a snapshot dict, a cached listing is reused while the directory's mtime is unchanged.
+    """
+    mtime_ns = os.stat(current_path).st_mtime_ns
+    if snapshot is not None:
+        cached = snapshot['old'].get(current_path)
+        if cached and cached['mtime_ns'] == mtime_ns:
+            snapshot['new'][current_path] = cached
+            return cached['entries']
+        snapshot['rescanned'] += 1
+    entries = []
+    with os.scandir(current_path) as it:
+        for entry in sorted(it, key=lambda e: e.name):
+            if entry.is_dir():
+                entries.append([entry.name, True])
+            elif entry.name.endswith('.html'):
+                entries.append([entry.name, False])
+    if snapshot is not None:
+        snapshot['new'][current_path] = {'mtime_ns': mtime_ns, 'entries': entries}
+    return entries
+
+def scan_dir(current_path, path_prefix="", draft_accumulator=None, snapshot=None):
     items = []
-    for entry in sorted(os.listdir(current_path)):
+    for entry, is_dir in list_dir(current_path, snapshot):
         entry_path = os.path.join(current_path, entry)
-        if os.path.isdir(entry_path):
+        if is_dir:
             # Skip directories like 'old', 'images', or 'figures' (any capitalization)
             if entry.lower() in IGNORE_DIRS:
                 continue
-            sub = scan_dir(entry_path, path_prefix + entry + "/", draft_accumulator)
+            sub = scan_dir(entry_path, path_prefix + entry + "/", draft_accumulator, snapshot)
             if sub:
                 items.append({entry: sub})
-        elif entry.endswith('.html'):
-            if "DRAFT" in entry.upper():
-                if draft_accumulator is not None:
-                    draft_accumulator.append(path_prefix + entry)
-            else:
-                items.append(entry)
+        elif "DRAFT" in entry.upper():
+            if draft_accumulator is not None:
+                draft_accumulator.append(path_prefix + entry)
+        else:
+            items.append(entry)
     return items
-def build_chapters_json(base_dir='/home/cusack/public_html/Algorithms/Content'):
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = None
+    dirs = data.get('dirs', {}) if isinstance(data, dict) and data.get('format') == SNAPSHOT_FORMAT else {}
+    return {'old': dirs, 'new': {}, 'rescanned': 0}
+
+def save_snapshot(snapshot, path=SNAPSHOT_PATH):
+    # Only directories visited this run are kept, so removed ones drop out
+    write_if_changed(path, json.dumps({'format': SNAPSHOT_FORMAT, 'dirs': snapshot['new']}, sort_keys=True).encode('utf-8'))
+
+def write_if_changed(path, data):
+    """Atomically replace path with data (bytes) unless it already holds exactly those bytes. Returns True if written."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+def collect_chapters(base_dir=CONTENT_DIR, snapshot=None):
     chapters = {}
     drafts = []
-    for chapter_dir in sorted(os.listdir(base_dir)):
-        chapter_path = os.path.join(base_dir, chapter_dir)
-        if os.path.isdir(chapter_path):
-            # Apply the same ignore filter at the top level
-            if chapter_dir.lower() in IGNORE_DIRS:
-                continue
-            chapters[chapter_dir] = scan_dir(chapter_path, chapter_dir + "/", drafts)
+    for chapter_dir, is_dir in list_dir(base_dir, snapshot):
+        # Apply the same ignore filter at the top level
+        if not is_dir or chapter_dir.lower() in IGNORE_DIRS:
+            continue
+        chapters[chapter_dir] = scan_dir(os.path.join(base_dir, chapter_dir), chapter_dir + "/", drafts, snapshot)
     if drafts:
         chapters.setdefault("More", []).append({"DRAFTS": sorted(drafts)})
+    return chapters
+
+def chapters_from_paths(top_dirs, html_paths):
+    """
+    Same structure as collect_chapters, built from a walk that has already been done:
+    the directory names directly under Content plus Content-relative, '/'-separated .html paths.
+    """
+    tree = {}
+    for rel in html_paths:
+        parts = rel.split('/')
+        if len(parts) < 2 or not parts[-1].endswith('.html'):
+            continue
+        if any(part.lower() in IGNORE_DIRS for part in parts[:-1]):
+            continue
+        node = tree
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = None
+
+    drafts = []
+    def emit(node, path_prefix):
+        items = []
+        for name in sorted(node):
+            child = node[name]
+            if child is not None:
+                sub = emit(child, path_prefix + name + "/")
+                if sub:
+                    items.append({name: sub})
+            elif "DRAFT" in name.upper():
+                drafts.append(path_prefix + name)
+            else:
+                items.append(name)
+        return items
 
-    with open('/home/cusack/public_html/Algorithms/scripts/chapters.json', 'w') as f:
-        json.dump(chapters, f, indent=2)
+    chapters = {}
+    for chapter_dir in sorted(top_dirs):
+        if chapter_dir.lower() in IGNORE_DIRS:
+            continue
+        chapters[chapter_dir] = emit(tree.get(chapter_dir, {}), chapter_dir + "/")
+    if drafts:
+        chapters.setdefault("More", []).append({"DRAFTS": sorted(drafts)})
+    return chapters
 
+def build_chapters_json(base_dir=CONTENT_DIR, out_path=CHAPTERS_JSON, snapshot=None, menu_dir=MENU_DATA_DIR):
+    chapters = collect_chapters(base_dir, snapshot)
+    write_if_changed(out_path, json.dumps(chapters, indent=2).encode('utf-8'))
+    write_menu_data(chapters, menu_dir)
     return chapters
-def load_chapters_json():
-    with open('chapters.json', 'r') as f:
+
+def compact_items(items):
+    """
+    A chapter's entries in the client's compact form: page names without .html and
+    [dir, entries] pairs for directories, so a shared path prefix is spelled out once.
+    """
+    out = []
+    for item in items:
+        if isinstance(item, str):
+            out.append(item[:-5] if item.endswith('.html') else item)
+        else:
+            for name, sub in item.items():
+                out.append([name, compact_items(sub)])
+    return out
+
+def write_menu_data(chapters, out_dir=MENU_DATA_DIR):
+    """
+    Write index.json ({chapters: {name: {file, pages}}}) and one content-hashed file per chapter,
+    deleting chapter files no longer listed. Returns (index.json written, files removed).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    index = {}
+    files = set()
+    for name, items in chapters.items():
+        data = json.dumps(compact_items(items), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        fn = f"{re.sub(r'[^A-Za-z0-9]+', '-', name).strip('-')}.{hashlib.sha256(data).hexdigest()[:12]}.json"
+        write_if_changed(os.path.join(out_dir, fn), data)
+        files.add(fn)
+        index[name] = {'file': fn, 'pages': len(build_menu_paths({name: items}))}
+    wrote = write_if_changed(
+        os.path.join(out_dir, 'index.json'),
+        json.dumps({'chapters': index}, separators=(',', ':'), ensure_ascii=False).encode('utf-8'),
+    )
+    stale = [fn for fn in os.listdir(out_dir) if fn.endswith('.json') and fn != 'index.json' and fn not in files]
+    for fn in stale:
+        os.remove(os.path.join(out_dir, fn))
+    return wrote, len(stale)
+
+def load_chapters_json(path=CHAPTERS_JSON):
+    with open(path, 'r') as f:
         return json.load(f)
 
 def build_menu_paths(chapters):
@@ -67,18 +226,98 @@ def build_menu_paths(chapters):
             all_paths.append(path)
     return all_paths
 
-def write_sitemap(paths):
+def render_sitemap(paths, site_root=SITE_ROOT):
     urlset = ET.Element("urlset", xmlns="http://www.sitemaps.org/schemas/sitemap/0.9")
     for path in paths:
         url = ET.SubElement(urlset, "url")
         loc = ET.SubElement(url, "loc")
         # This matches your menu link logic: ?path=...
-        loc.text = f"{SITE_ROOT}?path={urllib.parse.quote(path, safe='')}"
-    tree = ET.ElementTree(urlset)
-    tree.write("/home/cusack/public_html/Algorithms/scripts/sitemap.xml", encoding="utf-8", xml_declaration=True)
+        loc.text = f"{site_root}?path={urllib.parse.quote(path, safe='')}"
+    return ET.tostring(urlset, encoding="utf-8", xml_declaration=True)
 
-if __name__ == "__main__":
-    chapters = build_chapters_json()
+def write_sitemap(paths, out_path=SITEMAP_XML, site_root=SITE_ROOT):
+    return write_if_changed(out_path, render_sitemap(paths, site_root))
+
+def _font_size(level):
+    return f"{round(1 - (level - 1) * 0.1, 2):g}em"
+
+def _menu_key(item):
+    # File name without .html, or the directory name of a {dir: items} entry
+    if isinstance(item, str):
+        return item[:-5] if item.endswith('.html') else item
+    return next(iter(item))
+
+def _menu_link(full_path, label, level):
+    href = '?path=' + urllib.parse.quote(full_path, safe="!~*'()")
+    return f'<li><a href="{html.escape(href)}" style="font-size: {_font_size(level)};">{html.escape(label)}</a></li>'
+
+def render_menu_html(chapters):
+    """
+    The grouped menu as buildMenu in loadContent.js builds it (<li> items for the #menu list),
+    so the page can show it before any script runs.
+    """
+    def render(items, path_prefix, level, out):
+        order = MENU_ORDERS.get(path_prefix, [])
+        rank = lambda item: order.index(_menu_key(item)) if _menu_key(item) in order else 9999
+        for item in sorted(items, key=rank):
+            if isinstance(item, str):
+                raw = _menu_key(item)
+                # DRAFTS entries are already full paths
+                full_path = raw if 'More/DRAFTS' in path_prefix and '/' in raw else path_prefix + raw
+                label = raw.split('/')[-1]
+                label = (label[:-4] if label.endswith('Demo') else label).strip()
+                out.append(_menu_link(full_path, label, level))
+                continue
+            for name, sub in item.items():
+                out.append(f'<li><span style="font-size: {_font_size(level)};">{html.escape(name)}</span><ul>')
+                render(sub, f"{path_prefix}{name}/", level + 1, out)
+                out.append('</ul></li>')
+
+    out = []
+    for section in TOP_LEVEL_ORDER:
+        if section not in chapters:
+            continue
+        out.append(f'<li><span style="font-size: 1.1em;">{html.escape(section)}</span><ul>')
+        render(chapters[section], section + '/', 1, out)
+        out.append('</ul></li>')
+    return '\n'.join(out)
+
+def write_index_menu(chapters, index_html=INDEX_HTML):
+    """Inline the rendered menu into index.html between its menu markers. Returns True if written."""
+    with open(index_html, 'r', encoding='utf-8') as f:
+        page = f.read()
+    menu = render_menu_html(chapters)
+    new_page, n = MENU_MARKER_PATTERN.subn(lambda m: f"{m.group(1)}\n{menu}\n{m.group(3)}", page, count=1)
+    if not n:
+        return False
+    return write_if_changed(index_html, new_page.encode('utf-8'))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build scripts/chapters.json and sitemap.xml from the Content tree.')
+    parser.add_argument('--content-dir', default=CONTENT_DIR, help='Content root to scan.')
+    parser.add_argument('--chapters-json', default=CHAPTERS_JSON, help='Where to write chapters.json.')
+    parser.add_argument('--sitemap', default=SITEMAP_XML, help='Where to write sitemap.xml.')
+    parser.add_argument('--site-root', default=SITE_ROOT, help='Base URL used for sitemap entries.')
+    parser.add_argument('--index-html', default=INDEX_HTML, help='Page the rendered menu is inlined into.')
+    parser.add_argument('--menu-dir', default=MENU_DATA_DIR, help='Where to write the per-chapter menu data.')
+    parser.add_argument('--snapshot', default=SNAPSHOT_PATH, help='Directory snapshot used to skip unchanged subtrees.')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the snapshot and rescan every directory.')
+    args = parser.parse_args(argv)
+
+    snapshot = load_snapshot(args.snapshot) if not args.no_cache else {'old': {}, 'new': {}, 'rescanned': 0}
+    chapters = collect_chapters(args.content_dir, snapshot)
+    wrote_json = write_if_changed(args.chapters_json, json.dumps(chapters, indent=2).encode('utf-8'))
     menu_paths = build_menu_paths(chapters)
-    write_sitemap(menu_paths)
-    # print(f"Created chapters.json and sitemap.xml with {len(menu_paths)} entries.")
+    wrote_sitemap = write_sitemap(menu_paths, args.sitemap, args.site_root)
+    wrote_index = write_index_menu(chapters, args.index_html)
+    wrote_menu, removed = write_menu_data(chapters, args.menu_dir)
+    save_snapshot(snapshot, args.snapshot)
+
+    status = lambda wrote: 'updated' if wrote else 'unchanged'
+    print(f"{len(menu_paths)} menu entries; rescanned {snapshot['rescanned']} of {len(snapshot['new'])} dir(s); "
+          f"chapters.json {status(wrote_json)}, sitemap.xml {status(wrote_sitemap)}, index.html menu {status(wrote_index)}, "
+          f"menu/index.json {status(wrote_menu)} ({removed} stale chapter file(s) removed).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Content-hash fingerprinting for site assets.
+
+Every CSS/JS/JSON asset and every Content page gets a short hash of its bytes.
+<link href> / <script src> references to local assets in index.html and the
+Content pages are rewritten to carry ?v=<hash> (replacing any older ?v=/?f=
+query), so a URL only changes when the file does and the files can be served
+with immutable caching. The full map goes to scripts/asset-manifest.json and is
+inlined into index.html as <script id="asset-versions">, which loadContent.js
+uses for the URLs it builds at runtime (pages, demos, glossary files).
+"""
+import os
+import re
+import sys
+import glob
+import json
+import hashlib
+import argparse
+import posixpath
+from urllib.parse import unquote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import add_collapsible_sections as acs  # type: ignore
+import create_JSON  # type: ignore
+
+CONTENT_DIR = os.path.join(ROOT, 'Content')
+INDEX_HTML = os.path.join(ROOT, 'index.html')
+MANIFEST_PATH = os.path.join(ROOT, 'scripts', 'asset-manifest.json')
+# Absolute references in pages are written against the site's mount point
+SITE_PREFIX = '/Algorithms/'
+HASH_LEN = 10
+
+ASSET_GLOBS = (
+    'css/*.css',
+    'scripts/*.js',
+    'scripts/*.json',
+    'scripts/Strassen/*.js',
+    'scripts/MatrixDAC/*.js',
+    'scripts/search-index/index.json',
+    'scripts/menu/index.json',
+)
+
+REF_PATTERN = re.compile(r"(<(?:link|script)\b[^>]*?\b(?:href|src)=\")([^\"]+)(\")", re.IGNORECASE)
+INLINE_PATTERN = re.compile(r"(<script id=\"asset-versions\" type=\"application/json\">)(.*?)(</script>)", re.DOTALL)
+
+def file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:HASH_LEN]
+
+def asset_hashes(root: str = ROOT) -> dict[str, str]:
+    """{repo-relative path: hash} for the static assets (not pages)."""
+    out = {}
+    for pattern in ASSET_GLOBS:
+        for path in glob.glob(os.path.join(root, pattern)):
+            rel = os.path.relpath(path, root).replace(os.sep, '/')
+            if os.path.abspath(path) != MANIFEST_PATH:
+                out[rel] = file_hash(path)
+    return dict(sorted(out.items()))
+
+def page_hashes(content_dir: str = CONTENT_DIR, root: str = ROOT) -> dict[str, str]:
+    out = {}
+    for r, _dirs, fns in os.walk(content_dir):
+        for fn in fns:
+            if fn.lower().endswith('.html'):
+                path = os.path.join(r, fn)
+                out[os.path.relpath(path, root).replace(os.sep, '/')] = file_hash(path)
+    return dict(sorted(out.items()))
+
+def resolve_ref(url: str, page_rel: str) -> str | None:
+    """Repo-relative path a reference from page_rel points to, or None for external/unknown URLs."""
+    if re.match(r"^[a-zA-Z][\w+.-]*:|^//", url):
+        return None
+    path = unquote(url.split('#', 1)[0].split('?', 1)[0])
+    if path.startswith(SITE_PREFIX):
+        return path[len(SITE_PREFIX):]
+    if path.startswith('/') or not path:
+        return None
+    return posixpath.normpath(posixpath.join(posixpath.dirname(page_rel), path))
+
+def rewrite_references(html: str, page_rel: str, hashes: dict[str, str]) -> str:
+    """Point every local <link>/<script> reference in html (at repo path page_rel) at ?v=<hash>."""
+    def repl(m: re.Match) -> str:
+        url = m.group(2)
+        key = resolve_ref(url, page_rel)
+        if key not in hashes:
+            return m.group(0)
+        base, _hash, fragment = url.partition('#')
+        base = base.split('?', 1)[0]
+        new_url = f"{base}?v={hashes[key]}" + (f"#{fragment}" if fragment else '')
+        return m.group(1) + new_url + m.group(3)
+    return REF_PATTERN.sub(repl, html)
+
+def update_index_html(html: str, versions: dict[str, str]) -> str:
+    """index.html with fingerprinted references and the inline asset-versions map."""
+    html = rewrite_references(html, 'index.html', versions)
+    payload = json.dumps(versions, separators=(',', ':'), ensure_ascii=False).replace('</', '<\\/')
+    return INLINE_PATTERN.sub(lambda m: m.group(1) + payload + m.group(3), html, count=1)
+
+def write_manifest(root: str = ROOT, content_dir: str = CONTENT_DIR, index_html: str = INDEX_HTML,
+                   manifest_path: str = MANIFEST_PATH) -> tuple[dict[str, str], bool, bool]:
+    """
+    Hash assets and pages as they are now, write the manifest and refresh index.html.
+    Run after everything else that writes assets or pages. Returns (versions, manifest written, index.html written).
+    """
+    versions = {**asset_hashes(root), **page_hashes(content_dir, root)}
+    wrote_manifest = create_JSON.write_if_changed(
+        manifest_path, (json.dumps(versions, indent=1, ensure_ascii=False) + '\n').encode('utf-8'))
+    html = acs.read_text_best_effort(index_html)
+    new_html = update_index_html(html, versions)
+    wrote_index = new_html != html
+    if wrote_index:
+        acs.write_text_utf8(index_html, new_html)
+    return versions, wrote_manifest, wrote_index
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Fingerprint asset references by content hash and write the asset manifest.')
+    parser.add_argument('--dry-run', action='store_true', help='Report pages whose references would change without writing.')
+    args = parser.parse_args(argv)
+
+    hashes = asset_hashes()
+    changed = 0
+    for r, _dirs, fns in os.walk(CONTENT_DIR):
+        for fn in sorted(fns):
+            if not fn.lower().endswith('.html'):
+                continue
+            path = os.path.join(r, fn)
+            html = acs.read_text_best_effort(path)
+            new_html = rewrite_references(html, os.path.relpath(path, ROOT).replace(os.sep, '/'), hashes)
+            if new_html == html:
+                continue
+            changed += 1
+            if not args.dry_run:
+                acs.write_text_utf8(path, new_html)
+            print(f"{'Would update' if args.dry_run else 'Updated'}: {os.path.relpath(path, ROOT)}")
+    if args.dry_run:
+        print(f"{changed} page(s) would change; {len(hashes)} asset(s) hashed.")
+        return 0
+    versions, wrote_manifest, wrote_index = write_manifest()
+    status = lambda wrote: 'updated' if wrote else 'unchanged'
+    print(f"Updated {changed} page(s); {len(versions)} file(s) in the manifest; "
+          f"asset-manifest.json {status(wrote_manifest)}, index.html {status(wrote_index)}.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
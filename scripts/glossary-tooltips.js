@@ -6,7 +6,36 @@
 let GLOSSARY = [];
 
 function initGlossaryTooltips() {
-  fetch("/Algorithms/scripts/glossary-data.json?cb=" + Date.now(), { cache: "no-store" })
+  // Pages built by scripts/glossary_wrap.py name a content-hashed shard with only
+  // the definitions they use; it never changes, so the normal HTTP cache applies.
+  const marker = document.querySelector('meta[name="glossary-prewrapped"]');
+  if (marker) {
+    const shard = marker.getAttribute("data-shard");
+    if (!shard) return; // no glossary terms on this page
+    fetch(shard)
+      .then(res => {
+        if (!res.ok) throw new Error("Failed to load " + shard);
+        return res.json();
+      })
+      .then(definitions => {
+        GLOSSARY = Object.entries(definitions).map(([term, definition]) => ({ variants: [term], definition }));
+        scheduleBuildAndWrap();
+      })
+      .catch(err => {
+        // A missing or stale shard falls back to the full glossary
+        console.warn("Error loading glossary shard, using the full glossary:", err);
+        loadFullGlossary();
+      });
+    return;
+  }
+  loadFullGlossary();
+}
+
+function loadFullGlossary() {
+  // Versioned URL from the host page when it knows the file's hash, else bypass the cache
+  let dataUrl = null;
+  try { dataUrl = window.parent.versionedAssetUrl?.("/Algorithms/scripts/glossary-data.json") || null; } catch {}
+  fetch(dataUrl || "/Algorithms/scripts/glossary-data.json?cb=" + Date.now(), dataUrl ? {} : { cache: "no-store" })
     .then(res => {
       if (!res.ok) throw new Error("Failed to load glossary-data.json");
       return res.json();
@@ -194,6 +223,18 @@ function positionTooltipAt(x, y, tip) {
 function buildAndWrap() {
   if (document.body.classList.contains("no-tooltips")) return;
 
+  // Pages built by scripts/glossary_wrap.py already carry the term spans;
+  // only attach the tooltips instead of matching every term again.
+  const prewrapped = document.querySelectorAll(".glossary-term[data-term]");
+  if (document.querySelector('meta[name="glossary-prewrapped"]') && prewrapped.length) {
+    const definitions = new Map(GLOSSARY.map(({ variants, definition }) => [variants[0], definition]));
+    prewrapped.forEach(span => {
+      const definition = definitions.get(span.getAttribute("data-term"));
+      if (definition !== undefined) attachTooltip(span, definition);
+    });
+    return;
+  }
+
   const rootEl = document.querySelector("#content")
                 || document.querySelector("main")
                 || document.body;
@@ -290,28 +331,7 @@ function buildAndWrap() {
       span.style.whiteSpace = "nowrap";
       span.setAttribute("data-term", canonical);
       span.textContent = matchText;
-
-      const tip = document.createElement("span");
-      tip.className = "tooltip-content";
-      /*tip.textContent = definition;*/
-      tip.innerHTML = definition;
-      tip.style.display = "none";
-      tip.style.fontStyle = "normal";
-      span.appendChild(tip);
-
-      let hoverTimeout;
-      span.addEventListener("mouseenter", evt => {
-        span.classList.add('highlighted');
-        hoverTimeout = setTimeout(() => {
-          positionTooltipAt(evt.clientX, evt.clientY, tip);
-        }, 1000);
-      });
-      span.addEventListener("mouseleave", () => {
-        span.classList.remove('highlighted');
-        tip.style.display = 'none';
-        clearTimeout(hoverTimeout);
-        tip.classList.remove("to-right","to-left","to-center");
-      });
+      attachTooltip(span, definition);
 
       frag.appendChild(span);
       idx = end;
@@ -322,5 +342,30 @@ function buildAndWrap() {
   });
 }
 
+// Add the (hidden) definition and hover behaviour to one .glossary-term span
+function attachTooltip(span, definition) {
+  const tip = document.createElement("span");
+  tip.className = "tooltip-content";
+  /*tip.textContent = definition;*/
+  tip.innerHTML = definition;
+  tip.style.display = "none";
+  tip.style.fontStyle = "normal";
+  span.appendChild(tip);
+
+  let hoverTimeout;
+  span.addEventListener("mouseenter", evt => {
+    span.classList.add('highlighted');
+    hoverTimeout = setTimeout(() => {
+      positionTooltipAt(evt.clientX, evt.clientY, tip);
+    }, 1000);
+  });
+  span.addEventListener("mouseleave", () => {
+    span.classList.remove('highlighted');
+    tip.style.display = 'none';
+    clearTimeout(hoverTimeout);
+    tip.classList.remove("to-right","to-left","to-center");
+  });
+}
+
 // Initialize tooltips
 initGlossaryTooltips();
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Build-time glossary term wrapping.
+
+Does at build time what glossary-tooltips.js buildAndWrap() used to do in every
+visitor's browser: find glossary variants in the page's text nodes and wrap them in
+<span class="glossary-term" data-term="...">. All variants are compiled into one
+Aho-Corasick automaton over case-folded text with separator runs collapsed, which
+reproduces the client's rules:
+- parts of a variant may be joined by any run of whitespace/hyphens
+- no ASCII word character or hyphen directly before or after a match
+- per entry, the first listed variant that matches at a position wins
+- overlaps across entries resolve to the earliest start, then the longest match,
+  then the entry with the longest canonical name
+Text under the client's SKIP tags (and inside .tooltip-content / existing
+.glossary-term spans) is left alone. Processed pages get a
+<meta name="glossary-prewrapped"> so the client only attaches behaviour; its
+data-shard names a content-hashed JSON file holding just the definitions that
+page uses, so visitors never download the whole glossary.
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from html import escape, unescape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import add_collapsible_sections as acs  # type: ignore
+
+GLOSSARY_PATH = os.path.join(ROOT, 'scripts', 'glossary-data.json')
+# Per-page definition shards, named by content hash so they can be cached forever
+SHARD_DIR = os.path.join(ROOT, 'scripts', 'glossary-shards')
+SHARD_URL = '/Algorithms/scripts/glossary-shards/'
+CONTENT_DIR = os.path.join(ROOT, 'Content')
+
+# Same list as glossary-tooltips.js, plus TEXTAREA whose content is raw text
+SKIP_TAGS = {
+    'style', 'script', 'a', 'h1', 'h2', 'h3', 'th', 'code', 'pre', 'b', 'button',
+    'input', 'option', 'title', 'svg', 'figure', 'strong', 'textarea',
+}
+RAW_TEXT_TAGS = {'script', 'style', 'textarea', 'title'}
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr',
+}
+SKIP_CLASSES = {'tooltip-content', 'glossary-term'}
+
+# JavaScript's \s (what [\s-]+ splits and joins on in the client)
+JS_SPACE = set('\t\n\v\f\r \u00a0\u1680\u2028\u2029\u202f\u205f\u3000\ufeff') | {chr(c) for c in range(0x2000, 0x200b)}
+SEPARATORS = JS_SPACE | {'-'}
+
+TAG_PATTERN = re.compile(
+    r"<!--.*?-->|<![^>]*>|<\?[^>]*>|<(/?)([a-zA-Z][\w:-]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>",
+    re.DOTALL,
+)
+ENTITY_PATTERN = re.compile(r"&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);")
+CLASS_ATTR_PATTERN = re.compile(r"\bclass\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))", re.IGNORECASE)
+ID_CONTENT_PATTERN = re.compile(r"\bid\s*=\s*(?:\"content\"|'content'|content(?=[\s/>]))", re.IGNORECASE)
+MARKER_PATTERN = re.compile(r"[ \t]*<meta name=\"glossary-prewrapped\"[^>]*>\n?")
+SHARD_REF_PATTERN = re.compile(r"<meta name=\"glossary-prewrapped\"[^>]*\bdata-shard=\"[^\"]*/([0-9a-f]+\.json)\"")
+WRAPPED_PATTERN = re.compile(r"<span class=\"glossary-term\" data-term=\"[^\"]*\" style=\"white-space:nowrap\">([^<]*)</span>")
+
+def load_glossary(path: str = GLOSSARY_PATH) -> list[dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _fold(ch: str) -> str:
+    low = ch.lower()
+    return low if len(low) == 1 else ch
+
+def _is_word_or_hyphen(ch: str) -> bool:
+    # JavaScript [\w-] without the u flag: ASCII letters, digits, underscore, hyphen
+    return ch == '-' or ch == '_' or ('0' <= ch <= '9') or ('a' <= ch <= 'z') or ('A' <= ch <= 'Z')
+
+def _normalize_variant(variant: str) -> str:
+    # Mirror v.split(/[\s-]+/).join('[\\s-]+') on case-folded text; one ' ' stands for a separator run
+    out = []
+    in_sep = False
+    for ch in variant:
+        if ch in SEPARATORS:
+            if not in_sep:
+                out.append(' ')
+            in_sep = True
+        else:
+            out.append(_fold(ch))
+            in_sep = False
+    return ''.join(out)
+
+def compile_glossary(entries: list[dict]) -> dict:
+    """
+    Compile every variant into one Aho-Corasick automaton.
+    Entries are ranked like the client (longest canonical first, stable), and each
+    pattern output is (length, rank, variant_index).
+    """
+    ranked = sorted(range(len(entries)), key=lambda i: -len(entries[i]['variants'][0]))
+    terms = []
+    goto: list[dict] = [{}]
+    outputs: list[list] = [[]]
+    for rank, i in enumerate(ranked):
+        entry = entries[i]
+        terms.append({'canonical': entry['variants'][0], 'definition': entry.get('definition', '')})
+        for vi, variant in enumerate(entry['variants']):
+            pattern = _normalize_variant(variant)
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                node = nxt
+            outputs[node].append((len(pattern), rank, vi))
+
+    # Breadth-first failure links; outputs are merged along them
+    fail = [0] * len(goto)
+    queue = list(goto[0].values())
+    head = 0
+    while head < len(queue):
+        node = queue[head]
+        head += 1
+        for ch, nxt in goto[node].items():
+            queue.append(nxt)
+            if node:
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+            outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+
+    digest = hashlib.sha256(json.dumps(entries, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    return {'goto': goto, 'fail': fail, 'outputs': outputs, 'terms': terms, 'hash': digest}
+
+def _decode(raw: str) -> tuple[str, list[int], list[int]]:
+    """Decode entities; returns (text, raw start of each char, raw end of each char)."""
+    chars: list[str] = []
+    starts: list[int] = []
+    ends: list[int] = []
+    pos = 0
+    for m in ENTITY_PATTERN.finditer(raw):
+        for k in range(pos, m.start()):
+            chars.append(raw[k])
+            starts.append(k)
+            ends.append(k + 1)
+        decoded = unescape(m.group(0))
+        for ch in decoded:
+            chars.append(ch)
+            starts.append(m.start())
+            ends.append(m.end())
+        pos = m.end()
+    for k in range(pos, len(raw)):
+        chars.append(raw[k])
+        starts.append(k)
+        ends.append(k + 1)
+    return ''.join(chars), starts, ends
+
+def find_terms(raw: str, matcher: dict) -> list[tuple[int, int, int]]:
+    """Non-overlapping (raw_start, raw_end, rank) glossary matches in one raw text segment."""
+    text, raw_starts, raw_ends = _decode(raw)
+    # Fold case and collapse separator runs, remembering each normalized char's decoded span
+    norm: list[str] = []
+    d_start: list[int] = []
+    d_end: list[int] = []
+    for k, ch in enumerate(text):
+        if ch in SEPARATORS:
+            if norm and norm[-1] == ' ':
+                d_end[-1] = k + 1
+                continue
+            norm.append(' ')
+        else:
+            norm.append(_fold(ch))
+        d_start.append(k)
+        d_end.append(k + 1)
+
+    goto, fail, outputs = matcher['goto'], matcher['fail'], matcher['outputs']
+    # best[rank][start] = (variant_index, end) of the first-listed variant matching there
+    best: dict[int, dict[int, tuple[int, int]]] = {}
+    node = 0
+    for j, ch in enumerate(norm):
+        while node and ch not in goto[node]:
+            node = fail[node]
+        node = goto[node].get(ch, 0)
+        for length, rank, vi in outputs[node]:
+            a = d_start[j - length + 1]
+            b = d_end[j]
+            if a > 0 and _is_word_or_hyphen(text[a - 1]):
+                continue
+            if b < len(text) and _is_word_or_hyphen(text[b]):
+                continue
+            per_start = best.setdefault(rank, {})
+            prev = per_start.get(a)
+            if prev is None or vi < prev[0]:
+                per_start[a] = (vi, b)
+
+    # Each entry's regex is global: its own matches never overlap one another
+    candidates = []
+    for rank, per_start in best.items():
+        last_end = 0
+        for a in sorted(per_start):
+            if a < last_end:
+                continue
+            b = per_start[a][1]
+            candidates.append((a, -b, rank))
+            last_end = b
+    candidates.sort()
+
+    keep = []
+    last_end = 0
+    for a, neg_b, rank in candidates:
+        if a >= last_end:
+            keep.append((raw_starts[a], raw_ends[-neg_b - 1], rank))
+            last_end = -neg_b
+    return keep
+
+def _classes(attrs: str) -> set[str]:
+    m = CLASS_ATTR_PATTERN.search(attrs)
+    if not m:
+        return set()
+    return set((m.group(1) or m.group(2) or m.group(3) or '').split())
+
+def _root_selector(html: str) -> str:
+    # glossary-tooltips.js wraps inside #content, else <main>, else <body>
+    for m in TAG_PATTERN.finditer(html):
+        if m.group(2) and not m.group(1) and ID_CONTENT_PATTERN.search(m.group(3)):
+            return 'content'
+    return 'main' if re.search(r"<main\b", html, re.IGNORECASE) else 'body'
+
+def iter_text_segments(html: str):
+    """
+    Yield (start, end) of each text run a tree walker over the glossary root would accept.
+    Tracks an element stack, closing th/td/tr/option/li implicitly like a browser would.
+    """
+    root = _root_selector(html)
+    stack: list[tuple[str, bool, bool]] = []  # (tag, skip, is_root)
+    in_root = 0
+    skip_depth = 0
+    pos = 0
+    implicit = {
+        'td': {'td', 'th'}, 'th': {'td', 'th'}, 'tr': {'td', 'th', 'tr'},
+        'option': {'option'}, 'li': {'li'},
+    }
+
+    def pop_until(names: set[str], stop: set[str]):
+        nonlocal in_root, skip_depth
+        while stack and stack[-1][0] in names and stack[-1][0] not in stop:
+            tag, skip, is_root = stack.pop()
+            skip_depth -= skip
+            in_root -= is_root
+
+    while True:
+        m = TAG_PATTERN.search(html, pos)
+        end = m.start() if m else len(html)
+        if end > pos and in_root and not skip_depth:
+            yield pos, end
+        if not m:
+            return
+        pos = m.end()
+        if not m.group(2):
+            continue  # comment, doctype or processing instruction
+        closing, tag, attrs = m.group(1), m.group(2).lower(), m.group(3)
+        if closing:
+            if any(t == tag for t, _s, _r in stack):
+                while stack:
+                    t, skip, is_root = stack.pop()
+                    skip_depth -= skip
+                    in_root -= is_root
+                    if t == tag:
+                        break
+            continue
+        if tag in implicit:
+            pop_until(implicit[tag], {'table', 'select', 'ul', 'ol'})
+        is_root = not in_root and (
+            (root == 'content' and ID_CONTENT_PATTERN.search(attrs) is not None) or root == tag
+        )
+        skip = tag in SKIP_TAGS or bool(_classes(attrs) & SKIP_CLASSES)
+        if tag in RAW_TEXT_TAGS:
+            close = re.compile(rf"</{tag}\s*>", re.IGNORECASE).search(html, pos)
+            pos = close.end() if close else len(html)
+            continue
+        if tag in VOID_TAGS or attrs.rstrip().endswith('/'):
+            continue
+        stack.append((tag, skip, is_root))
+        skip_depth += skip
+        in_root += is_root
+
+def unwrap_glossary_terms(html: str) -> str:
+    """Remove spans and the marker added by a previous run, so a rerun starts from the authored text."""
+    return MARKER_PATTERN.sub('', WRAPPED_PATTERN.sub(r"\1", html))
+
+def glossary_shard(definitions: dict[str, str]) -> tuple[str, bytes]:
+    """(file name, bytes) of the shard holding these {canonical: definition} pairs."""
+    data = json.dumps(definitions, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:16] + '.json', data
+
+def write_shard(name: str, data: bytes, shard_dir: str = SHARD_DIR) -> None:
+    # Content-addressed: an existing file already has the right bytes
+    path = os.path.join(shard_dir, name)
+    if os.path.exists(path):
+        return
+    os.makedirs(shard_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def wrap_glossary_terms(html: str, matcher: dict, shard_dir: str | None = SHARD_DIR) -> str:
+    """
+    Return html with glossary terms pre-wrapped and the glossary-prewrapped marker in <head>.
+    The definitions used are written as a shard under shard_dir (skipped when shard_dir is None).
+    """
+    # The marker stays put: other stages also insert before </head>, and moving it would swap places with them
+    html = WRAPPED_PATTERN.sub(r"\1", html)
+    body_m = re.search(r"<body\b([^>]*)>", html, re.IGNORECASE)
+    head_close = re.search(r"</head\s*>", html, re.IGNORECASE)
+    if not body_m or not head_close:
+        return html
+    out = []
+    pos = 0
+    used: dict[str, str] = {}
+    if 'no-tooltips' not in _classes(body_m.group(1)):
+        terms = matcher['terms']
+        for start, end in iter_text_segments(html):
+            for a, b, rank in find_terms(html[start:end], matcher):
+                term = terms[rank]
+                used[term['canonical']] = term['definition']
+                out.append(html[pos:start + a])
+                out.append(f'<span class="glossary-term" data-term="{escape(term["canonical"], quote=True)}" style="white-space:nowrap">{html[start + a:start + b]}</span>')
+                pos = start + b
+    out.append(html[pos:])
+    html = ''.join(out)
+
+    marker = f'<meta name="glossary-prewrapped" content="{matcher["hash"]}"'
+    if used:
+        name, data = glossary_shard(used)
+        if shard_dir is not None:
+            write_shard(name, data, shard_dir)
+        marker += f' data-shard="{SHARD_URL}{name}"'
+    marker += '>\n'
+    existing = MARKER_PATTERN.search(html)
+    if existing:
+        indent = existing.group(0)[:len(existing.group(0)) - len(existing.group(0).lstrip(' \t'))]
+        return html[:existing.start()] + indent + marker + MARKER_PATTERN.sub('', html[existing.end():])
+    head_close = re.search(r"</head\s*>", html, re.IGNORECASE)
+    line_start = html.rfind('\n', 0, head_close.start()) + 1
+    if html[line_start:head_close.start()].strip():
+        line_start = head_close.start()
+    return html[:line_start] + marker + html[line_start:]
+
+def prune_shards(content_dir: str = CONTENT_DIR, shard_dir: str = SHARD_DIR) -> list[str]:
+    """Delete shards no page under content_dir refers to; returns the removed file names."""
+    if not os.path.isdir(shard_dir):
+        return []
+    referenced = set()
+    for r, _dirs, fns in os.walk(content_dir):
+        for fn in fns:
+            if fn.lower().endswith('.html'):
+                referenced.update(SHARD_REF_PATTERN.findall(acs.read_text_best_effort(os.path.join(r, fn))))
+    removed = sorted(fn for fn in os.listdir(shard_dir) if fn.endswith('.json') and fn not in referenced)
+    for fn in removed:
+        os.remove(os.path.join(shard_dir, fn))
+    return removed
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Pre-wrap glossary terms in Content pages at build time.')
+    parser.add_argument('--dry-run', action='store_true', help='Report pages that would change without writing.')
+    parser.add_argument('--unwrap', action='store_true', help='Remove pre-wrapped terms instead of adding them.')
+    parser.add_argument('--glossary', default=GLOSSARY_PATH, help='Glossary JSON to compile.')
+    parser.add_argument('--prune-shards', action='store_true', help='Afterwards, delete definition shards no page refers to.')
+    parser.add_argument('paths', nargs='*', help='Files or directories to process. Defaults to all Content/.')
+    args = parser.parse_args(argv)
+
+    matcher = compile_glossary(load_glossary(args.glossary))
+    targets = []
+    for p in args.paths or [CONTENT_DIR]:
+        ap = p if os.path.isabs(p) else os.path.join(ROOT, p)
+        if os.path.isdir(ap):
+            for r, _dirs, fns in os.walk(ap):
+                targets.extend(os.path.join(r, fn) for fn in fns if fn.lower().endswith('.html'))
+        else:
+            targets.append(ap)
+
+    changed = 0
+    for path in sorted(set(targets)):
+        html = acs.read_text_best_effort(path)
+        if args.unwrap:
+            new_html = unwrap_glossary_terms(html)
+        else:
+            new_html = wrap_glossary_terms(html, matcher, None if args.dry_run else SHARD_DIR)
+        if new_html == html:
+            continue
+        changed += 1
+        if not args.dry_run:
+            acs.write_text_utf8(path, new_html)
+        print(f"{'Would update' if args.dry_run else 'Updated'}: {os.path.relpath(path, ROOT)}")
+    print(f"Scanned {len(set(targets))} file(s); {changed} {'would change' if args.dry_run else 'updated'}.")
+    if args.prune_shards and not args.dry_run:
+        removed = prune_shards()
+        print(f"Pruned {len(removed)} unused glossary shard(s).")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
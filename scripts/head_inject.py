@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Head snippet injection.
+
+Keeps the <head> of every Content page in line with scripts/head-snippets.json,
+where each snippet is {name: {"html": str or [lines], "enabled": bool, "legacy": regex}}.
+Snippets are written between marker comments,
+
+    <!-- head:<name> -->
+    ...
+    <!-- /head:<name> -->
+
+just before the </head> line, so a later run can find them again: an enabled
+snippet is inserted or brought up to date, a disabled one (or a marked block
+whose name is no longer configured) is removed. "legacy" matches copies added
+before the markers existed (e.g. by the old insert_analytics.sh); an unmarked
+copy that is already current is left alone, anything else is rewritten as the
+marked block. Files are only written when their text actually changes, so
+untouched pages keep their mtimes.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+from functools import partial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import add_collapsible_sections as acs  # type: ignore
+
+SNIPPETS_PATH = os.path.join(ROOT, 'scripts', 'head-snippets.json')
+CONTENT_DIR = os.path.join(ROOT, 'Content')
+
+HEAD_OPEN_PATTERN = re.compile(r"<head\b[^>]*>", re.IGNORECASE)
+HEAD_CLOSE_PATTERN = re.compile(r"</head\s*>", re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+MARKED_PATTERN = re.compile(r"^[ \t]*<!-- head:([\w.-]+) -->\n.*?<!-- /head:\1 -->[ \t]*\n?", re.MULTILINE | re.DOTALL)
+
+def load_snippets(path: str = SNIPPETS_PATH) -> dict[str, dict]:
+    """{name: {'html', 'enabled', 'legacy'}} in file order; html ends with a newline, legacy is compiled or None."""
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    out = {}
+    for name, spec in raw.items():
+        if not re.fullmatch(r"[\w.-]+", name):
+            raise ValueError(f"snippet name {name!r} may only use letters, digits, '_', '.' and '-'")
+        html = spec.get('html', '')
+        if isinstance(html, list):
+            html = '\n'.join(html)
+        legacy = spec.get('legacy')
+        out[name] = {
+            'html': html.rstrip('\n') + '\n',
+            'enabled': spec.get('enabled', True),
+            'legacy': re.compile(legacy, re.DOTALL) if legacy else None,
+        }
+    return out
+
+def marked_block(name: str, html: str) -> str:
+    return f"<!-- head:{name} -->\n{html}<!-- /head:{name} -->\n"
+
+def _line_start(text: str, pos: int) -> int:
+    # pos, or the start of its line when only indentation precedes it
+    start = text.rfind('\n', 0, pos) + 1
+    return start if text[start:pos].strip(' \t') == '' else pos
+
+def head_edits(text: str, snippets: dict[str, dict]) -> list[tuple[int, int, str]]:
+    """Edits that bring the page's <head> in line with the snippets (none when it already is)."""
+    close = HEAD_CLOSE_PATTERN.search(text)
+    if not close:
+        return []
+    head_open = HEAD_OPEN_PATTERN.search(text, 0, close.start())
+    start = head_open.end() if head_open else 0
+    edits = []
+    placed = set()
+
+    marked = list(MARKED_PATTERN.finditer(text, start, close.start()))
+    for m in marked:
+        name = m.group(1)
+        spec = snippets.get(name)
+        if spec is None or not spec['enabled'] or name in placed:
+            edits.append((m.start(), m.end(), ''))
+            continue
+        placed.add(name)
+        block = marked_block(name, spec['html'])
+        if m.group(0) != block:
+            edits.append((m.start(), m.end(), block))
+
+    def outside_marked(m) -> bool:
+        return not any(b.start() <= m.start() < b.end() for b in marked)
+
+    for name, spec in snippets.items():
+        if spec['legacy'] is None:
+            continue
+        for m in filter(outside_marked, spec['legacy'].finditer(text, start, close.start())):
+            if not spec['enabled'] or name in placed:
+                edits.append((_line_start(text, m.start()), m.end(), ''))
+                continue
+            placed.add(name)
+            # A copy that differs only in whitespace (e.g. reformatted by an editor) is current
+            if WHITESPACE_PATTERN.sub('', m.group(0)) != WHITESPACE_PATTERN.sub('', spec['html']):
+                edits.append((_line_start(text, m.start()), m.end(), marked_block(name, spec['html'])))
+
+    # New snippets go at the start of the </head> line, in config order
+    line_start = text.rfind('\n', 0, close.start()) + 1
+    for name, spec in snippets.items():
+        if spec['enabled'] and name not in placed:
+            edits.append((line_start, line_start, marked_block(name, spec['html'])))
+    return edits
+
+def apply_snippets(text: str, snippets: dict[str, dict]) -> str:
+    return acs.apply_edits(text, head_edits(text, snippets))
+
+def process_file(path: str, snippets: dict[str, dict], dry_run: bool = False) -> tuple[str, bool]:
+    """(path, changed); the file is rewritten only when its head changes."""
+    text = acs.read_text_best_effort(path)
+    new_text = apply_snippets(text, snippets)
+    if new_text == text:
+        return path, False
+    if not dry_run:
+        acs.write_text_utf8(path, new_text)
+    return path, True
+
+def iter_html(paths: list[str]):
+    for p in paths:
+        if os.path.isdir(p):
+            for r, dirs, fns in os.walk(p):
+                dirs.sort()
+                for fn in sorted(fns):
+                    if fn.lower().endswith('.html'):
+                        yield os.path.join(r, fn)
+        elif p.lower().endswith('.html'):
+            yield p
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Insert, update or remove the configured <head> snippets in HTML pages.')
+    parser.add_argument('--config', default=SNIPPETS_PATH, help='Snippet JSON to apply.')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing anything.')
+    parser.add_argument('-j', '--jobs', type=acs.jobs_arg, default=1, help='Process files in N worker processes (0 = one per CPU).')
+    parser.add_argument('paths', nargs='*', help='Files or directories to process. Defaults to all Content/.')
+    args = parser.parse_args(argv)
+
+    try:
+        snippets = load_snippets(args.config)
+    except (OSError, ValueError, re.error) as e:
+        print(f"Cannot load {os.path.relpath(args.config)}: {e}")
+        return 1
+    files = list(iter_html(args.paths or [CONTENT_DIR]))
+    changed = 0
+    worker = partial(process_file, snippets=snippets, dry_run=args.dry_run)
+    for path, did_change in acs.map_files(worker, files, args.jobs):
+        if did_change:
+            changed += 1
+            print(f"{'Would update' if args.dry_run else 'Updated'}: {os.path.relpath(path, ROOT)}")
+    summary = f"{changed} would change" if args.dry_run else f"updated {changed}"
+    print(f"Head snippets ({', '.join(n for n, s in snippets.items() if s['enabled']) or 'none enabled'}) "
+          f"checked in {len(files)} file(s); {summary}.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
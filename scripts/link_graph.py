@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Page link graph and prefetch hints.
+
+Every ?path= link and literal postMessage({type: 'navigate', path}) target in the
+Content pages becomes an edge of a page graph. Each page's likely next pages are
+ranked from its own links, the pages linking back to it and its neighbours in
+menu (chapters.json) order, and the top few go to scripts/prefetch.json, which
+loadContent.js uses to warm the cache for them while the reader is idle.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+from urllib.parse import unquote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import add_collapsible_sections as acs  # type: ignore
+import create_JSON  # type: ignore
+
+CONTENT_DIR = os.path.join(ROOT, 'Content')
+PREFETCH_JSON = os.path.join(ROOT, 'scripts', 'prefetch.json')
+TOP_K = 3
+
+# Scores for each reason a page may be read next
+LINK_WEIGHT = 4
+MENU_NEXT_WEIGHT = 2
+BACKLINK_WEIGHT = 1
+MENU_PREV_WEIGHT = 1
+
+PATH_LINK_PATTERN = re.compile(r"""[?&]path=([^"'&#<>\s]+)""")
+NAVIGATE_PATTERN = re.compile(r"""type\s*:\s*['"]navigate['"]\s*,\s*path\s*:\s*['"]([^'"]+)['"]""")
+
+def extract_links(html: str) -> list[str]:
+    """Page keys (Content-relative, no .html) this page links to, in order of first appearance."""
+    out = []
+    for m in PATH_LINK_PATTERN.finditer(html):
+        out.append(unquote(m.group(1).replace('+', ' ')).strip('/'))
+    for m in NAVIGATE_PATTERN.finditer(html):
+        out.append(m.group(1).strip('/'))
+    return list(dict.fromkeys(k for k in out if k))
+
+def page_key(rel: str) -> str:
+    return rel[:-5] if rel.lower().endswith('.html') else rel
+
+def build_prefetch(links: dict[str, list[str]], menu_paths: list[str], top_k: int = TOP_K) -> dict[str, list[str]]:
+    """
+    {page key: up to top_k likely next page keys} from {page rel: link targets} and the menu order.
+    Only menu pages get hints, and only pages that exist are suggested.
+    """
+    existing = {page_key(rel) for rel in links}
+    scores: dict[str, dict[str, float]] = {k: {} for k in menu_paths if k in existing}
+
+    def add(src: str, dst: str, weight: float) -> None:
+        if src in scores and dst in existing and dst != src:
+            scores[src][dst] = scores[src].get(dst, 0) + weight
+
+    for rel, targets in links.items():
+        src = page_key(rel)
+        for i, dst in enumerate(targets):
+            # Earlier links on a page are more prominent
+            add(src, dst, LINK_WEIGHT / (1 + 0.1 * i))
+            add(dst, src, BACKLINK_WEIGHT)
+    for prev, nxt in zip(menu_paths, menu_paths[1:]):
+        add(prev, nxt, MENU_NEXT_WEIGHT)
+        add(nxt, prev, MENU_PREV_WEIGHT)
+
+    out = {}
+    for src, cands in scores.items():
+        ranked = sorted(cands.items(), key=lambda kv: (-kv[1], kv[0]))[:top_k]
+        if ranked:
+            out[src] = [dst for dst, _score in ranked]
+    return dict(sorted(out.items()))
+
+def write_prefetch(prefetch: dict[str, list[str]], out_path: str = PREFETCH_JSON) -> bool:
+    return create_JSON.write_if_changed(
+        out_path, json.dumps(prefetch, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Build scripts/prefetch.json from the links between Content pages.')
+    parser.add_argument('--content-dir', default=CONTENT_DIR, help='Content root to scan.')
+    parser.add_argument('--out', default=PREFETCH_JSON, help='Where to write the prefetch hints.')
+    parser.add_argument('--top', type=int, default=TOP_K, help=f'Pages suggested per page (default: {TOP_K}).')
+    args = parser.parse_args(argv)
+
+    links = {}
+    for r, dirs, fns in os.walk(args.content_dir):
+        dirs.sort()
+        for fn in fns:
+            if fn.lower().endswith('.html'):
+                rel = os.path.relpath(os.path.join(r, fn), args.content_dir).replace(os.sep, '/')
+                links[rel] = extract_links(acs.read_text_best_effort(os.path.join(r, fn)))
+    top_dirs = sorted(d for d in os.listdir(args.content_dir) if os.path.isdir(os.path.join(args.content_dir, d)))
+    menu_paths = create_JSON.build_menu_paths(create_JSON.chapters_from_paths(top_dirs, sorted(links)))
+    prefetch = build_prefetch(links, menu_paths, args.top)
+    wrote = write_prefetch(prefetch, args.out)
+    edges = sum(len(t) for t in links.values())
+    print(f"{edges} link(s) between {len(links)} page(s); hints for {len(prefetch)} page(s); "
+          f"prefetch.json {'updated' if wrote else 'unchanged'}.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Rule-based lint for Content pages.
+
+Each file is read and tokenized once (section_index); every enabled rule then runs
+over the same parsed page and reports findings at a character offset, turned into
+line/column at output. Containment questions (which section holds a demo, is an
+id inside a <script>) are answered by bisecting over sorted positions rather than
+rescanning. Output is text, JSON or SARIF 2.1.0; the exit status is 1 when a
+finding at the --fail-on level or above is reported.
+
+Rules register themselves with @rule, the same way build.py registers stages.
+"""
+import os
+import re
+import sys
+import json
+import bisect
+import argparse
+from functools import partial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import add_collapsible_sections as acs  # type: ignore
+import build_manifest as bm  # type: ignore
+import section_index as sidx  # type: ignore
+
+CONTENT_DIR = os.path.join(ROOT, 'Content')
+MANIFEST_KEY = 'lint'
+
+CANON_RANK = {title: i for i, title in enumerate(sidx.CANON_TITLES)}
+SEVERITIES = ('note', 'warning', 'error')
+
+BODY_PATTERN = re.compile(r"<body[^>]*>(.*)</body>", re.IGNORECASE | re.DOTALL)
+SCRIPT_PATTERN = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+ANY_ID_PATTERN = re.compile(r"<[a-zA-Z][^>]*?\sid\s*=\s*\"([^\"]+)\"", re.IGNORECASE)
+SECTION_TITLE_ATTR_PATTERN = re.compile(r"\b(section-title|data-section-title)\s*=", re.IGNORECASE)
+DRAFT_LINK_PATTERN = re.compile(r"\b(?:href|src)\s*=\s*\"([^\"]*draft[^\"]*)\"", re.IGNORECASE)
+
+# Registered rules, run in order. Each is {'id', 'severity', 'description', 'applies': fn(rel) -> bool,
+# 'check': fn(page) -> iterable of (offset into page['html'], message)}.
+RULES: list[dict] = []
+
+def rule(rule_id: str, severity: str, description: str, applies=lambda rel: True):
+    def register(fn):
+        RULES.append({'id': rule_id, 'severity': severity, 'description': description, 'applies': applies, 'check': fn})
+        return fn
+    return register
+
+def _top(rel: str) -> str:
+    return rel.split('/', 1)[0].lower()
+
+def _is_topic_page(rel: str) -> bool:
+    return _top(rel) not in ('problems', 'demos')
+
+def _is_draft(rel: str) -> bool:
+    return 'DRAFT' in os.path.basename(rel).upper()
+
+def parse_page(html: str, rel: str) -> dict:
+    """Everything the rules share: the body, its section index and the <script> spans."""
+    m = BODY_PATTERN.search(html)
+    body = m.group(1) if m else ''
+    scripts = [(sm.start(), sm.end()) for sm in SCRIPT_PATTERN.finditer(html)]
+    return {
+        'rel': rel,
+        'html': html,
+        'body': body,
+        'body_offset': m.start(1) if m else 0,
+        'index': sidx.build_section_index(body),
+        'script_starts': [s for s, _e in scripts],
+        'scripts': scripts,
+        # Filled in by offset_to_line_col when a finding needs it
+        'newlines': None,
+    }
+
+def in_script(page: dict, pos: int) -> bool:
+    k = bisect.bisect_right(page['script_starts'], pos)
+    return k > 0 and pos < page['scripts'][k - 1][1]
+
+@rule('nested-canonical', 'warning', 'A canonical section is nested inside another section.', applies=_is_topic_page)
+def nested_canonical(page: dict):
+    for sec in page['index']['sections']:
+        if sec['title'] in CANON_RANK and sec['depth'] > 1:
+            yield page['body_offset'] + sec['start'], f"Nested canonical section: '{sec['title']}' at depth {sec['depth']}"
+
+@rule('demo-placement', 'warning', 'A demo is outside any section or trails a non-demo section.', applies=_is_topic_page)
+def demo_placement(page: dict):
+    index = page['index']
+    for start, end in sidx.demo_blocks(index):
+        containing = sidx.innermost_section(index, start)
+        if not containing:
+            yield page['body_offset'] + start, "Standalone demo (outside any section)"
+            continue
+        if containing['title'] == 'Interactive Demo':
+            continue
+        # Trailing if only whitespace is left before the section closes
+        if page['body'][end:containing['close_start']].strip() == '':
+            yield page['body_offset'] + start, f"Trailing demo inside '{containing['title'] or '(untitled)'}'"
+
+@rule('canonical-order', 'warning', 'Top-level canonical sections are out of template order.', applies=_is_topic_page)
+def canonical_order(page: dict):
+    last = None
+    for sec in page['index']['opens']:
+        rank = CANON_RANK.get(sec['title'])
+        if sec['depth'] != 1 or rank is None:
+            continue
+        if last is not None and rank < CANON_RANK[last]:
+            yield page['body_offset'] + sec['start'], f"'{sec['title']}' should come before '{last}'"
+        else:
+            last = sec['title']
+
+# Problems pages are not sectioned by the tooling, so their bare <section>s are expected
+@rule('missing-section-title', 'warning', 'A <section> has no section-title attribute.', applies=lambda rel: _top(rel) != 'problems')
+def missing_section_title(page: dict):
+    for sec in page['index']['opens']:
+        if not SECTION_TITLE_ATTR_PATTERN.search(sec['attrs']):
+            label = f" id=\"{sec['id']}\"" if sec['id'] else ''
+            yield page['body_offset'] + sec['start'], f"<section{label}> has no section-title"
+
+@rule('duplicate-id', 'error', 'The same id is used by more than one element.')
+def duplicate_id(page: dict):
+    first: dict[str, int] = {}
+    for m in ANY_ID_PATTERN.finditer(page['html']):
+        # ids inside script strings are markup templates, not document elements
+        if in_script(page, m.start()):
+            continue
+        value = m.group(1)
+        if value in first:
+            line = offset_to_line_col(page, first[value])[0]
+            yield m.start(), f"Duplicate id '{value}' (first used on line {line})"
+        else:
+            first[value] = m.start()
+
+@rule('draft-leak', 'error', 'A published page links to a DRAFT page.', applies=lambda rel: not _is_draft(rel))
+def draft_leak(page: dict):
+    for m in DRAFT_LINK_PATTERN.finditer(page['html']):
+        if not in_script(page, m.start()):
+            yield m.start(1), f"Link to draft page: {m.group(1)}"
+
+def offset_to_line_col(page: dict, offset: int) -> tuple[int, int]:
+    """1-based (line, column) of an offset into page['html']; the newlines are found once per page."""
+    if page['newlines'] is None:
+        page['newlines'] = [m.start() for m in re.finditer('\n', page['html'])]
+    line = bisect.bisect_left(page['newlines'], offset)
+    col = offset - (page['newlines'][line - 1] + 1 if line else 0)
+    return line + 1, col + 1
+
+def lint_html(html: str, rel: str, rule_ids: tuple[str, ...] | None = None) -> list[dict]:
+    """Findings [{'rule', 'severity', 'message', 'line', 'column'}] for one page, in document order."""
+    page = parse_page(html, rel)
+    found = []
+    for r in RULES:
+        if (rule_ids is not None and r['id'] not in rule_ids) or not r['applies'](rel):
+            continue
+        for offset, message in r['check'](page):
+            found.append((offset, r['id'], r['severity'], message))
+    found.sort(key=lambda f: f[0])
+    out = []
+    for offset, rule_id, severity, message in found:
+        line, col = offset_to_line_col(page, offset)
+        out.append({'rule': rule_id, 'severity': severity, 'message': message, 'line': line, 'column': col})
+    return out
+
+def lint_file(path: str, rule_ids: tuple[str, ...]) -> list[dict]:
+    rel = os.path.relpath(path, CONTENT_DIR).replace(os.sep, '/')
+    return lint_html(acs.read_text_best_effort(path), rel, rule_ids)
+
+def iter_pages(paths: list[str]) -> list[str]:
+    targets = []
+    for p in paths or [CONTENT_DIR]:
+        ap = p if os.path.isabs(p) else os.path.join(ROOT, p)
+        if os.path.isdir(ap):
+            for r, dirs, fns in os.walk(ap):
+                dirs.sort()
+                targets.extend(os.path.join(r, fn) for fn in fns if fn.lower().endswith('.html'))
+        else:
+            targets.append(ap)
+    return sorted(set(targets))
+
+def to_sarif(results: list[tuple[str, list[dict]]], rule_ids: tuple[str, ...]) -> dict:
+    rules = [r for r in RULES if r['id'] in rule_ids]
+    return {
+        '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+        'version': '2.1.0',
+        'runs': [{
+            'tool': {'driver': {
+                'name': 'lint',
+                'rules': [{
+                    'id': r['id'],
+                    'shortDescription': {'text': r['description']},
+                    'defaultConfiguration': {'level': r['severity']},
+                } for r in rules],
+            }},
+            'results': [{
+                'ruleId': f['rule'],
+                'level': f['severity'],
+                'message': {'text': f['message']},
+                'locations': [{'physicalLocation': {
+                    'artifactLocation': {'uri': rel},
+                    'region': {'startLine': f['line'], 'startColumn': f['column']},
+                }}],
+            } for rel, findings in results for f in findings],
+        }],
+    }
+
+def main(argv: list[str] | None = None) -> int:
+    ids = [r['id'] for r in RULES]
+    parser = argparse.ArgumentParser(description='Lint Content pages for section, demo, id and draft problems.')
+    parser.add_argument('--format', choices=('text', 'json', 'sarif'), default='text', help='Output format (default: text).')
+    parser.add_argument('--output', help='Write the report to this file instead of stdout.')
+    parser.add_argument('--enable', default=','.join(ids), help=f'Comma-separated rules to run (default: all of {",".join(ids)}).')
+    parser.add_argument('--disable', default='', help='Comma-separated rules to leave out.')
+    parser.add_argument('--fail-on', choices=SEVERITIES + ('never',), default='error', help='Exit 1 on findings at this level or above (default: error).')
+    parser.add_argument('-j', '--jobs', type=acs.jobs_arg, default=1, help='Lint files in N worker processes (0 = one per CPU).')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the build manifest and re-lint every file.')
+    parser.add_argument('--list-rules', action='store_true', help='List the rules and exit.')
+    parser.add_argument('paths', nargs='*', help='Files or directories to lint. Defaults to Content/.')
+    args = parser.parse_args(argv)
+
+    if args.list_rules:
+        for r in RULES:
+            print(f"{r['id']:<24} {r['severity']:<8} {r['description']}")
+        return 0
+    selected = {s.strip() for s in args.enable.split(',') if s.strip()} - {s.strip() for s in args.disable.split(',')}
+    unknown = selected - set(ids)
+    if unknown:
+        parser.error(f"unknown rule(s): {', '.join(sorted(unknown))}")
+    rule_ids = tuple(i for i in ids if i in selected)
+
+    targets = iter_pages(args.paths)
+    # Files whose content, rules and rule selection are unchanged reuse their findings
+    manifest = None if args.no_cache else bm.load_manifest()
+    version = bm.script_version(os.path.abspath(__file__), sidx.__file__) + ':' + ','.join(rule_ids)
+    findings: dict[str, list[dict]] = {}
+    pending = []
+    for path in targets:
+        hit, cached = bm.lookup(manifest, path, MANIFEST_KEY, version) if manifest is not None else (False, None)
+        if hit:
+            findings[path] = cached
+        else:
+            pending.append(path)
+    for path, result in zip(pending, acs.map_files(partial(lint_file, rule_ids=rule_ids), pending, args.jobs)):
+        findings[path] = result
+        if manifest is not None:
+            bm.record(manifest, path, MANIFEST_KEY, version, result)
+    if manifest is not None:
+        bm.save_manifest(manifest)
+
+    results = [(os.path.relpath(p, ROOT).replace(os.sep, '/'), findings[p]) for p in targets if findings[p]]
+    if args.format == 'sarif':
+        report = json.dumps(to_sarif(results, rule_ids), indent=1) + '\n'
+    elif args.format == 'json':
+        report = json.dumps([{'file': rel, **f} for rel, fs in results for f in fs], indent=1) + '\n'
+    else:
+        lines = [f"{rel}:{f['line']}:{f['column']}: {f['severity']} [{f['rule']}] {f['message']}" for rel, fs in results for f in fs]
+        total = sum(len(fs) for _rel, fs in results)
+        lines.append(f"Linted {len(targets)} file(s) with {len(rule_ids)} rule(s); {total} finding(s) in {len(results)} file(s).")
+        report = '\n'.join(lines) + '\n'
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
+    else:
+        sys.stdout.write(report)
+
+    if args.fail_on == 'never':
+        return 0
+    threshold = SEVERITIES.index(args.fail_on)
+    failed = any(SEVERITIES.index(f['severity']) >= threshold for _rel, fs in results for f in fs)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
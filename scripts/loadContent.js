@@ -65,6 +65,29 @@ let menuSortMode = localStorage.getItem(MENU_ORDER_STORAGE_KEY) === 'flat'
   ? 'flat'
   : 'default';
 
+// ─── Asset Versions ──────────────────────────────────────────────────────────
+// Content hashes written into index.html by scripts/fingerprint.py, keyed by
+// site-relative path. A versioned URL only changes with the file, so it can be
+// fetched from cache; files without a hash fall back to cache busting.
+const ASSET_VERSIONS = (() => {
+  try {
+    return JSON.parse(document.getElementById('asset-versions')?.textContent || '{}');
+  } catch {
+    return {};
+  }
+})();
+const SITE_BASE_PATH = new URL('.', window.location.href).pathname;
+
+// `${url}?v=<hash>` for a known site file (relative or absolute URL), else null
+const versionedAssetUrl = (url) => {
+  const u = new URL(url, window.location.href);
+  if (u.origin !== window.location.origin || !u.pathname.startsWith(SITE_BASE_PATH)) return null;
+  const hash = ASSET_VERSIONS[decodeURIComponent(u.pathname.slice(SITE_BASE_PATH.length))];
+  return hash ? `${u.pathname}?v=${hash}` : null;
+};
+// Used by scripts running inside the content iframe (glossary-tooltips.js)
+window.versionedAssetUrl = versionedAssetUrl;
+
 // ─── Utility Functions ────────────────────────────────────────────────────────
 // Return the current “path” either from history.state or URL param or fallback
 const getCurrentPath = () =>
@@ -109,13 +132,8 @@ const sortEntries = (items, orderList = []) => {
   });
 };
 
-const createMenuLink = (fullPath, label, level = 1, title = '') => {
-  const a = document.createElement('a');
-  a.textContent = label;
-  a.href = `?path=${encodeURIComponent(fullPath)}`;
-  a.style.fontSize = `${1 - (level - 1) * 0.1}em`;
-  if (title) a.title = title;
-
+// a-click copies a link instead of navigating; used for built and pre-rendered links alike
+const bindMenuLink = (a, fullPath, title = '') => {
   a.addEventListener('click', (e) => {
     if (aKeyDown) {
       e.preventDefault();
@@ -141,7 +159,23 @@ const createMenuLink = (fullPath, label, level = 1, title = '') => {
         .catch(() => alert('Failed to copy link'));
     }
   });
+};
+
+const bindMenuFolder = (span, li) => {
+  span.onclick = (e) => {
+    // Only toggle submenu if not Alt+Shift+Click (used for copy)
+    if (e.altKey && e.shiftKey) return;
+    li.classList.toggle('open');
+  };
+};
 
+const createMenuLink = (fullPath, label, level = 1, title = '') => {
+  const a = document.createElement('a');
+  a.textContent = label;
+  a.href = `?path=${encodeURIComponent(fullPath)}`;
+  a.style.fontSize = `${1 - (level - 1) * 0.1}em`;
+  if (title) a.title = title;
+  bindMenuLink(a, fullPath, title);
   return a;
 };
 
@@ -247,14 +281,15 @@ function hookIframeContent(iframe) {
   const innerDoc = getIframeDocument(iframe);
   if (!innerDoc) return;
 
-  // Inject glossary-tooltips.js (fresh each time)
+  // Inject glossary-tooltips.js (current version; fresh each time if unversioned)
   const head = innerDoc.head || innerDoc.getElementsByTagName('head')[0];
   const old = innerDoc.getElementById('glossary-tooltips-script');
   if (old) old.remove();
   const scriptTips = innerDoc.createElement('script');
   scriptTips.id = 'glossary-tooltips-script';
   scriptTips.type = 'module';
-  scriptTips.src = `/Algorithms/scripts/glossary-tooltips.js?cb=${Date.now()}`;
+  scriptTips.src = versionedAssetUrl('/Algorithms/scripts/glossary-tooltips.js')
+    || `/Algorithms/scripts/glossary-tooltips.js?cb=${Date.now()}`;
   head.appendChild(scriptTips);
 
   // Insert a visible DRAFT banner in the HOST page (outside the iframe)
@@ -285,9 +320,9 @@ function hookIframeContent(iframe) {
 
     const getDocName = () => {
       try {
-        const loc = doc.defaultView?.location || doc.location;
-        if (!loc) return '';
-        const parts = loc.pathname ? loc.pathname.split('/') : [];
+        // baseURI: pages are loaded from blob: URLs with a <base> of their real location
+        const pathname = new URL(doc.baseURI).pathname;
+        const parts = pathname ? pathname.split('/') : [];
         return decodeURIComponent(parts.pop() || '').toUpperCase();
       } catch (e) {
         return '';
@@ -362,6 +397,18 @@ function hookIframeContent(iframe) {
     }
   })(innerDoc, document, iframe);
 
+  // The page is a blob: document whose <base> is its real URL, so a hash-only
+  // link would navigate to that URL; scroll in place instead
+  innerDoc.addEventListener('click', (event) => {
+    const anchor = event.target.closest('a[href^="#"]');
+    if (!anchor || anchor.getAttribute('href').length < 2) return;
+    const id = decodeURIComponent(anchor.getAttribute('href').slice(1));
+    const target = innerDoc.getElementById(id) || innerDoc.querySelector(`[name="${CSS.escape(id)}"]`);
+    if (!target) return;
+    event.preventDefault();
+    target.scrollIntoView({ behavior: 'smooth', block: 'start' });
+  });
+
   // Intercept any “?path=” links inside the iframe
   innerDoc.addEventListener('click', (event) => {
     const anchor = event.target.closest('a[href^="?path="]');
@@ -391,10 +438,11 @@ function hookIframeContent(iframe) {
   // Auto‐resize any embeddedDemo iframes
   innerDoc.querySelectorAll('iframe.embeddedDemo').forEach((frame) => {
     const base = frame.src.split('?')[0];
+    const target = versionedAssetUrl(base) || `${base}?cb=${Date.now()}`;
     try {
-      frame.contentWindow.location.replace(`${base}?cb=${Date.now()}`);
+      frame.contentWindow.location.replace(target);
     } catch {
-      frame.src = `${base}?cb=${Date.now()}`;
+      frame.src = target;
     }
     frame.scrolling = 'no';
 
@@ -717,30 +765,45 @@ function hookIframeContent(iframe) {
   })(innerDoc);
 }
 
+// ─── Menu Data ────────────────────────────────────────────────────────────────
+// scripts/menu/index.json lists the chapters; each chapter's entries are in their
+// own content-hashed file (scripts/create_JSON.py), fetched the first time the
+// chapter is opened or holds the current page.
+const MENU_DATA_DIR = 'scripts/menu/';
+let menuIndexPromise = null;
+const chapterPromises = new Map();
+
+const loadMenuIndex = () => {
+  const url = `${MENU_DATA_DIR}index.json`;
+  menuIndexPromise ??= fetch(versionedAssetUrl(url) || url).then((res) => res.json());
+  return menuIndexPromise;
+};
+
+// Compact entries ("Page", [dir, entries]) back to the chapters.json shape
+const expandMenuItems = (items) =>
+  items.map((item) => (typeof item === 'string' ? `${item}.html` : { [item[0]]: expandMenuItems(item[1]) }));
+
+const loadChapter = (name) => {
+  if (!chapterPromises.has(name)) {
+    chapterPromises.set(name, loadMenuIndex()
+      .then((index) => fetch(MENU_DATA_DIR + encodeURIComponent(index.chapters[name].file)))
+      .then((res) => res.json())
+      .then(expandMenuItems));
+  }
+  return chapterPromises.get(name);
+};
+
 // ─── Build Sidebar Menu ───────────────────────────────────────────────────────
-const buildMenu = (chapters) => {
-  const menuContainer = document.querySelector('#menu');
-  menuContainer.innerHTML = `
-    <div class="menu-controls">
-      <div class="menu-icon-controls" aria-label="Menu display controls">
-        <button id="expandAll" class="menu-icon-button" type="button" title="Expand all sections" aria-label="Expand all sections">▾▾</button>
-        <button id="collapseAll" class="menu-icon-button" type="button" title="Collapse all sections" aria-label="Collapse all sections">▸▸</button>
-      </div>
-      <button
-        id="toggleSort"
-        class="menu-view-toggle ${menuSortMode === 'flat' ? 'is-flat' : 'is-grouped'}"
-        type="button"
-        aria-pressed="${menuSortMode === 'flat' ? 'true' : 'false'}"
-        title="Switch between grouped and alphabetical navigation"
-      >
-        <span class="toggle-option toggle-grouped">Grouped</span>
-        <span class="toggle-option toggle-flat">Alphabetic</span>
-      </button>
-    </div>
-    <ul> </ul>
-  `;
-  const menuRoot = menuContainer.querySelector('ul');
+const updateSortToggle = () => {
+  const toggle = document.querySelector('#toggleSort');
+  if (!toggle) return;
+  toggle.classList.toggle('is-flat', menuSortMode === 'flat');
+  toggle.classList.toggle('is-grouped', menuSortMode !== 'flat');
+  toggle.setAttribute('aria-pressed', menuSortMode === 'flat' ? 'true' : 'false');
+};
 
+// Fill one chapter's list (grouped or alphabetic)
+const renderChapter = (ul, sectionName, contents) => {
   const buildList = (items, container, pathPrefix, level = 1) => {
    const orderList = (() => {
     if (pathPrefix === 'Techniques/Decrease-and-Conquer/') return DECREASE_AND_CONQUER_ORDER;
@@ -764,16 +827,11 @@ const buildMenu = (chapters) => {
             const span = document.createElement('span');
             span.textContent = dir;
             span.style.fontSize = `${1 - (level - 1) * 0.1}em`;
-            /*span.onclick = () => li.classList.toggle('open');*/
-			span.onclick = (e) => {
-				// Only toggle submenu if not Alt+Shift+Click
-				if (e.altKey && e.shiftKey) return;
-				li.classList.toggle('open');
-				};
+            bindMenuFolder(span, li);
             li.appendChild(span);
 
             const ul = document.createElement('ul');
-            buildList(sub, ul, `${pathPrefix}${dir}/`, orderList, level + 1);
+            buildList(sub, ul, `${pathPrefix}${dir}/`, level + 1);
             li.appendChild(ul);
           });
         }
@@ -781,91 +839,192 @@ const buildMenu = (chapters) => {
       });
   };
 
-  const topLevelSections = TOP_LEVEL_ORDER;
+  if (menuSortMode === 'flat') {
+    const flatItems = flattenSectionItems(contents, `${sectionName}/`);
+    const labelCounts = flatItems.reduce((counts, item) => {
+      counts[item.label] = (counts[item.label] || 0) + 1;
+      return counts;
+    }, {});
+
+    flatItems
+      .sort((a, b) => a.label.localeCompare(b.label, undefined, {
+        numeric: true,
+        sensitivity: 'base'
+      }))
+      .forEach((item) => {
+        const itemLi = document.createElement('li');
+        const needsContext = labelCounts[item.label] > 1 && item.context;
+        const visibleLabel = needsContext
+          ? `${item.label} (${item.context})`
+          : item.label;
+        itemLi.appendChild(
+          createMenuLink(item.fullPath, visibleLabel, 2, item.context)
+        );
+        ul.appendChild(itemLi);
+      });
+  } else {
+    buildList(contents, ul, `${sectionName}/`);
+  }
+};
 
-  topLevelSections.forEach((sectionName) => {
-    const contents = chapters[sectionName];
-    if (!contents) return;
+// Load and render a chapter built by buildMenu, once
+const fillChapter = (li) => {
+  if (!li.dataset.chapter || li.dataset.filled) return;
+  li.dataset.filled = 'true';
+  loadChapter(li.dataset.chapter)
+    .then((contents) => {
+      renderChapter(li.querySelector(':scope > ul'), li.dataset.chapter, contents);
+      highlightActiveLink(getCurrentPath());
+    })
+    .catch((e) => {
+      delete li.dataset.filled;
+      console.error(e);
+    });
+};
+
+// The controls are part of index.html; this (re)builds the chapter list below them.
+// Chapters stay empty until opened, except the one holding the current page.
+const buildMenu = (menuIndex) => {
+  const menuRoot = document.querySelector('#menu > ul');
+  menuRoot.innerHTML = '';
+  updateSortToggle();
+  const activeChapter = getCurrentPath().split('/')[0];
+
+  TOP_LEVEL_ORDER.forEach((sectionName) => {
+    if (!menuIndex.chapters[sectionName]) return;
 
     const li = document.createElement('li');
+    li.dataset.chapter = sectionName;
     const span = document.createElement('span');
     span.textContent = sectionName;
     span.style.fontSize = '1.1em';
-    /*span.onclick = () => li.classList.toggle('open');*/
-	span.onclick = (e) => {
-		  // Prevent toggling open if Alt+Shift was used (used for copy)
-		  if (e.altKey && e.shiftKey) return;
-		  li.classList.toggle('open');
-		};
-
+    bindMenuFolder(span, li);
+    span.addEventListener('click', () => fillChapter(li));
     li.appendChild(span);
-
-    const ul = document.createElement('ul');
-
-    if (menuSortMode === 'flat') {
-      const flatItems = flattenSectionItems(contents, `${sectionName}/`);
-      const labelCounts = flatItems.reduce((counts, item) => {
-        counts[item.label] = (counts[item.label] || 0) + 1;
-        return counts;
-      }, {});
-
-      flatItems
-        .sort((a, b) => a.label.localeCompare(b.label, undefined, {
-          numeric: true,
-          sensitivity: 'base'
-        }))
-        .forEach((item) => {
-          const itemLi = document.createElement('li');
-          const needsContext = labelCounts[item.label] > 1 && item.context;
-          const visibleLabel = needsContext
-            ? `${item.label} (${item.context})`
-            : item.label;
-          itemLi.appendChild(
-            createMenuLink(item.fullPath, visibleLabel, 2, item.context)
-          );
-          ul.appendChild(itemLi);
-        });
-    } else {
-      buildList(contents, ul, `${sectionName}/`);
-    }
-
-    li.appendChild(ul);
+    li.appendChild(document.createElement('ul'));
     menuRoot.appendChild(li);
+    if (sectionName === activeChapter) fillChapter(li);
+  });
+};
+
+// Attach behaviour to the grouped menu create_JSON.py renders into index.html
+const hydrateMenu = () => {
+  document.querySelectorAll('#menu > ul a').forEach((a) => {
+    bindMenuLink(a, new URLSearchParams(a.search).get('path'), a.title);
   });
+  document.querySelectorAll('#menu > ul span').forEach((span) => bindMenuFolder(span, span.parentElement));
+};
 
-  menuContainer.querySelector('#expandAll').onclick = () => {
+const bindMenuControls = () => {
+  document.querySelector('#expandAll').onclick = () => {
     document.querySelectorAll('#menu li').forEach((li) => li.classList.add('open'));
+    document.querySelectorAll('#menu li[data-chapter]').forEach(fillChapter);
   };
 
-  menuContainer.querySelector('#collapseAll').onclick = () => {
+  document.querySelector('#collapseAll').onclick = () => {
     document.querySelectorAll('#menu li').forEach((li) => li.classList.remove('open'));
   };
 
-  menuContainer.querySelector('#toggleSort').onclick = () => {
+  document.querySelector('#toggleSort').onclick = () => {
     menuSortMode = menuSortMode === 'flat' ? 'default' : 'flat';
     localStorage.setItem(MENU_ORDER_STORAGE_KEY, menuSortMode);
-    buildMenu(chapters);
-    highlightActiveLink(getCurrentPath());
+    loadMenuIndex()
+      .then(buildMenu)
+      .catch(console.error);
   };
+};
+
+// ─── Prefetch Likely Next Pages ──────────────────────────────────────────────
+// scripts/prefetch.json (scripts/link_graph.py) lists, per page, the pages most
+// likely read next. Once a page has loaded and the browser is idle, those are
+// fetched at low priority so the next navigation is served from cache. Only
+// fingerprinted URLs are worth warming: unversioned pages are revalidated anyway.
+let prefetchHints = null;
+const prefetchedUrls = new Set();
+
+const loadPrefetchHints = () => {
+  prefetchHints ??= fetch(versionedAssetUrl('scripts/prefetch.json') || 'scripts/prefetch.json')
+    .then((res) => (res.ok ? res.json() : {}))
+    .catch(() => ({}));
+  return prefetchHints;
+};
 
+const whenIdle = (fn) =>
+  'requestIdleCallback' in window ? requestIdleCallback(fn, { timeout: 3000 }) : setTimeout(fn, 1000);
+
+const prefetchNextPages = (rawPath) => {
+  if (navigator.connection?.saveData) return;
+  whenIdle(async () => {
+    const hints = await loadPrefetchHints();
+    for (const next of hints[rawPath] || []) {
+      const href = versionedAssetUrl(`Content/${normalizePath(next)}.html`);
+      if (!href || prefetchedUrls.has(href)) continue;
+      prefetchedUrls.add(href);
+      const link = document.createElement('link');
+      link.rel = 'prefetch';
+      link.href = href;
+      document.head.appendChild(link);
+    }
+  });
 };
 
 // ─── Load Content via Fetch + Replace‐into‐iframe ────────────────────────────
-async function loadContent(relativePath) {
+// Each page is downloaded once and handed to the iframe as a blob: URL, with a
+// <base> pointing at its real location so relative URLs resolve as before.
+// Recently viewed pages stay in a small LRU: fingerprinted ones are reused on
+// any visit, unversioned ones only on back/forward (like the browser's own
+// back/forward cache), so edits still show up on a normal navigation.
+const PAGE_CACHE_SIZE = 20;
+const pageCache = new Map(); // fetch URL -> Blob, oldest first
+let currentPageBlobUrl = null;
+let loadToken = 0;
+
+const cachePage = (key, blob) => {
+  pageCache.delete(key);
+  pageCache.set(key, blob);
+  while (pageCache.size > PAGE_CACHE_SIZE) pageCache.delete(pageCache.keys().next().value);
+};
+
+const withBase = (html, baseHref) => {
+  if (/<base\b/i.test(html)) return html;
+  const tag = `<base href="${baseHref.replace(/"/g, '&quot;')}">`;
+  const head = /<head\b[^>]*>/i.exec(html);
+  return head ? html.slice(0, head.index + head[0].length) + tag + html.slice(head.index + head[0].length) : tag + html;
+};
+
+const fetchPage = async (url, versioned, fromHistory) => {
+  const key = versioned || url;
+  const cached = pageCache.get(key);
+  if (cached && (versioned || fromHistory)) {
+    cachePage(key, cached);
+    return cached;
+  }
+  const res = await fetch(key, versioned ? {} : { cache: 'no-cache' });
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  const html = withBase(await res.text(), new URL(url, window.location.href).href);
+  const blob = new Blob([html], { type: 'text/html;charset=utf-8' });
+  cachePage(key, blob);
+  return blob;
+};
+
+async function loadContent(relativePath, { fromHistory = false } = {}) {
   const iframe = document.getElementById('content');
   const err = document.getElementById('errorMessage');
   const url = `Content/${relativePath}`;
+  const versioned = versionedAssetUrl(url);
+  const token = ++loadToken;
 
   try {
-    const res = await fetch(url, { cache: 'no-cache' });
-    if (!res.ok) throw new Error(`HTTP ${res.status}`);
-    await res.text(); // just to confirm it exists
+    const blob = await fetchPage(url, versioned, fromHistory);
+    // A later navigation has taken over
+    if (token !== loadToken) return;
 
     err.style.display = 'none';
     iframe.style.display = 'block';
 
-    // Load into iframe without adding to its session history (use replace)
-    const target = `${url}?_=${Date.now()}`;
+    const previousBlobUrl = currentPageBlobUrl;
+    currentPageBlobUrl = URL.createObjectURL(blob);
+    const target = currentPageBlobUrl;
     try {
       // Prefer replacing the iframe's location to avoid stacking iframe history entries
       if (iframe.contentWindow && iframe.contentWindow.location) {
@@ -876,6 +1035,7 @@ async function loadContent(relativePath) {
     } catch {
       iframe.src = target;
     }
+    if (previousBlobUrl) URL.revokeObjectURL(previousBlobUrl);
 
     iframe.onload = () => {
       hookIframeContent(iframe);
@@ -927,6 +1087,7 @@ async function loadContent(relativePath) {
         });
       }
       window.addEventListener('resize', resizeIframe);
+      prefetchNextPages(decodeURIComponent(relativePath.replace(/\.html$/, '')));
 
       // After content is ready, if parent URL has a hash, scroll to it
       try {
@@ -964,25 +1125,43 @@ window.addEventListener('load', () => {
   }
 });
 
+// ─── Service Worker ──────────────────────────────────────────────────────────
+// sw.js (scripts/service_worker.py) is written by the build alongside the asset
+// hashes, so only a fingerprinted site registers it.
+if ('serviceWorker' in navigator && Object.keys(ASSET_VERSIONS).length) {
+  window.addEventListener('load', () => {
+    navigator.serviceWorker.register('sw.js').catch(console.error);
+  });
+}
+
 // ─── App Initialization ──────────────────────────────────────────────────────
-document.addEventListener('DOMContentLoaded', () => {
-  fetch('scripts/chapters.json')
-    .then((res) => res.json())
-    .then((chaptersData) => {
-      buildMenu(chaptersData);
+const startRouting = () => {
+  // Load initial content from URL and ensure the initial history state is set
+  loadFromURLParams();
+  try {
+    const initialPath = new URLSearchParams(window.location.search).get('path') || 'Home/About';
+    const currentState = history.state || {};
+    if (currentState.path !== initialPath) {
+      // Preserve the current URL (including any hash) while setting state
+      history.replaceState({ path: initialPath, scrollY: window.pageYOffset || 0 }, '', window.location.href);
+    }
+  } catch {}
+};
 
-      // Load initial content from URL and ensure the initial history state is set
-      loadFromURLParams();
-      try {
-        const initialPath = new URLSearchParams(window.location.search).get('path') || 'Home/About';
-        const currentState = history.state || {};
-        if (currentState.path !== initialPath) {
-          // Preserve the current URL (including any hash) while setting state
-          history.replaceState({ path: initialPath, scrollY: window.pageYOffset || 0 }, '', window.location.href);
-        }
-      } catch {}
-    })
-    .catch(console.error);
+document.addEventListener('DOMContentLoaded', () => {
+  bindMenuControls();
+  // The pre-rendered grouped menu needs no data: route straight away
+  if (menuSortMode === 'default' && document.querySelector('#menu > ul > li')) {
+    hydrateMenu();
+    startRouting();
+  } else {
+    loadMenuIndex()
+      .then((menuIndex) => {
+        buildMenu(menuIndex);
+        startRouting();
+      })
+      .catch(console.error);
+  }
 
 
   document.addEventListener('click', (event) => {
@@ -1023,5 +1202,5 @@ window.addEventListener('popstate', (event) => {
   const urlPath = new URLSearchParams(window.location.search).get('path');
   const rawPath = urlPath || state.path || 'Home/About';
   highlightActiveLink(rawPath);
-  loadContent(`${normalizePath(rawPath)}.html`);
+  loadContent(`${normalizePath(rawPath)}.html`, { fromHistory: true });
 });
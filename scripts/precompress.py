@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Precompressed sidecars for the site's text assets.
+
+Writes <file>.gz (gzip -9) and, when the brotli module is installed, <file>.br
+(quality 11) next to every HTML/CSS/JS/JSON/XML/SVG file the site serves, so the
+server can send them as-is instead of compressing per request (scripts/serve.py
+does; nginx gzip_static/brotli_static do the same). Files whose content hash is
+unchanged since the last run are skipped via the build manifest, sidecars that
+do not save anything are not written, and sidecars of deleted files are removed.
+"""
+import os
+import sys
+import gzip
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import build_manifest as bm  # type: ignore
+
+try:
+    import brotli
+except ImportError:  # gzip sidecars only
+    brotli = None
+
+MANIFEST_KEY = 'precompress'
+TEXT_EXTS = {'.html', '.css', '.js', '.json', '.xml', '.svg', '.txt'}
+SIDECAR_EXTS = ('.gz', '.br')
+# Below this, compression overhead outweighs the saving
+MIN_SIZE = 512
+# Served trees, relative to ROOT (index.html is added separately)
+SITE_DIRS = ('Content', 'css', 'scripts', 'templates')
+
+def iter_site_files(root: str = ROOT) -> list[str]:
+    files = [os.path.join(root, 'index.html')]
+    for d in SITE_DIRS:
+        for r, dirs, fns in os.walk(os.path.join(root, d)):
+            dirs[:] = sorted(x for x in dirs if x != '__pycache__')
+            files.extend(os.path.join(r, fn) for fn in sorted(fns) if os.path.splitext(fn)[1].lower() in TEXT_EXTS)
+    return [f for f in files if os.path.isfile(f)]
+
+def _write(path: str, data: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def compress_file(path: str) -> list[str]:
+    """Write the sidecars worth keeping for path; returns their extensions. Others are removed."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    encoded = {}
+    if len(data) >= MIN_SIZE:
+        # mtime=0 keeps the .gz bytes a pure function of the content
+        encoded['.gz'] = gzip.compress(data, compresslevel=9, mtime=0)
+        if brotli is not None:
+            encoded['.br'] = brotli.compress(data, quality=11)
+    kept = []
+    for ext in SIDECAR_EXTS:
+        sidecar = path + ext
+        if ext in encoded and len(encoded[ext]) < len(data):
+            _write(sidecar, encoded[ext])
+            kept.append(ext)
+        elif os.path.exists(sidecar):
+            # Stale for the new content (or never worth it): drop rather than serve old bytes
+            os.remove(sidecar)
+    return kept
+
+def remove_orphans(root: str = ROOT) -> int:
+    """Delete sidecars whose source file no longer exists."""
+    removed = 0
+    for d in ('.',) + SITE_DIRS:
+        base = os.path.join(root, d)
+        for r, dirs, fns in os.walk(base):
+            if d == '.':
+                dirs[:] = []  # only index.html's sidecars at the top level
+            for fn in fns:
+                path = os.path.join(r, fn)
+                if fn.endswith(SIDECAR_EXTS) and not os.path.exists(path[:-3]):
+                    os.remove(path)
+                    removed += 1
+    return removed
+
+def precompress_site(root: str = ROOT, use_cache: bool = True) -> tuple[int, int, int]:
+    """Refresh all sidecars. Returns (files compressed, files skipped as unchanged, orphans removed)."""
+    manifest = bm.load_manifest() if use_cache else None
+    version = bm.script_version(os.path.abspath(__file__)) + (':br' if brotli is not None else '')
+    done = skipped = 0
+    for path in iter_site_files(root):
+        if manifest is not None:
+            hit, kept = bm.lookup(manifest, path, MANIFEST_KEY, version)
+            if hit and all(os.path.exists(path + ext) for ext in kept):
+                skipped += 1
+                continue
+        kept = compress_file(path)
+        done += 1
+        if manifest is not None:
+            bm.record(manifest, path, MANIFEST_KEY, version, kept)
+    if manifest is not None:
+        bm.save_manifest(manifest)
+    return done, skipped, remove_orphans(root)
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Write .gz (and .br) sidecars for every served text asset.')
+    parser.add_argument('--no-cache', action='store_true', help='Recompress every file, ignoring the build manifest.')
+    args = parser.parse_args(argv)
+
+    done, skipped, removed = precompress_site(use_cache=not args.no_cache)
+    encodings = 'gzip + brotli' if brotli is not None else 'gzip (install brotli for .br)'
+    print(f"Compressed {done} file(s) with {encodings}; {skipped} unchanged; {removed} orphaned sidecar(s) removed.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,22 @@
 #!/usr/bin/env python3
 import os
+import re
 import sys
+import shutil
 import argparse
 import difflib
+import tempfile
 
 # Reuse logic from add_collapsible_sections.py without writing
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(os.path.join(ROOT, 'scripts'))
 import add_collapsible_sections as acs  # type: ignore
+import build_manifest as bm  # type: ignore
+
+MANIFEST_KEY = 'preview_diffs'
+
+NO_NEWLINE_MARKER = '\\ No newline at end of file\n'
+TAG_NAME_PATTERN = re.compile(r"<\s*(/?)\s*([a-zA-Z][\w-]*)")
 
 def rel(path: str) -> str:
     return os.path.relpath(path, ROOT)
@@ -39,9 +48,119 @@ def collect_targets(inputs: list[str]) -> list[str]:
             uniq.append(t)
     return sorted(uniq)
 
+def read_diff_hash(path: str) -> str | None:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return bm.text_sha256(f.read())
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def compute_diff(path: str) -> str | None:
+    """Unified diff of the proposed update for path, or None when it would not change."""
+    new_html, old_html = acs.compute_transformed_html(path)
+    if new_html is None:
+        return None
+    relp = rel(path)
+    diff = difflib.unified_diff(
+        old_html.splitlines(keepends=True),
+        new_html.splitlines(keepends=True),
+        fromfile=f"a/{relp}",
+        tofile=f"b/{relp}",
+        n=3,
+    )
+    return ''.join(diff)
+
+def read_raw(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+def split_lines(text: str) -> list[str]:
+    # Only \n ends a line in a patch (str.splitlines also splits on \x0c, \u2028, ...)
+    return re.findall(r"[^\n]*\n|[^\n]+\Z", text)
+
+def tag_sequence(html: str) -> list[tuple[str, str]]:
+    return [(close, name.lower()) for close, name in TAG_NAME_PATTERN.findall(html)]
+
+def compute_patch(path: str) -> dict | None:
+    """
+    Patch entry for path, or None when it would not change:
+    {'path', 'diff' (bytes), 'added', 'removed', 'hunks', 'structural'}. The diff is taken between
+    the bytes on disk and the bytes the update would write (compared as latin-1 so any encoding
+    round-trips), keeps a CRLF file's line endings and marks a missing final newline, so git apply
+    accepts it; structural is True when the sequence of elements changes (not just attributes).
+    The file is read whole (once decoded for the transform, once as raw bytes for the diff), so
+    memory per file is a few times its size; only the combined output is spooled.
+    """
+    new_html, old_html = acs.compute_transformed_html(path)
+    if new_html is None:
+        return None
+    raw = read_raw(path)
+    if b'\r\n' in raw and raw.count(b'\r\n') == raw.count(b'\n'):
+        new_html = new_html.replace('\r\n', '\n').replace('\n', '\r\n')
+    old_text = raw.decode('latin-1')
+    new_text = new_html.encode('utf-8').decode('latin-1')
+    relp = rel(path).replace(os.sep, '/').encode('utf-8').decode('latin-1')
+    out = []
+    added = removed = hunks = 0
+    for line in difflib.unified_diff(split_lines(old_text), split_lines(new_text),
+                                     fromfile=f"a/{relp}", tofile=f"b/{relp}", n=3):
+        if line.startswith('@@'):
+            hunks += 1
+        elif line.startswith('+') and not line.startswith('+++'):
+            added += 1
+        elif line.startswith('-') and not line.startswith('---'):
+            removed += 1
+        out.append(line if line.endswith('\n') else line + '\n' + NO_NEWLINE_MARKER)
+    return {
+        'path': rel(path).replace(os.sep, '/'), 'diff': ''.join(out).encode('latin-1'),
+        'added': added, 'removed': removed, 'hunks': hunks,
+        'structural': tag_sequence(old_html) != tag_sequence(new_html),
+    }
+
+def write_combined(entries, out, *, structural_only: bool = False, max_lines: int | None = None) -> tuple[int, int]:
+    """
+    Write patch entries (None for unchanged files) as one patch to the binary stream out,
+    preceded by a '#' summary header that git apply ignores. Each file's diff is built in memory
+    and then spooled to a temporary file, so memory follows the largest file, not the corpus.
+    Returns (files written, files filtered out).
+    """
+    stats = []
+    filtered = []
+    with tempfile.TemporaryFile() as body:
+        for entry in entries:
+            if entry is None:
+                continue
+            if structural_only and not entry['structural']:
+                filtered.append((entry['path'], 'attributes only'))
+                continue
+            if max_lines is not None and entry['added'] + entry['removed'] > max_lines:
+                filtered.append((entry['path'], f"{entry['added'] + entry['removed']} changed lines"))
+                continue
+            body.write(entry['diff'])
+            stats.append(entry)
+        header = [
+            f"# Proposed collapsible-section updates: {len(stats)} file(s), "
+            f"+{sum(e['added'] for e in stats)} -{sum(e['removed'] for e in stats)} line(s), "
+            f"{sum(e['hunks'] for e in stats)} hunk(s)",
+            "# Apply with: git apply <this file>",
+        ]
+        header += [f"#   +{e['added']:<5} -{e['removed']:<5} {e['path']}" for e in stats]
+        if filtered:
+            header.append(f"# Left out ({len(filtered)}):")
+            header += [f"#   {path} ({why})" for path, why in filtered]
+        out.write(('\n'.join(header) + '\n\n').encode('utf-8'))
+        body.seek(0)
+        shutil.copyfileobj(body, out)
+    return len(stats), len(filtered)
+
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description='Generate unified diffs for proposed collapsible-section updates.')
     parser.add_argument('--out-dir', default=os.path.join(ROOT, 'ProposedDiffs'), help='Directory to write .diff files into (mirror tree).')
+    parser.add_argument('-j', '--jobs', type=acs.jobs_arg, default=1, help='Compute diffs in N worker processes (0 = one per CPU). Output order is unchanged.')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the build manifest and recompute every diff.')
+    parser.add_argument('--combined', metavar='PATCH', help="Write one patch (for git apply) to PATCH, or '-' for stdout, instead of a .diff tree.")
+    parser.add_argument('--structural-only', action='store_true', help='With --combined, leave out files whose element structure is unchanged.')
+    parser.add_argument('--max-lines', type=int, help='With --combined, leave out files with more than this many changed lines.')
     parser.add_argument('paths', nargs='*', help='Files or directories to diff. Defaults to all Content/.')
     args = parser.parse_args(argv)
 
@@ -50,26 +169,63 @@ def main(argv: list[str] | None = None) -> int:
         print('No targets found.')
         return 0
 
+    # Reuse the manifest's diff hash: skip pages with no change, and pages whose .diff is already current
+    manifest = None if args.no_cache else bm.load_manifest()
+    version = bm.script_version(os.path.abspath(__file__), acs.__file__, acs.sidx.__file__)
+
+    if args.combined:
+        # Pages the manifest knows to be unchanged are skipped; only those outcomes are recorded
+        pending = [p for p in targets
+                   if manifest is None or bm.lookup(manifest, p, MANIFEST_KEY, version) != (True, None)]
+
+        def entries():
+            for path, entry in zip(pending, acs.map_files(compute_patch, pending, args.jobs)):
+                if manifest is not None and entry is None:
+                    bm.record(manifest, path, MANIFEST_KEY, version, None)
+                yield entry
+
+        if args.combined == '-':
+            written, left_out = write_combined(entries(), sys.stdout.buffer,
+                                               structural_only=args.structural_only, max_lines=args.max_lines)
+            sys.stdout.flush()
+        else:
+            with open(args.combined, 'wb') as f:
+                written, left_out = write_combined(entries(), f,
+                                                   structural_only=args.structural_only, max_lines=args.max_lines)
+        if manifest is not None:
+            bm.save_manifest(manifest)
+        note = f", {left_out} left out by filters" if left_out else ""
+        print(f"Combined patch: {written} file(s){note}.", file=sys.stderr if args.combined == '-' else sys.stdout)
+        return 0
+
     created = 0
+    up_to_date = 0
+    pending = []
     for path in targets:
-        new_html, old_html = acs.compute_transformed_html(path)
-        if new_html is None:
+        if manifest is not None:
+            hit, diff_hash = bm.lookup(manifest, path, MANIFEST_KEY, version)
+            if hit and diff_hash is None:
+                continue
+            if hit and read_diff_hash(os.path.join(args.out_dir, rel(path)) + '.diff') == diff_hash:
+                created += 1
+                up_to_date += 1
+                continue
+        pending.append(path)
+
+    for path, diff_text in zip(pending, acs.map_files(compute_diff, pending, args.jobs)):
+        if manifest is not None:
+            bm.record(manifest, path, MANIFEST_KEY, version, None if diff_text is None else bm.text_sha256(diff_text))
+        if diff_text is None:
             continue
-        relp = rel(path)
-        diff = difflib.unified_diff(
-            old_html.splitlines(keepends=True),
-            new_html.splitlines(keepends=True),
-            fromfile=f"a/{relp}",
-            tofile=f"b/{relp}",
-            n=3,
-        )
-        diff_text = ''.join(diff)
-        out_path = os.path.join(args.out_dir, relp) + '.diff'
+        out_path = os.path.join(args.out_dir, rel(path)) + '.diff'
         write_text(out_path, diff_text)
         created += 1
         print(f"Wrote diff: {os.path.relpath(out_path, ROOT)}")
+    if manifest is not None:
+        bm.save_manifest(manifest)
 
-    print(f"Generated diffs for {created} file(s). Output root: {os.path.relpath(args.out_dir, ROOT)}")
+    note = f" ({up_to_date} already up to date)" if up_to_date else ""
+    print(f"Generated diffs for {created} file(s){note}. Output root: {os.path.relpath(args.out_dir, ROOT)}")
     return 0
 
 if __name__ == '__main__':
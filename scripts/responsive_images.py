@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Responsive images.
+
+For every local raster <img> in index.html and the Content pages:
+- width/height attributes with the file's intrinsic size (read from the header),
+  so the browser reserves the box before the image arrives
+- WebP variants at several widths, written to a _resized/ folder next to the
+  source and named by the source's hash, so they are only generated once
+- srcset listing those variants, plus sizes: the author's data-sizes hint if the
+  tag has one, else an existing sizes, else DEFAULT_SIZES
+The src stays on the original file as the fallback.
+
+Variants need Pillow; without it only width/height are added and existing srcset
+attributes are left as they are. The CLI also reports images/ files that nothing
+references.
+"""
+import os
+import re
+import sys
+import glob
+import struct
+import hashlib
+import argparse
+import posixpath
+from urllib.parse import quote, unquote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import add_collapsible_sections as acs  # type: ignore
+import fingerprint  # type: ignore
+
+try:
+    from PIL import Image
+except ImportError:  # variants are skipped, dimensions still work
+    Image = None
+
+CONTENT_DIR = os.path.join(ROOT, 'Content')
+IMAGES_DIR = os.path.join(ROOT, 'images')
+INDEX_HTML = os.path.join(ROOT, 'index.html')
+VARIANT_DIRNAME = '_resized'
+WIDTHS = (160, 320, 640, 960, 1280, 1920)
+WEBP_QUALITY = 80
+DEFAULT_SIZES = '(max-width: 800px) 100vw, 800px'
+RASTER_EXTS = {'.png', '.jpg', '.jpeg', '.gif', '.webp'}
+
+IMG_PATTERN = re.compile(r"<img\b(?:[^>\"']|\"[^\"]*\"|'[^']*')*>", re.IGNORECASE)
+ATTR_PATTERN = r"\s{name}\s*=\s*(?:\"([^\"]*)\"|'([^']*)')"
+IMAGE_REF_PATTERN = re.compile(r"""images/([^"'()\s?#<>]+)""")
+
+def _attr(tag: str, name: str) -> str | None:
+    m = re.search(ATTR_PATTERN.format(name=name), tag, re.IGNORECASE)
+    return None if m is None else (m.group(1) if m.group(1) is not None else m.group(2))
+
+def _set_attr(tag: str, name: str, value: str) -> str:
+    m = re.search(ATTR_PATTERN.format(name=name), tag, re.IGNORECASE)
+    if m:
+        return tag[:m.start()] + f' {name}="{value}"' + tag[m.end():]
+    end = len(tag) - (2 if tag.endswith('/>') else 1)
+    head = tag[:end].rstrip()
+    return f'{head} {name}="{value}"' + (' />' if tag.endswith('/>') else '>')
+
+def image_size(path: str) -> tuple[int, int] | None:
+    """(width, height) from a PNG/GIF/JPEG/WebP header, or None if unrecognized."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(32)
+            if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+                return struct.unpack('>II', head[16:24])
+            if head[:6] in (b'GIF87a', b'GIF89a'):
+                return struct.unpack('<HH', head[6:10])
+            if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+                if head[12:16] == b'VP8X':
+                    w = int.from_bytes(head[24:27], 'little') + 1
+                    h = int.from_bytes(head[27:30], 'little') + 1
+                    return w, h
+                if head[12:16] == b'VP8L':
+                    bits = int.from_bytes(head[21:25], 'little')
+                    return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+                f.seek(26)
+                w, h = struct.unpack('<HH', f.read(4))
+                return w & 0x3FFF, h & 0x3FFF
+            if head[:2] == b'\xff\xd8':
+                # Walk JPEG segments to the first start-of-frame marker
+                f.seek(2)
+                while True:
+                    marker = f.read(2)
+                    if len(marker) < 2 or marker[0] != 0xFF:
+                        return None
+                    if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+                        continue
+                    length = struct.unpack('>H', f.read(2))[0]
+                    if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                        h, w = struct.unpack('>xHH', f.read(5))
+                        return w, h
+                    f.seek(length - 2, 1)
+    except (OSError, struct.error):
+        pass
+    return None
+
+def variant_widths(width: int) -> list[int]:
+    return [w for w in WIDTHS if w < width] + [width]
+
+_digests: dict[tuple[str, int, int], str] = {}
+
+def _source_digest(path: str) -> str:
+    # Sources are megabytes; hash each one once per process while it is unchanged
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _digests:
+        with open(path, 'rb') as f:
+            _digests[key] = hashlib.sha256(f.read()).hexdigest()[:10]
+    return _digests[key]
+
+def ensure_variants(path: str, size: tuple[int, int], write: bool = True) -> list[tuple[str, int]]:
+    """
+    (file name, width) of the WebP variants of path, creating any that are missing unless write is False.
+    Names embed the source hash, so an unchanged source is never re-encoded.
+    """
+    digest = _source_digest(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    out_dir = os.path.join(os.path.dirname(path), VARIANT_DIRNAME)
+    variants = []
+    missing = []
+    for w in variant_widths(size[0]):
+        name = f"{stem}-{digest}-{w}.webp"
+        variants.append((name, w))
+        if not os.path.exists(os.path.join(out_dir, name)):
+            missing.append((name, w))
+    if missing and write:
+        os.makedirs(out_dir, exist_ok=True)
+        with Image.open(path) as img:
+            img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+            for name, w in missing:
+                h = max(1, round(size[1] * w / size[0]))
+                resized = img if w == size[0] else img.resize((w, h), Image.LANCZOS)
+                # Unique temp name: workers may encode the same image concurrently
+                tmp = os.path.join(out_dir, f"{name}.{os.getpid()}.tmp")
+                resized.save(tmp, 'WEBP', quality=WEBP_QUALITY, method=6)
+                os.replace(tmp, os.path.join(out_dir, name))
+    return variants
+
+def rewrite_images(html: str, page_rel: str, root: str = ROOT, write: bool = True) -> str:
+    """html (at repo path page_rel) with local raster <img> tags made responsive; write=False skips encoding variants."""
+    def repl(m: re.Match) -> str:
+        tag = m.group(0)
+        src = _attr(tag, 'src')
+        key = fingerprint.resolve_ref(src, page_rel) if src else None
+        if not key or os.path.splitext(key)[1].lower() not in RASTER_EXTS:
+            return tag
+        path = os.path.join(root, key)
+        size = image_size(path) if os.path.isfile(path) else None
+        if size is None:
+            return tag
+        if _attr(tag, 'width') is None and _attr(tag, 'height') is None:
+            tag = _set_attr(tag, 'width', str(size[0]))
+            tag = _set_attr(tag, 'height', str(size[1]))
+        if Image is None or key.lower().endswith('.gif'):
+            return tag
+        src_dir = src.split('?', 1)[0].split('#', 1)[0].rsplit('/', 1)[0] if '/' in src else ''
+        prefix = f"{src_dir}/{VARIANT_DIRNAME}/" if src_dir else f"{VARIANT_DIRNAME}/"
+        srcset = ', '.join(f"{prefix}{quote(name)} {w}w" for name, w in ensure_variants(path, size, write))
+        tag = _set_attr(tag, 'srcset', srcset)
+        # sizes only goes in with srcset, so the committed source stays valid markup
+        hint = _attr(tag, 'data-sizes')
+        if hint is not None:
+            tag = _set_attr(tag, 'sizes', hint)
+        elif _attr(tag, 'sizes') is None:
+            tag = _set_attr(tag, 'sizes', DEFAULT_SIZES)
+        return tag
+    return IMG_PATTERN.sub(repl, html)
+
+def unreferenced_images(root: str = ROOT, images_dir: str = IMAGES_DIR) -> list[str]:
+    """images/ files no page, stylesheet or script mentions (generated variants excluded)."""
+    referenced = set()
+    sources = [os.path.join(root, 'index.html')]
+    for pattern in ('Content/**/*.html', 'images/**/*.html', 'css/*.css', 'scripts/**/*.js', 'scripts/*.json'):
+        sources.extend(glob.glob(os.path.join(root, pattern), recursive=True))
+    for path in sources:
+        for ref in IMAGE_REF_PATTERN.findall(acs.read_text_best_effort(path)):
+            referenced.add(posixpath.normpath(unquote(ref)))
+    unused = []
+    for r, dirs, fns in os.walk(images_dir):
+        dirs[:] = sorted(d for d in dirs if d != VARIANT_DIRNAME)
+        for fn in sorted(fns):
+            rel = os.path.relpath(os.path.join(r, fn), images_dir).replace(os.sep, '/')
+            if rel not in referenced:
+                unused.append('images/' + rel)
+    return unused
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Add srcset/sizes and intrinsic sizes to <img> tags, generating WebP variants.')
+    parser.add_argument('--dry-run', action='store_true', help='Report pages that would change without writing pages or variants.')
+    parser.add_argument('--report-only', action='store_true', help='Only list images nothing references.')
+    args = parser.parse_args(argv)
+
+    if not args.report_only:
+        if Image is None:
+            print('Pillow is not installed: adding width/height only, no variants.')
+        targets = [INDEX_HTML] + sorted(glob.glob(os.path.join(CONTENT_DIR, '**', '*.html'), recursive=True))
+        changed = 0
+        for path in targets:
+            html = acs.read_text_best_effort(path)
+            new_html = rewrite_images(html, os.path.relpath(path, ROOT).replace(os.sep, '/'), write=not args.dry_run)
+            if new_html == html:
+                continue
+            changed += 1
+            if not args.dry_run:
+                acs.write_text_utf8(path, new_html)
+            print(f"{'Would update' if args.dry_run else 'Updated'}: {os.path.relpath(path, ROOT)}")
+        print(f"Scanned {len(targets)} file(s); {changed} {'would change' if args.dry_run else 'updated'}.")
+
+    unused = unreferenced_images()
+    if unused:
+        print(f"Unreferenced images ({len(unused)}):")
+        for rel in unused:
+            print(f"  {rel}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
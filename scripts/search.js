@@ -0,0 +1,197 @@
+// ─── Site Search ─────────────────────────────────────────────────────────────
+// Queries the static index built by scripts/search_index.py. index.json lists the
+// pages, sections and term-prefix shards; only the shards a query's terms fall in
+// are fetched (and kept for the rest of the visit). Term normalization must match
+// normalize_terms() in search_index.py.
+
+const SEARCH_INDEX_BASE = 'scripts/search-index/';
+const SEARCH_MAX_RESULTS = 20;
+// Expansions considered for the last (possibly unfinished) query word
+const SEARCH_MAX_PREFIX_TERMS = 30;
+
+// Kept in sync with STOPWORDS in search_index.py
+const STOPWORDS = new Set([
+  'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'in', 'is',
+  'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'we', 'were',
+  'which', 'will', 'with'
+]);
+
+const foldPlural = (term) =>
+  term.length > 3 && term.endsWith('s') && !/(ss|us|is|ies|es)$/.test(term)
+    ? term.slice(0, -1)
+    : term;
+
+const normalizeTerms = (text) =>
+  (String(text || '')
+    .toLowerCase()
+    .normalize('NFKD')
+    .replace(/\p{M}/gu, '')
+    .match(/[\p{L}\p{N}]+/gu) || [])
+    .filter((w) => !STOPWORDS.has(w) && (w.length > 1 || /^\p{N}$/u.test(w)))
+    .map(foldPlural);
+
+let searchMetaPromise = null;
+const searchShards = new Map();
+
+const loadSearchMeta = () => {
+  if (!searchMetaPromise) {
+    const versioned = versionedAssetUrl(`${SEARCH_INDEX_BASE}index.json`);
+    searchMetaPromise = fetch(versioned || `${SEARCH_INDEX_BASE}index.json`, versioned ? {} : { cache: 'no-cache' })
+      .then((res) => {
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        return res.json();
+      })
+      .catch((e) => {
+        searchMetaPromise = null;
+        throw e;
+      });
+  }
+  return searchMetaPromise;
+};
+
+// Shard names are content hashes, so the browser cache can keep them indefinitely
+const loadSearchShard = (meta, prefix) => {
+  const name = meta.shards[prefix];
+  if (!name) return Promise.resolve({});
+  if (!searchShards.has(name)) {
+    searchShards.set(name, fetch(SEARCH_INDEX_BASE + encodeURIComponent(name))
+      .then((res) => (res.ok ? res.json() : {}))
+      .catch(() => {
+        searchShards.delete(name);
+        return {};
+      }));
+  }
+  return searchShards.get(name);
+};
+
+// Ranked [{ path, anchor, pageTitle, sectionTitle, score }] for a free-text query.
+// Every word must match (the last one also as a prefix); documents are scored by
+// summing their precomputed BM25 weights.
+async function searchSite(query, limit = SEARCH_MAX_RESULTS) {
+  const terms = [...new Set(normalizeTerms(query))];
+  if (terms.length === 0) return [];
+  const meta = await loadSearchMeta();
+  const shards = await Promise.all(terms.map((t) => loadSearchShard(meta, t.slice(0, meta.prefixLen))));
+
+  let scores = null;
+  terms.forEach((term, i) => {
+    const shard = shards[i];
+    const expansions = i === terms.length - 1 && !/\s$/.test(query)
+      ? Object.keys(shard).filter((t) => t.startsWith(term)).slice(0, SEARCH_MAX_PREFIX_TERMS)
+      : [term];
+    const termScores = new Map();
+    expansions.forEach((t) => {
+      const postings = shard[t];
+      if (!postings) return;
+      // Exact matches outrank completions
+      const factor = t === term ? 1 : 0.8;
+      for (let k = 0; k < postings.length; k += 2) {
+        const doc = postings[k];
+        termScores.set(doc, Math.max(termScores.get(doc) || 0, postings[k + 1] * factor));
+      }
+    });
+    if (scores === null) {
+      scores = termScores;
+      return;
+    }
+    const next = new Map();
+    scores.forEach((s, doc) => {
+      if (termScores.has(doc)) next.set(doc, s + termScores.get(doc));
+    });
+    scores = next;
+  });
+
+  return [...scores.entries()]
+    .sort((a, b) => b[1] - a[1])
+    .slice(0, limit)
+    .map(([doc, score]) => {
+      const [pageIdx, anchor, sectionTitle] = meta.docs[doc];
+      const [path, pageTitle] = meta.pages[pageIdx];
+      return { path, anchor, pageTitle, sectionTitle, score };
+    });
+}
+
+// Navigate to a result: load the page, then let the hash deep-link open its section
+const openSearchResult = (path, anchor) => {
+  if (path === getCurrentPath()) {
+    if (anchor) window.location.hash = anchor;
+    return;
+  }
+  navigateTo(path);
+  if (anchor) {
+    history.replaceState(history.state, '', `${window.location.search}#${encodeURIComponent(anchor)}`);
+  }
+};
+
+const setupSearchBox = () => {
+  const input = document.getElementById('searchBox');
+  const list = document.getElementById('searchResults');
+  if (!input || !list) return;
+
+  let timer = null;
+  let seq = 0;
+  const render = (results, query) => {
+    list.innerHTML = '';
+    if (!query.trim()) {
+      list.hidden = true;
+      return;
+    }
+    if (results.length === 0) {
+      const li = document.createElement('li');
+      li.className = 'search-empty';
+      li.textContent = 'No matches';
+      list.appendChild(li);
+    }
+    results.forEach((r) => {
+      const li = document.createElement('li');
+      const a = document.createElement('a');
+      a.href = `?path=${encodeURIComponent(r.path)}${r.anchor ? `#${encodeURIComponent(r.anchor)}` : ''}`;
+      a.textContent = r.pageTitle || r.path.split('/').pop();
+      if (r.sectionTitle) {
+        const sub = document.createElement('span');
+        sub.className = 'search-section';
+        sub.textContent = r.sectionTitle;
+        a.appendChild(sub);
+      }
+      a.addEventListener('click', (e) => {
+        if (e.ctrlKey || e.metaKey || e.shiftKey || e.button !== 0) return;
+        e.preventDefault();
+        e.stopPropagation();
+        list.hidden = true;
+        openSearchResult(r.path, r.anchor);
+      });
+      li.appendChild(a);
+      list.appendChild(li);
+    });
+    list.hidden = false;
+  };
+
+  const run = () => {
+    const query = input.value;
+    const mine = ++seq;
+    searchSite(query)
+      .then((results) => { if (mine === seq) render(results, query); })
+      .catch((e) => {
+        console.error('Search unavailable:', e);
+        if (mine === seq) render([], query);
+      });
+  };
+
+  input.addEventListener('input', () => {
+    clearTimeout(timer);
+    timer = setTimeout(run, 120);
+  });
+  // Fetch index.json on first focus so the first query only waits for its shards
+  input.addEventListener('focus', () => { loadSearchMeta().catch(() => {}); }, { once: true });
+  input.addEventListener('keydown', (e) => {
+    if (e.key === 'Escape') {
+      input.value = '';
+      render([], '');
+    } else if (e.key === 'Enter') {
+      const first = list.querySelector('a');
+      if (first) first.click();
+    }
+  });
+};
+
+document.addEventListener('DOMContentLoaded', setupSearchBox);
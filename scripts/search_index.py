@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Static full-text search index.
+
+Every page in the menu (no DRAFTs, no old/images/figures) is split into documents:
+one per titled <section> (addressed by the same anchor loadContent.js gives it:
+its id, else slugify(section-title)) plus one for text outside any section. Each
+document's visible text and titles are normalized into terms and weighted with
+BM25, so the client only has to add weights up.
+
+Output under scripts/search-index/:
+- index.json: pages, documents, and the shard file for each term prefix
+- <prefix>.<hash>.json: {term: [doc, weight, doc, weight, ...]} for terms starting
+  with that prefix; weights are BM25 scores x100, rounded to integers
+Shard names are content hashes so they can be cached forever; search.js fetches
+index.json and then only the shards a query's terms fall in.
+"""
+import os
+import re
+import sys
+import json
+import math
+import hashlib
+import argparse
+import unicodedata
+from html import unescape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import add_collapsible_sections as acs  # type: ignore
+import create_JSON  # type: ignore
+import section_index as sidx  # type: ignore
+
+CONTENT_DIR = os.path.join(ROOT, 'Content')
+INDEX_DIR = os.path.join(ROOT, 'scripts', 'search-index')
+INDEX_FORMAT = 1
+
+# Terms are sharded by their first PREFIX_LEN characters
+PREFIX_LEN = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Title terms count this many times over body occurrences
+TITLE_BOOST = 3
+
+# Kept in sync with STOPWORDS in search.js
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'we', 'were',
+    'which', 'will', 'with',
+}
+SKIP_TEXT_TAGS = ('script', 'style', 'textarea', 'template', 'svg', 'noscript')
+
+TAG_PATTERN = re.compile(r"<!--.*?-->|<![^>]*>|<\?[^>]*>|</?([a-zA-Z][\w:-]*)(?:[^>\"']|\"[^\"]*\"|'[^']*')*>", re.DOTALL)
+SKIP_BLOCK_PATTERN = re.compile(rf"<({'|'.join(SKIP_TEXT_TAGS)})\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+TITLE_PATTERN = re.compile(r"<title\b[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+H1_PATTERN = re.compile(r"<h1\b[^>]*>(.*?)</h1\s*>", re.IGNORECASE | re.DOTALL)
+BODY_PATTERN = re.compile(r"<body\b[^>]*>", re.IGNORECASE)
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+def normalize_terms(text: str) -> list[str]:
+    """Lowercase, strip accents, split on non-alphanumerics, drop stopwords and 1-letter words, fold plurals."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    terms = []
+    for w in WORD_PATTERN.findall(text):
+        if w in STOPWORDS or (len(w) < 2 and not w.isdigit()):
+            continue
+        terms.append(fold_plural(w))
+    return terms
+
+def fold_plural(term: str) -> str:
+    # Deliberately tiny: 'trees' -> 'tree', 'vertices'/'classes'/'analysis' are left alone
+    if len(term) > 3 and term.endswith('s') and not term.endswith(('ss', 'us', 'is', 'ies', 'es')):
+        return term[:-1]
+    return term
+
+def _text(fragment: str) -> str:
+    return re.sub(r"\s+", ' ', unescape(TAG_PATTERN.sub(' ', fragment))).strip()
+
+def extract_page(html: str) -> dict:
+    """
+    Searchable content of one page:
+    {'title': str, 'docs': [[anchor, section_title, {term: tf}, length], ...]}
+    where anchor '' is the page itself (text outside any titled section).
+    """
+    m = TITLE_PATTERN.search(html) or H1_PATTERN.search(html)
+    title = _text(m.group(1)) if m else ''
+    bm = BODY_PATTERN.search(html)
+    body = html[bm.end():] if bm else html
+    # Blank out non-visible blocks in place so section offsets stay valid
+    body = SKIP_BLOCK_PATTERN.sub(lambda mm: ' ' * len(mm.group(0)), body)
+    index = sidx.build_section_index(body)
+
+    # Anchor for every titled section, numbered like the client's fallback ids
+    anchors: dict[int, tuple[str, str]] = {}
+    n = 0
+    for rec in index['opens']:
+        if not sidx.TITLE_ATTR_PATTERN.search(rec['attrs']):
+            continue
+        n += 1
+        sec_title = _text(rec['title'])
+        anchors[rec['start']] = ((rec['id'] or '').strip() or acs.slugify(sec_title) or f"section-{n}", sec_title)
+
+    docs: dict[str, list] = {'': ['', '', {}, 0]}
+    def add(anchor: str, sec_title: str, text: str, boost: int = 1):
+        doc = docs.get(anchor)
+        if doc is None:
+            doc = docs[anchor] = [anchor, sec_title, {}, 0]
+        for t in normalize_terms(text):
+            doc[2][t] = doc[2].get(t, 0) + boost
+            doc[3] += boost
+
+    add('', '', title, TITLE_BOOST)
+    for anchor, sec_title in anchors.values():
+        add(anchor, sec_title, sec_title, TITLE_BOOST)
+    pos = 0
+    for tm in list(TAG_PATTERN.finditer(body)) + [None]:
+        end = tm.start() if tm else len(body)
+        if end > pos and body[pos:end].strip():
+            rec = sidx.innermost_section(index, pos)
+            while rec is not None and rec['start'] not in anchors:
+                rec = rec['parent']
+            anchor, sec_title = anchors[rec['start']] if rec is not None else ('', '')
+            add(anchor, sec_title, unescape(body[pos:end]))
+        if tm:
+            pos = tm.end()
+    return {'title': title, 'docs': [d for d in docs.values() if d[3]]}
+
+def is_indexed(rel: str) -> bool:
+    """Pages that appear in the menu: no DRAFTs and nothing under an ignored directory."""
+    parts = rel.split('/')
+    return (len(parts) > 1 and 'DRAFT' not in parts[-1].upper()
+            and not any(p.lower() in create_JSON.IGNORE_DIRS for p in parts[:-1]))
+
+def build_index(pages: dict[str, dict]) -> tuple[dict, dict[str, bytes]]:
+    """
+    BM25-weight the extracted pages ({Content-relative path: extract_page result}).
+    Returns (index.json contents, {shard file name: bytes}).
+    """
+    page_list = []
+    doc_list = []
+    doc_terms = []
+    for rel in sorted(pages):
+        page = pages[rel]
+        page_list.append([rel[:-len('.html')], page['title']])
+        for anchor, sec_title, tf, length in page['docs']:
+            doc_list.append([len(page_list) - 1, anchor, sec_title])
+            doc_terms.append((tf, length))
+
+    n_docs = len(doc_terms)
+    avg_len = sum(length for _tf, length in doc_terms) / n_docs if n_docs else 0
+    postings: dict[str, list[int]] = {}
+    for d, (tf, _length) in enumerate(doc_terms):
+        for t in tf:
+            postings.setdefault(t, []).append(d)
+    shards: dict[str, dict[str, list[int]]] = {}
+    for t in sorted(postings):
+        docs = postings[t]
+        idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+        flat = []
+        for d in docs:
+            f, length = doc_terms[d][0][t], doc_terms[d][1]
+            w = idf * f * (BM25_K1 + 1) / (f + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len))
+            flat.extend((d, max(1, round(w * 100))))
+        shards.setdefault(t[:PREFIX_LEN], {})[t] = flat
+
+    files: dict[str, bytes] = {}
+    shard_names: dict[str, str] = {}
+    for prefix, terms in shards.items():
+        data = json.dumps(terms, separators=(',', ':'), ensure_ascii=False, sort_keys=True).encode('utf-8')
+        name = f"{prefix}.{hashlib.sha256(data).hexdigest()[:12]}.json"
+        files[name] = data
+        shard_names[prefix] = name
+    meta = {
+        'format': INDEX_FORMAT, 'prefixLen': PREFIX_LEN,
+        'pages': page_list, 'docs': doc_list, 'shards': shard_names,
+    }
+    return meta, files
+
+def write_index(meta: dict, files: dict[str, bytes], out_dir: str = INDEX_DIR) -> tuple[bool, int]:
+    """Write index.json and any missing shards, delete shards no longer listed. Returns (index.json written, shards removed)."""
+    os.makedirs(out_dir, exist_ok=True)
+    for name, data in files.items():
+        path = os.path.join(out_dir, name)
+        if not os.path.exists(path):
+            create_JSON.write_if_changed(path, data)
+    wrote = create_JSON.write_if_changed(
+        os.path.join(out_dir, 'index.json'),
+        json.dumps(meta, separators=(',', ':'), ensure_ascii=False).encode('utf-8'),
+    )
+    stale = [fn for fn in os.listdir(out_dir) if fn.endswith('.json') and fn != 'index.json' and fn not in files]
+    for fn in stale:
+        os.remove(os.path.join(out_dir, fn))
+    return wrote, len(stale)
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Build the static search index for all menu pages under Content/.')
+    parser.add_argument('--content-dir', default=CONTENT_DIR, help='Content root to index.')
+    parser.add_argument('--out-dir', default=INDEX_DIR, help='Where to write index.json and its shards.')
+    args = parser.parse_args(argv)
+
+    pages = {}
+    for r, dirs, fns in os.walk(args.content_dir):
+        dirs.sort()
+        for fn in fns:
+            if not fn.lower().endswith('.html'):
+                continue
+            rel = os.path.relpath(os.path.join(r, fn), args.content_dir).replace(os.sep, '/')
+            if is_indexed(rel):
+                pages[rel] = extract_page(acs.read_text_best_effort(os.path.join(r, fn)))
+    meta, files = build_index(pages)
+    wrote, removed = write_index(meta, files, args.out_dir)
+    print(f"Indexed {len(meta['pages'])} page(s), {len(meta['docs'])} section(s) into {len(files)} shard(s); "
+          f"index.json {'updated' if wrote else 'unchanged'}, {removed} stale shard(s) removed.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import re
+import bisect
+
+# One cheap scan finds every tag start the section tooling cares about; each
+# candidate is then classified with the same patterns the passes used to run
+# over the whole body on their own.
+TOKEN_PATTERN = re.compile(r"<\s*/?\s*(section|h2|div|iframe)", re.IGNORECASE)
+
+SECTION_START_PATTERN = re.compile(r"<\s*section\b", re.IGNORECASE)
+SECTION_OPEN_PATTERN = re.compile(r"<\s*section\b([^>]*)>", re.IGNORECASE)
+SECTION_CLOSE_PATTERN = re.compile(r"</\s*section\s*>", re.IGNORECASE)
+H2_PATTERN = re.compile(r"<h2(\s+[^>]*)?>(.*?)</h2>", re.IGNORECASE | re.DOTALL)
+DEMO_CONTAINER_PATTERN = re.compile(r"<div\s+class=\"embeddedDemoContainer\"[^>]*>", re.IGNORECASE)
+DIV_CLOSE_PATTERN = re.compile(r"</\s*div\s*>", re.IGNORECASE)
+DEMO_IFRAME_PATTERN = re.compile(r"<iframe\b[^>]*class=\"embeddedDemo\"[^>]*>.*?</iframe>", re.IGNORECASE | re.DOTALL)
+ID_ATTR_PATTERN = re.compile(r"\bid=\"([^\"]+)\"", re.IGNORECASE)
+TITLE_ATTR_PATTERN = re.compile(r"section-title\s*=\s*\"([^\"]*)\"", re.IGNORECASE)
+
+# Canonical sections of an algorithm page, in the order the template puts them
+CANON_TITLES = (
+    'Problem Solved',
+    'Design and Strategy',
+    'Interactive Demo',
+    'Implementation in Java, C++, Python',
+    'Time/Space Analysis',
+    'Variations/Improvements',
+    'Helpful Links and Resources',
+    'Reading Comprehension Questions',
+    'In-Class Activities',
+    'Homework Problems',
+)
+
+
+def build_section_index(body_html: str) -> dict:
+    """
+    Tokenize a <body> once and return its section/demo structure:
+    - opens: every <section ...> tag (start, open_end, attrs, id, title, depth, parent)
+      in document order; records that get closed also carry close_start/close_end
+    - sections: the closed open records, in the order their </section> appears
+    - section_starts / close_starts: raw tag positions for nesting-by-count checks
+    - h2s: (start, end, full_html, inner_html) for every <h2>...</h2>
+    - demo_containers: embeddedDemoContainer openers with the end of their first </div>
+    - demo_iframes: (start, end) of every iframe.embeddedDemo
+    """
+    section_starts: list[int] = []
+    opens: list[dict] = []
+    sections: list[dict] = []
+    closes: list[tuple[int, int]] = []
+    h2s: list[tuple[int, int, str, str]] = []
+    containers: list[dict] = []
+    div_closes: list[tuple[int, int]] = []
+    iframes: list[tuple[int, int]] = []
+
+    stack: list[dict] = []
+    open_end = h2_end = container_end = iframe_end = 0
+    for tm in TOKEN_PATTERN.finditer(body_html):
+        pos = tm.start()
+        name = tm.group(1).lower()
+        closing = '/' in tm.group(0)
+        if name == 'section':
+            if closing:
+                cm = SECTION_CLOSE_PATTERN.match(body_html, pos)
+                if not cm:
+                    continue
+                closes.append((cm.start(), cm.end()))
+                if not stack:
+                    continue
+                rec = stack.pop()
+                rec['close_start'] = cm.start()
+                rec['close_end'] = cm.end()
+                sections.append(rec)
+                continue
+            if not SECTION_START_PATTERN.match(body_html, pos):
+                continue
+            section_starts.append(pos)
+            if pos < open_end:
+                continue
+            om = SECTION_OPEN_PATTERN.match(body_html, pos)
+            if not om:
+                continue
+            open_end = om.end()
+            attrs = om.group(1) or ''
+            id_m = ID_ATTR_PATTERN.search(attrs)
+            title_m = TITLE_ATTR_PATTERN.search(attrs)
+            rec = {
+                'start': om.start(),
+                'open_end': om.end(),
+                'attrs': attrs,
+                'id': id_m.group(1) if id_m else '',
+                'title': title_m.group(1) if title_m else '',
+                'depth': len(stack) + 1,
+                'parent': stack[-1] if stack else None,
+                'close_start': None,
+                'close_end': None,
+            }
+            opens.append(rec)
+            stack.append(rec)
+        elif name == 'h2':
+            if closing or pos < h2_end:
+                continue
+            hm = H2_PATTERN.match(body_html, pos)
+            if hm:
+                h2_end = hm.end()
+                h2s.append((hm.start(), hm.end(), hm.group(0), hm.group(2)))
+        elif name == 'div':
+            if closing:
+                dm = DIV_CLOSE_PATTERN.match(body_html, pos)
+                if dm:
+                    div_closes.append((dm.start(), dm.end()))
+                continue
+            if pos < container_end:
+                continue
+            dm = DEMO_CONTAINER_PATTERN.match(body_html, pos)
+            if dm:
+                container_end = dm.end()
+                containers.append({'start': dm.start(), 'open_end': dm.end(), 'end': None})
+        else:
+            if closing or pos < iframe_end:
+                continue
+            im = DEMO_IFRAME_PATTERN.match(body_html, pos)
+            if im:
+                iframe_end = im.end()
+                iframes.append((im.start(), im.end()))
+
+    # Pair each demo container with the first </div> after its opening tag
+    div_close_starts = [s for s, _e in div_closes]
+    for cont in containers:
+        k = bisect.bisect_left(div_close_starts, cont['open_end'])
+        if k < len(div_closes):
+            cont['end'] = div_closes[k][1]
+
+    return {
+        'section_starts': section_starts,
+        'opens': opens,
+        'open_ends': [rec['open_end'] for rec in opens],
+        'sections': sections,
+        'closes': closes,
+        'close_starts': [s for s, _e in closes],
+        'h2s': h2s,
+        'demo_containers': containers,
+        'demo_container_starts': [c['start'] for c in containers],
+        'demo_iframes': iframes,
+        'demo_iframe_starts': [s for s, _e in iframes],
+    }
+
+
+def inside_section(index: dict, pos: int, inclusive: bool = False) -> bool:
+    """True when more <section openers than </section> closers precede pos (at or before, if inclusive)."""
+    count = bisect.bisect_right if inclusive else bisect.bisect_left
+    return count(index['section_starts'], pos) - count(index['close_starts'], pos) > 0
+
+
+def first_close_after(index: dict, pos: int) -> tuple[int, int] | None:
+    """(start, end) of the first </section> starting at or after pos."""
+    k = bisect.bisect_left(index['close_starts'], pos)
+    return index['closes'][k] if k < len(index['closes']) else None
+
+
+def innermost_section(index: dict, pos: int) -> dict | None:
+    """Deepest closed section whose content (open_end..close_start) contains pos."""
+    k = bisect.bisect_right(index['open_ends'], pos)
+    rec = index['opens'][k - 1] if k else None
+    while rec is not None:
+        if rec['close_start'] is not None and rec['open_end'] <= pos <= rec['close_start']:
+            return rec
+        rec = rec['parent']
+    return None
+
+
+def has_demo_between(index: dict, start: int, end: int) -> bool:
+    """True when a demo container or demo iframe begins in [start, end)."""
+    for starts in (index['demo_container_starts'], index['demo_iframe_starts']):
+        k = bisect.bisect_left(starts, start)
+        if k < len(starts) and starts[k] < end:
+            return True
+    return False
+
+
+def demo_blocks(index: dict) -> list[tuple[int, int]]:
+    """(start, end) of each demo: closed containers if the page has any, else the raw iframes."""
+    blocks = []
+    last_end = 0
+    for cont in index['demo_containers']:
+        if cont['end'] is None or cont['start'] < last_end:
+            continue
+        blocks.append((cont['start'], cont['end']))
+        last_end = cont['end']
+    return blocks or list(index['demo_iframes'])
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Local static server for testing the built site.
+
+Serves the repo at /Algorithms/ (the path the site is deployed under) and, like a
+production server with gzip_static/brotli_static, answers from the .br/.gz
+sidecars written by scripts/precompress.py when the request's Accept-Encoding
+allows it. Responses carry a strong ETag (If-None-Match gets a 304) and
+Cache-Control: immutable for fingerprinted URLs (?v=<hash>) and content-hashed
+files, no-cache (always revalidate) for everything else.
+"""
+import os
+import re
+import sys
+import hashlib
+import argparse
+import posixpath
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, unquote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SITE_PREFIX = '/Algorithms/'
+# Preferred first when the client accepts both equally
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+# Paths whose names already change with their content
+HASHED_PATH_PATTERN = re.compile(
+    r"(^|/)_resized/|^scripts/glossary-shards/|^scripts/search-index/(?!index\.json$)|^scripts/menu/(?!index\.json$)")
+VERSION_QUERY_PATTERN = re.compile(r"(^|&)v=[0-9a-f]+(&|$)")
+
+def accepted_encodings(header: str | None) -> dict[str, float]:
+    """{coding: q} from an Accept-Encoding header ('*' included as given)."""
+    out = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        m = re.search(r"q\s*=\s*([0-9.]+)", params)
+        if m:
+            try:
+                q = float(m.group(1))
+            except ValueError:
+                q = 0.0
+        out[coding] = q
+    return out
+
+def choose_encoding(header: str | None, path: str) -> tuple[str | None, str]:
+    """(Content-Encoding or None, file to send) for the best sidecar the client accepts."""
+    accepted = accepted_encodings(header)
+    best = (None, path, 0.0)
+    for coding, ext in ENCODINGS:
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best[2] and os.path.isfile(path + ext):
+            best = (coding, path + ext, q)
+    return best[0], best[1]
+
+_etags: dict[tuple[str, int, int], str] = {}
+
+def etag_for(path: str) -> str:
+    # Hash of the bytes actually sent, so each encoding has its own tag
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _etags:
+        with open(path, 'rb') as f:
+            _etags[key] = '"' + hashlib.sha256(f.read()).hexdigest()[:20] + '"'
+    return _etags[key]
+
+def cache_control(rel: str, query: str) -> str:
+    return IMMUTABLE if VERSION_QUERY_PATTERN.search(query) or HASHED_PATH_PATTERN.search(rel) else REVALIDATE
+
+class SiteHandler(SimpleHTTPRequestHandler):
+    # Subclasses (scripts/watch.py) turn these off for a development server
+    use_sidecars = True
+    allow_immutable = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=ROOT, **kwargs)
+
+    def _redirect(self, location: str) -> None:
+        self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def resolve(self, url) -> tuple[str, str] | None:
+        """(repo-relative path, file path) the request maps to; None once a redirect or error has been sent."""
+        query = f"?{url.query}" if url.query else ''
+        if url.path in ('', '/') or url.path == SITE_PREFIX.rstrip('/'):
+            self._redirect(SITE_PREFIX + query)
+            return None
+        if not url.path.startswith(SITE_PREFIX):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        rel = posixpath.normpath(unquote(url.path[len(SITE_PREFIX):]) or '.')
+        if rel.startswith('..') or rel.startswith('/'):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        path = os.path.join(ROOT, rel)
+        if os.path.isdir(path):
+            if not url.path.endswith('/'):
+                self._redirect(url.path + '/' + query)
+                return None
+            path = os.path.join(path, 'index.html')
+            rel = posixpath.join(rel, 'index.html')
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        return rel, path
+
+    def send_head(self):
+        url = urlsplit(self.path)
+        target = self.resolve(url)
+        if target is None:
+            return None
+        rel, path = target
+
+        encoding, send_path = choose_encoding(self.headers.get('Accept-Encoding'), path) if self.use_sidecars else (None, path)
+        etag = etag_for(send_path)
+        headers = {
+            'ETag': etag,
+            'Cache-Control': cache_control(rel, url.query) if self.allow_immutable else REVALIDATE,
+            'Vary': 'Accept-Encoding',
+        }
+        inm = self.headers.get('If-None-Match')
+        if inm and (inm.strip() == '*' or etag in [t.strip() for t in inm.split(',')]):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.end_headers()
+            return None
+        try:
+            f = open(send_path, 'rb')
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        self.send_response(HTTPStatus.OK)
+        # Type of the original file, not of its sidecar
+        self.send_header('Content-Type', self.guess_type(path))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(os.fstat(f.fileno()).st_size))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        return f
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=f'Serve the site at http://localhost:PORT{SITE_PREFIX} using precompressed sidecars.')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000).')
+    parser.add_argument('--bind', default='127.0.0.1', help='Address to bind (default: 127.0.0.1).')
+    args = parser.parse_args(argv)
+
+    with ThreadingHTTPServer((args.bind, args.port), SiteHandler) as httpd:
+        print(f"Serving {ROOT} at http://{args.bind}:{httpd.server_address[1]}{SITE_PREFIX} (Ctrl+C to stop)")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
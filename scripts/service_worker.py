@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Service worker generation.
+
+sw.js is scripts/sw-template.js with a precache list filled in from the build:
+the shell (index.html plus every fingerprinted asset at its ?v=<hash> URL and
+the per-chapter menu files) and the menu pages at their fingerprinted URLs.
+The worker's version is a hash of that list, so any changed file makes browsers
+pick up a new worker and retire the old shell cache; unchanged files stay cached.
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import create_JSON  # type: ignore
+import fingerprint  # type: ignore
+
+TEMPLATE_PATH = os.path.join(ROOT, 'scripts', 'sw-template.js')
+SW_PATH = os.path.join(ROOT, 'sw.js')
+# Site-relative files that are no use to the browser
+SKIP_ASSETS = {'scripts/sw-template.js', 'scripts/asset-manifest.json', 'scripts/head-snippets.json'}
+
+def page_url(menu_path: str) -> str:
+    # Same encoding as normalizePath() in loadContent.js
+    return 'Content/' + quote(menu_path, safe="/!~*'()") + '.html'
+
+def precache_manifest(versions: dict[str, str], menu_paths: list[str], menu_dir: str = create_JSON.MENU_DATA_DIR) -> dict:
+    """{'shell': [url], 'pages': [url]} with URLs relative to the site root."""
+    shell = ['./']
+    for rel, h in versions.items():
+        if not rel.startswith('Content/') and rel not in SKIP_ASSETS:
+            shell.append(f"{rel}?v={h}")
+    # Menu chapter files already carry their hash in the name
+    try:
+        with open(os.path.join(menu_dir, 'index.json'), 'r', encoding='utf-8') as f:
+            chapters = json.load(f)['chapters']
+        shell.extend('scripts/menu/' + quote(c['file']) for c in chapters.values())
+    except (OSError, ValueError, KeyError):
+        pass
+    pages = []
+    for p in menu_paths:
+        h = versions.get(f"Content/{p}.html")
+        if h:
+            pages.append(f"{page_url(p)}?v={h}")
+    return {'shell': shell, 'pages': pages}
+
+def render_service_worker(manifest: dict, template: str) -> str:
+    payload = json.dumps(manifest, separators=(',', ':'), ensure_ascii=False)
+    version = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+    out = template.replace("'__VERSION__'", json.dumps(version), 1)
+    return re.sub(r"\b__PRECACHE__\b", lambda _m: payload, out, count=1)
+
+def write_service_worker(versions: dict[str, str], menu_paths: list[str], out_path: str = SW_PATH) -> tuple[dict, bool]:
+    """Write sw.js for these asset/page hashes. Returns (precache manifest, written)."""
+    manifest = precache_manifest(versions, menu_paths)
+    with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+        template = f.read()
+    wrote = create_JSON.write_if_changed(out_path, render_service_worker(manifest, template).encode('utf-8'))
+    return manifest, wrote
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Write sw.js from the asset manifest and the menu pages.')
+    parser.add_argument('--manifest', default=fingerprint.MANIFEST_PATH, help='Asset manifest written by scripts/fingerprint.py.')
+    parser.add_argument('--out', default=SW_PATH, help='Where to write the service worker.')
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.manifest, 'r', encoding='utf-8') as f:
+            versions = json.load(f)
+    except (OSError, ValueError):
+        print(f"No asset manifest at {os.path.relpath(args.manifest)}; run scripts/fingerprint.py first.")
+        return 1
+    menu_paths = create_JSON.build_menu_paths(create_JSON.load_chapters_json())
+    manifest, wrote = write_service_worker(versions, menu_paths, args.out)
+    print(f"Service worker: {len(manifest['shell'])} shell file(s), {len(manifest['pages'])} page(s); "
+          f"{os.path.basename(args.out)} {'updated' if wrote else 'unchanged'}.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 import os
 import re
+import argparse
+
+import build_manifest as bm
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DEMOS_DIR = os.path.join(ROOT, 'Content', 'Demos')
+MANIFEST_KEY = 'strip_demos_collapsible'
 
 def strip_attrs(html: str) -> str:
     # Remove section-title and data-section-title attributes
@@ -25,7 +29,14 @@ def process_file(path: str) -> bool:
         f.write(new_content)
     return True
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Strip section-title attributes from demo pages.')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the build manifest and re-check every file.')
+    args = parser.parse_args(argv)
+
+    # Demo pages already found clean by this version of the script are skipped
+    manifest = None if args.no_cache else bm.load_manifest()
+    version = bm.script_version(os.path.abspath(__file__))
     changed = 0
     scanned = 0
     for root, _, files in os.walk(DEMOS_DIR):
@@ -34,9 +45,15 @@ def main():
                 continue
             p = os.path.join(root, fn)
             scanned += 1
+            if manifest is not None and bm.lookup(manifest, p, MANIFEST_KEY, version) == (True, 'unchanged'):
+                continue
             if process_file(p):
                 changed += 1
                 print(f"Fixed: {os.path.relpath(p, ROOT)}")
+            elif manifest is not None:
+                bm.record(manifest, p, MANIFEST_KEY, version, 'unchanged')
+    if manifest is not None:
+        bm.save_manifest(manifest)
     print(f"Scanned {scanned} demo HTML files; changed {changed}.")
 
 if __name__ == '__main__':
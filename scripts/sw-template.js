@@ -0,0 +1,112 @@
+// File: scripts/sw-template.js
+// Template for /sw.js, which scripts/service_worker.py writes at build time with
+// the precache list filled in. Edit this file, not sw.js.
+//
+// - Shell (index.html, CSS, scripts, menu data): cached on install, per build
+// - Fingerprinted URLs (?v=<hash>): cache first; the URL changes with the file
+// - Everything else on this site: stale-while-revalidate
+// - Menu pages: fetched into the cache in the background once active, so the
+//   whole site reads offline
+const VERSION = '__VERSION__';
+const PRECACHE = __PRECACHE__;
+const SHELL_CACHE = `shell-${VERSION}`;
+const RUNTIME_CACHE = 'runtime';
+// Query parameters the site uses to force a fresh copy; such requests skip the cache
+const CACHE_BUST_PARAMS = ['cb', '_', '__retry__'];
+
+const scopeUrl = (url) => new URL(url, self.registration.scope).href;
+
+self.addEventListener('install', (event) => {
+  event.waitUntil(
+    caches.open(SHELL_CACHE)
+      .then((cache) => cache.addAll(PRECACHE.shell))
+      .then(() => self.skipWaiting())
+  );
+});
+
+// Drop cached copies of listed files whose hash has changed
+const pruneRuntime = async () => {
+  const current = new Map();
+  for (const url of [...PRECACHE.shell, ...PRECACHE.pages]) {
+    const u = new URL(scopeUrl(url));
+    current.set(u.pathname, u.href);
+  }
+  const cache = await caches.open(RUNTIME_CACHE);
+  for (const request of await cache.keys()) {
+    const u = new URL(request.url);
+    if (u.searchParams.has('v') && current.has(u.pathname) && current.get(u.pathname) !== u.href) {
+      await cache.delete(request);
+    }
+  }
+};
+
+// One page at a time, so reading is never competing with the warm-up
+const warmPages = async () => {
+  if (self.navigator.connection?.saveData) return;
+  const cache = await caches.open(RUNTIME_CACHE);
+  for (const url of PRECACHE.pages) {
+    try {
+      if (await cache.match(scopeUrl(url))) continue;
+      const res = await fetch(scopeUrl(url));
+      if (res.ok) await cache.put(scopeUrl(url), res);
+    } catch {
+      return; // offline or flaky: try again next activation
+    }
+  }
+};
+
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then((names) => Promise.all(
+        names.filter((n) => n.startsWith('shell-') && n !== SHELL_CACHE).map((n) => caches.delete(n))
+      ))
+      .then(pruneRuntime)
+      .then(() => self.clients.claim())
+  );
+  // Not part of waitUntil: fetches must not wait on it
+  warmPages();
+});
+
+const cacheFirst = async (request) => {
+  const cached = await caches.match(request);
+  if (cached) return cached;
+  const res = await fetch(request);
+  if (res.ok && res.type === 'basic') {
+    const cache = await caches.open(RUNTIME_CACHE);
+    await cache.put(request, res.clone());
+  }
+  return res;
+};
+
+const staleWhileRevalidate = async (event, cacheName, key) => {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(key);
+  const network = fetch(event.request).then((res) => {
+    if (res.ok && res.type === 'basic') cache.put(key, res.clone());
+    return res;
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => {}));
+    return cached;
+  }
+  return network;
+};
+
+self.addEventListener('fetch', (event) => {
+  const { request } = event;
+  if (request.method !== 'GET') return;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin || !url.href.startsWith(self.registration.scope)) return;
+  if (CACHE_BUST_PARAMS.some((p) => url.searchParams.has(p))) return;
+
+  const scopePath = new URL(self.registration.scope).pathname;
+  if (request.mode === 'navigate' && (url.pathname === scopePath || url.pathname === `${scopePath}index.html`)) {
+    // Every route is index.html with a different ?path=
+    event.respondWith(staleWhileRevalidate(event, SHELL_CACHE, scopeUrl('./')));
+  } else if (url.searchParams.has('v')) {
+    event.respondWith(cacheFirst(request));
+  } else {
+    event.respondWith(staleWhileRevalidate(event, RUNTIME_CACHE, request));
+  }
+});
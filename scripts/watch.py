@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Watch mode for authors: serve the site locally and rebuild on save.
+
+Changes under Content/ are debounced and then only the affected work is redone:
+- an edited page goes through the per-page build stages (sections and friends)
+- pages added, removed or renamed (including to/from a DRAFT name) also refresh
+  chapters.json and sitemap.xml, rescanning only the directories whose mtime changed
+Open pages reload themselves afterwards: every HTML response gets a small script
+listening on an event stream the watcher signals once a batch is done.
+
+Uses the watchfiles package for filesystem events when installed, otherwise polls.
+The server never sends precompressed sidecars, immutable caching or the built
+service worker, since all of them would hide edits.
+"""
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+import build  # type: ignore
+import build_manifest as bm  # type: ignore
+import code_highlight  # type: ignore
+import create_JSON  # type: ignore
+import serve  # type: ignore
+
+try:
+    import watchfiles
+except ImportError:  # poll instead
+    watchfiles = None
+
+CONTENT_DIR = build.CONTENT_DIR
+# Whole-site steps (search index, fingerprints, image variants) are left to build.py
+DEFAULT_STAGES = ('sections', 'strip-demo-attrs', 'highlight', 'issues')
+DEBOUNCE = 0.2
+POLL_INTERVAL = 0.5
+RELOAD_PATH = serve.SITE_PREFIX + '__reload'
+# Only the top window reloads; the content iframe comes back with it
+RELOAD_SCRIPT = (
+    '<script>if (window.top === window) '
+    f"new EventSource('{RELOAD_PATH}').onmessage = () => location.reload();</script>\n"
+).encode('utf-8')
+# Event-stream comment sent while idle, so closed tabs are noticed
+KEEPALIVE = 15
+# Served in place of the built sw.js: a worker left over from serve.py or the live
+# site would answer from its caches and hide edits, so it is replaced and removed
+SW_PATH = serve.SITE_PREFIX + 'sw.js'
+UNREGISTER_SW = (
+    "self.addEventListener('install', () => self.skipWaiting());\n"
+    "self.addEventListener('activate', () => self.registration.unregister());\n"
+).encode('utf-8')
+
+_reload = threading.Condition()
+_generation = 0
+
+def signal_reload() -> None:
+    global _generation
+    with _reload:
+        _generation += 1
+        _reload.notify_all()
+
+class DevHandler(serve.SiteHandler):
+    use_sidecars = False
+    allow_immutable = False
+
+    def do_GET(self):
+        if urlsplit(self.path).path == RELOAD_PATH:
+            self.stream_reloads()
+        else:
+            super().do_GET()
+
+    def stream_reloads(self) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        with _reload:
+            seen = _generation
+        try:
+            while True:
+                with _reload:
+                    _reload.wait_for(lambda: _generation != seen, timeout=KEEPALIVE)
+                    current = _generation
+                self.wfile.write(b'data: reload\n\n' if current != seen else b': keepalive\n\n')
+                self.wfile.flush()
+                seen = current
+        except OSError:
+            pass
+
+    def send_head(self):
+        url = urlsplit(self.path)
+        if url.path == SW_PATH:
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', 'text/javascript')
+            self.send_header('Content-Length', str(len(UNREGISTER_SW)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            return io.BytesIO(UNREGISTER_SW)
+        if not url.path.endswith(('/', '.html')):
+            return super().send_head()
+        target = self.resolve(url)
+        if target is None:
+            return None
+        with open(target[1], 'rb') as f:
+            body = f.read()
+        i = body.rfind(b'</body>')
+        body = body[:i] + RELOAD_SCRIPT + body[i:] if i >= 0 else body + RELOAD_SCRIPT
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        return io.BytesIO(body)
+
+def content_snapshot(content_dir: str = CONTENT_DIR) -> dict[str, tuple[int, int]]:
+    """{Content-relative path: (mtime_ns, size)} for every file under content_dir."""
+    out = {}
+    for r, _dirs, fns in os.walk(content_dir):
+        for fn in fns:
+            path = os.path.join(r, fn)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            out[os.path.relpath(path, content_dir).replace(os.sep, '/')] = (st.st_mtime_ns, st.st_size)
+    return out
+
+async def poll_changes(queue: asyncio.Queue, content_dir: str, interval: float) -> None:
+    before = content_snapshot(content_dir)
+    while True:
+        await asyncio.sleep(interval)
+        after = await asyncio.to_thread(content_snapshot, content_dir)
+        changed = {rel for rel in before.keys() | after.keys() if before.get(rel) != after.get(rel)}
+        before = after
+        if changed:
+            queue.put_nowait(changed)
+
+async def watch_changes(queue: asyncio.Queue, content_dir: str) -> None:
+    async for changes in watchfiles.awatch(content_dir, debounce=int(DEBOUNCE * 1000)):
+        queue.put_nowait({os.path.relpath(path, content_dir).replace(os.sep, '/') for _change, path in changes})
+
+async def next_batch(queue: asyncio.Queue, delay: float) -> set[str]:
+    """Changes from the next event plus any that follow within delay of each other."""
+    batch = set(await queue.get())
+    while True:
+        try:
+            batch |= await asyncio.wait_for(queue.get(), delay)
+        except asyncio.TimeoutError:
+            return batch
+
+def rebuild(changed: set[str], state: dict) -> list[str]:
+    """Redo the work a batch of changed Content paths needs; returns a line per thing done."""
+    done = []
+    pages = {rel for rel in changed if rel.lower().endswith('.html')}
+    present = {rel for rel in pages if os.path.isfile(os.path.join(CONTENT_DIR, rel))}
+    if present - state['pages'] or (pages - present) & state['pages']:
+        state['pages'] = (state['pages'] | present) - (pages - present)
+        snapshot = create_JSON.load_snapshot()
+        chapters = create_JSON.collect_chapters(CONTENT_DIR, snapshot)
+        wrote_json = create_JSON.write_if_changed(create_JSON.CHAPTERS_JSON, json.dumps(chapters, indent=2).encode('utf-8'))
+        wrote_sitemap = create_JSON.write_sitemap(create_JSON.build_menu_paths(chapters))
+        wrote_index = create_JSON.write_index_menu(chapters)
+        wrote_menu, _removed = create_JSON.write_menu_data(chapters)
+        create_JSON.save_snapshot(snapshot)
+        status = lambda wrote: 'updated' if wrote else 'unchanged'
+        done.append(f"Menu: rescanned {snapshot['rescanned']} dir(s); chapters.json {status(wrote_json)}, "
+                    f"sitemap.xml {status(wrote_sitemap)}, index.html menu {status(wrote_index)}, menu/index.json {status(wrote_menu)}.")
+    code_blocks = {}
+    for rel in sorted(present):
+        path = os.path.join(CONTENT_DIR, rel)
+        # Our own write-back shows up as a change too; skip it rather than loop
+        if state['written'].get(rel) == bm.file_sha256(path):
+            continue
+        res = build.build_page(rel, stage_names=state['stages'])
+        code_blocks.update(res['code_blocks'])
+        if res['changed']:
+            state['written'][rel] = bm.file_sha256(path)
+            done.append(f"Updated: Content/{rel} ({', '.join(res['stages'])})")
+        for iss in res['issues'] or []:
+            done.append(f"  * Content/{rel}: {iss}")
+    if code_blocks:
+        code_highlight.save_cache(code_blocks)
+    return done
+
+async def run(args: argparse.Namespace) -> None:
+    httpd = ThreadingHTTPServer((args.bind, args.port), DevHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    print(f"Serving {ROOT} at http://{args.bind}:{httpd.server_address[1]}{serve.SITE_PREFIX}")
+
+    queue: asyncio.Queue = asyncio.Queue()
+    if watchfiles is not None and not args.poll:
+        source = watch_changes(queue, CONTENT_DIR)
+        print("Watching Content/ for changes (Ctrl+C to stop)")
+    else:
+        source = poll_changes(queue, CONTENT_DIR, args.interval)
+        print(f"Polling Content/ every {args.interval}s (Ctrl+C to stop)")
+    watcher = asyncio.create_task(source)
+
+    _top_dirs, pages = build.walk_content()
+    state = {'pages': set(pages), 'written': {}, 'stages': args.stages}
+    try:
+        while True:
+            changed = await next_batch(queue, DEBOUNCE)
+            start = time.perf_counter()
+            for line in await asyncio.to_thread(rebuild, changed, state):
+                print(line)
+            signal_reload()
+            print(f"Rebuilt {len(changed)} changed path(s) in {(time.perf_counter() - start) * 1000:.0f} ms; reload sent.")
+    finally:
+        watcher.cancel()
+        httpd.shutdown()
+
+def main(argv: list[str] | None = None) -> int:
+    names = [st['name'] for st in build.STAGES]
+    parser = argparse.ArgumentParser(description='Serve the site and rebuild pages, menu and sitemap as Content/ changes.')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000).')
+    parser.add_argument('--bind', default='127.0.0.1', help='Address to bind (default: 127.0.0.1).')
+    parser.add_argument('--stages', default=','.join(DEFAULT_STAGES), help=f'Comma-separated page stages to run on change (any of {",".join(names)}).')
+    parser.add_argument('--poll', action='store_true', help='Poll for changes even if watchfiles is installed.')
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help=f'Polling interval in seconds (default: {POLL_INTERVAL}).')
+    args = parser.parse_args(argv)
+
+    selected = {s.strip() for s in args.stages.split(',') if s.strip()}
+    unknown = selected - set(names)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    args.stages = tuple(n for n in names if n in selected)
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import glob
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+import add_collapsible_sections as acs  # type: ignore
+
+# (pass, input body, expected output); bodies are cut down from Content pages unless noted
+PASS_CASES = [
+    ('normalize_existing_sections',
+     '\n    <section>\n      <h2>Motivation/Applications</h2>\n      <p>\n'
+     '        Array searching is fundamental in computer science.\n      </p>\n    </section>\n',
+     '\n    <section section-title="Motivation/Applications">\n      <h2>Motivation/Applications</h2>\n      <p>\n'
+     '        Array searching is fundamental in computer science.\n      </p>\n    </section>\n'),
+    ('wrap_demos_with_section',
+     '\n<h2>Demonstration</h2>\n<p>\nPlay with it here, too.\n</p>\n\n'
+     '<div class="embeddedDemoContainer">\n  <iframe class="embeddedDemo"\n'
+     '          src="/Algorithms/Content/Demos/Transform-and-Conquer/Heapsort Demo.html"\n'
+     '          allow="fullscreen"\n          name="heapsort-demo">\n  </iframe>\n</div> \n',
+     '\n<h2>Demonstration</h2>\n<p>\nPlay with it here, too.\n</p>\n\n'
+     '<section id="demo" section-title="Interactive Demo">\n'
+     '<div class="embeddedDemoContainer">\n  <iframe class="embeddedDemo"\n'
+     '          src="/Algorithms/Content/Demos/Transform-and-Conquer/Heapsort Demo.html"\n'
+     '          allow="fullscreen"\n          name="heapsort-demo">\n  </iframe>\n</div>\n</section> \n'),
+    ('move_trailing_demos_out_of_sections',
+     '\n  <section id="exampl1" section-title="Example 1: Factorial">\n'
+     '       <p>\n        Here is a simple demo.\n       </p>\n'
+     '      <div class="embeddedDemoContainer">\n        <iframe\n          class="embeddedDemo"\n'
+     '          src="/Algorithms/Content/Demos/Decrease-and-Conquer/Factorial Demo.html"\n'
+     '        ></iframe>\n      </div>\n  </section>\n',
+     '\n  <section id="exampl1" section-title="Example 1: Factorial">\n'
+     '       <p>\n        Here is a simple demo.\n       </p></section>\n'
+     '<section id="demo" section-title="Interactive Demo">\n'
+     '<div class="embeddedDemoContainer">\n        <iframe\n          class="embeddedDemo"\n'
+     '          src="/Algorithms/Content/Demos/Decrease-and-Conquer/Factorial Demo.html"\n'
+     '        ></iframe>\n      </div>\n</section>\n\n'),
+    ('wrap_sections_in_body',
+     '\n<h1>Heapsort</h1>\n\n<h2>Problem Solved</h2>\n\t<p>Heapsort solves the Sorting problem.</p>\n\n'
+     '<h2>Details</h2>\n<p>\nFor complete details, see <em>Example 3: Heapsort</em>.\n</p>\n',
+     '\n<h1>Heapsort</h1>\n\n<section id="problem-solved" section-title="Problem Solved">\n'
+     '<h2>Problem Solved</h2>\n\t<p>Heapsort solves the Sorting problem.</p>\n\n\n'
+     '</section><section id="details" section-title="Details">\n'
+     '<h2>Details</h2>\n<p>\nFor complete details, see <em>Example 3: Heapsort</em>.\n</p>\n\n</section>'),
+    # A demo with more of the section after it stays where it is
+    ('move_trailing_demos_out_of_sections',
+     '\n  <section id="exampl1" section-title="Example 1: Factorial">\n'
+     '      <div class="embeddedDemoContainer">\n        <iframe\n          class="embeddedDemo"\n'
+     '          src="/Algorithms/Content/Demos/Decrease-and-Conquer/Factorial Demo.html"\n'
+     '        ></iframe>\n      </div>\n'
+     '    <div class="analysis-box">\n      <p>Thus the recursive factorial algorithm runs in linear time.</p>\n'
+     '    </div>\n    </section>\n',
+     '\n  <section id="exampl1" section-title="Example 1: Factorial">\n'
+     '      <div class="embeddedDemoContainer">\n        <iframe\n          class="embeddedDemo"\n'
+     '          src="/Algorithms/Content/Demos/Decrease-and-Conquer/Factorial Demo.html"\n'
+     '        ></iframe>\n      </div>\n'
+     '    <div class="analysis-box">\n      <p>Thus the recursive factorial algorithm runs in linear time.</p>\n'
+     '    </div>\n    </section>\n'),
+    # Synthetic: a stray </iframe> after the last demo is not a demo to move
+    ('move_trailing_demos_out_of_sections',
+     '<section id="a" section-title="A"><p>x</p><iframe class="embeddedDemo" src="d"></iframe></iframe></section>',
+     '<section id="a" section-title="A"><p>x</p><iframe class="embeddedDemo" src="d"></iframe></iframe></section>'),
+    # Synthetic: removing a </section> lines up another nested duplicate
+    ('wrap_sections_in_body',
+     '<section id="a" section-title="A"><section id="a" section-title="A"></section>'
+     '<section id="a" section-title="A"><h2>X</h2>',
+     '<section id="a" section-title="A"><h2>X</h2>'),
+    # Synthetic: after a stray </section>, the h2 right after its own section's open tag is not wrapped again
+    ('wrap_sections_in_body',
+     '<section id="x" section-title="X">\n<h2>X</h2>\n<p>t</p>\n</section>\n</section>\n<h2>Y</h2>',
+     '<section id="x" section-title="X">\n<h2>X</h2>\n<p>t</p>\n</section>\n</section>\n'
+     '<section id="y" section-title="Y">\n<h2>Y</h2>\n</section>'),
+    # Synthetic: an empty demo section is dropped and demo-2 takes its id
+    ('cleanup_empty_and_dedupe_demo_sections',
+     '\n<section id="demo" section-title="Interactive Demo">\n</section>\n'
+     '<section id="demo-2" section-title="Interactive Demo">\n<iframe class="embeddedDemo" src="d"></iframe>\n</section>\n',
+     '\n\n<section id="demo" section-title="Interactive Demo">\n<iframe class="embeddedDemo" src="d"></iframe>\n</section>\n'),
+]
+
+CONTENT_PAGES = sorted(glob.glob(os.path.join(ROOT, 'Content', '**', '*.html'), recursive=True))
+
+@pytest.mark.parametrize('name, body, expected', PASS_CASES)
+def test_pass_output(name, body, expected):
+    fn = getattr(acs, name)
+    assert fn(body) == expected
+    # A second run leaves the output alone
+    assert fn(expected) == expected
+
+def test_apply_edits_orders_and_slices():
+    text = '0123456789'
+    edits = [(5, 7, 'x'), (2, 2, 'a'), (2, 2, 'b'), (2, 3, 'R')]
+    assert acs.apply_edits(text, edits) == '01abR34x789'
+    assert acs.apply_edits(text, [(3, 4, '')], 2, 6) == '245'
+    assert acs.apply_edits(text, []) == text
+
+@pytest.mark.parametrize('edits', [[(1, 4, ''), (3, 5, '')], [(8, 12, '')]])
+def test_apply_edits_rejects_overlap_and_out_of_range(edits):
+    with pytest.raises(ValueError):
+        acs.apply_edits('0123456789', edits)
+
+@pytest.mark.parametrize('path', CONTENT_PAGES, ids=lambda p: os.path.relpath(p, ROOT))
+def test_transform_is_stable_on_content(path):
+    html = acs.read_text_best_effort(path)
+    new_html = acs.transform_html(html)
+    if new_html is None:
+        return
+    assert acs.transform_html(new_html) is None
+
+def test_visible_text_drops_scripts_and_styles():
+    html = '<p>foo<script>var x = "<p>";</script>bar &amp; <b>baz</b></p><style>p {}</style>'
+    assert [w for w, _ in acs.iter_visible_words(html)] == ['foobar', '&', 'baz']
+    assert acs.first_text_difference(html, '<div>foobar\n&amp;baz</div>') == (3, 5, '&', '&baz')
+    assert acs.first_text_difference(html, '<section><p>foobar & baz</p></section>') is None
+
+def test_first_text_difference_reports_missing_words():
+    assert acs.first_text_difference('<p>a b</p>', '<p>a</p>') == (3, 8, 'b', '')
+    assert acs.first_text_difference('', '<p>a</p>') == (0, 3, '', 'a')
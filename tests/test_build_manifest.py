@@ -0,0 +1,73 @@
+import os
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+import build_manifest as bm  # type: ignore
+
+PAGE = os.path.join(ROOT, 'Content', 'Algorithms', 'Brute Force', 'Bubble Sort.html')
+
+def copy_page(tmp_path):
+    path = str(tmp_path / 'Bubble Sort.html')
+    shutil.copyfile(PAGE, path)
+    return path
+
+def test_lookup_hits_only_for_same_content_and_version(tmp_path):
+    path = copy_page(tmp_path)
+    manifest = bm.load_manifest(str(tmp_path / 'missing.json'))
+    assert manifest == {'format': bm.MANIFEST_FORMAT, 'files': {}}
+    assert bm.lookup(manifest, path, 'lint', 'v1') == (False, None)
+    bm.record(manifest, path, 'lint', 'v1', [{'rule': 'draft-leak'}])
+    bm.record(manifest, path, 'acs', 'v1', None)
+    assert bm.lookup(manifest, path, 'lint', 'v1') == (True, [{'rule': 'draft-leak'}])
+    # None is a result too
+    assert bm.lookup(manifest, path, 'acs', 'v1') == (True, None)
+    assert bm.lookup(manifest, path, 'lint', 'v2') == (False, None)
+
+    # Touching the file without changing it keeps the results
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert bm.lookup(manifest, path, 'lint', 'v1') == (True, [{'rule': 'draft-leak'}])
+
+    # New content drops every script's result
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    assert bm.lookup(manifest, path, 'lint', 'v1') == (False, None)
+    assert bm.lookup(manifest, path, 'acs', 'v1') == (False, None)
+    (entry,) = manifest['files'].values()
+    assert entry['sha256'] == bm.file_sha256(path) and entry['results'] == {}
+
+    os.remove(path)
+    assert bm.lookup(manifest, path, 'lint', 'v1') == (False, None)
+    assert bm.prune(manifest) == 1 and manifest['files'] == {}
+
+def test_save_and_load_round_trip(tmp_path):
+    path = copy_page(tmp_path)
+    store = str(tmp_path / 'manifest.json')
+    manifest = bm.load_manifest(store)
+    bm.record(manifest, path, 'lint', 'v1', {'count': 3})
+    bm.save_manifest(manifest, store)
+    assert sorted(os.listdir(tmp_path)) == ['Bubble Sort.html', 'manifest.json']
+    loaded = bm.load_manifest(store)
+    assert loaded == manifest
+    assert bm.lookup(loaded, path, 'lint', 'v1') == (True, {'count': 3})
+    # Saving again writes the same bytes
+    before = open(store, 'rb').read()
+    bm.save_manifest(loaded, store)
+    assert open(store, 'rb').read() == before
+
+def test_unreadable_or_old_manifest_starts_empty(tmp_path):
+    store = tmp_path / 'manifest.json'
+    for text in ('{not json', '[]', '{"format": 0, "files": {"a": {}}}'):
+        store.write_text(text, encoding='utf-8')
+        assert bm.load_manifest(str(store)) == {'format': bm.MANIFEST_FORMAT, 'files': {}}
+
+def test_script_version_follows_source(tmp_path):
+    src = tmp_path / 'tool.py'
+    src.write_text('x = 1\n', encoding='utf-8')
+    dep = os.path.join(ROOT, 'scripts', 'build_manifest.py')
+    v1 = bm.script_version(str(src), dep)
+    assert bm.script_version(str(src), dep) == v1
+    src.write_text('x = 2\n', encoding='utf-8')
+    assert bm.script_version(str(src), dep) != v1
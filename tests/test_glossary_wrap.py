@@ -0,0 +1,77 @@
+import glob
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+import glossary_wrap as gw  # type: ignore
+
+GLOSSARY = gw.load_glossary()
+MATCHER = gw.compile_glossary(GLOSSARY)
+DEFINITIONS = {e['variants'][0]: e.get('definition', '') for e in GLOSSARY}
+
+PAGE = (
+    '<!DOCTYPE html>\n'
+    '<html>\n'
+    '<head>\n'
+    '  <title>Binary Search</title>\n'
+    '</head>\n'
+    '<body>\n'
+    '<div id="content">\n'
+    '<h2>Binary Search</h2>\n'
+    '<p>A binary&nbsp;search tree and a BINARY-SEARCH over a heap. Not binary-searching; see <a href="x">Binary Search</a>.</p>\n'
+    '<p class="tooltip-content">binary search</p>\n'
+    '<pre>binary search</pre>\n'
+    '</div>\n'
+    '</body>\n'
+    '</html>\n'
+)
+
+def span(term, text):
+    return f'<span class="glossary-term" data-term="{term}" style="white-space:nowrap">{text}</span>'
+
+CONTENT_PAGES = sorted(glob.glob(os.path.join(ROOT, 'Content', '**', '*.html'), recursive=True))
+
+def test_wrap_output_shard_and_rerun(tmp_path):
+    out = gw.wrap_glossary_terms(PAGE, MATCHER, str(tmp_path))
+    used = {t: DEFINITIONS[t] for t in ('Binary Search', 'Binary Search Tree', 'Heap')}
+    name, data = gw.glossary_shard(used)
+    # Longest entry wins, separators and entities join parts, and headings, links, <pre> and tooltips are skipped
+    assert out == PAGE.replace(
+        '</head>', f'<meta name="glossary-prewrapped" content="{MATCHER["hash"]}" data-shard="{gw.SHARD_URL}{name}">\n</head>'
+    ).replace(
+        'A binary&nbsp;search tree and a BINARY-SEARCH over a heap.',
+        f'A {span("Binary Search Tree", "binary&nbsp;search tree")} and a {span("Binary Search", "BINARY-SEARCH")} '
+        f'over a {span("Heap", "heap")}.',
+    )
+    assert os.listdir(tmp_path) == [name]
+    assert json.loads((tmp_path / name).read_bytes()) == used
+    assert (tmp_path / name).read_bytes() == data
+    # A rerun gives the same page and shard; unwrapping gives back the authored page
+    assert gw.wrap_glossary_terms(out, MATCHER, str(tmp_path)) == out
+    assert os.listdir(tmp_path) == [name]
+    assert gw.unwrap_glossary_terms(out) == PAGE
+
+def test_find_terms_boundaries_and_priority():
+    rank = {t['canonical']: r for r, t in enumerate(MATCHER['terms'])}
+    raw = 'binary&nbsp;search tree, sub-heap, heaps and a binary heap'
+    assert gw.find_terms(raw, MATCHER) == [
+        (0, 23, rank['Binary Search Tree']),
+        (35, 40, rank['Heap']),
+        (47, 58, rank['Heap']),
+    ]
+
+def test_no_tooltips_page_gets_marker_only(tmp_path):
+    page = PAGE.replace('<body>', '<body class="no-tooltips">')
+    out = gw.wrap_glossary_terms(page, MATCHER, str(tmp_path))
+    assert out == page.replace('</head>', f'<meta name="glossary-prewrapped" content="{MATCHER["hash"]}">\n</head>')
+    assert os.listdir(tmp_path) == []
+
+@pytest.mark.parametrize('path', CONTENT_PAGES, ids=lambda p: os.path.relpath(p, ROOT))
+def test_wrap_is_stable_on_content(path, tmp_path):
+    html = gw.acs.read_text_best_effort(path)
+    out = gw.wrap_glossary_terms(html, MATCHER, str(tmp_path))
+    assert gw.wrap_glossary_terms(out, MATCHER, str(tmp_path)) == out
@@ -0,0 +1,93 @@
+import glob
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+import head_inject as hi  # type: ignore
+
+SNIPPETS = hi.load_snippets()
+ANALYTICS = SNIPPETS['analytics']['html']
+BLOCK = '<!-- head:analytics -->\n' + ANALYTICS + '<!-- /head:analytics -->\n'
+# Has the legacy unmarked analytics copy
+LEGACY_PAGE = os.path.join(ROOT, 'Content', 'Algorithms', 'Brute Force', 'Bubble Sort.html')
+# Has no analytics at all
+BARE_PAGE = os.path.join(ROOT, 'Content', 'Algorithms', 'Greedy', 'Fractional Knapsack.html')
+
+CONTENT_PAGES = sorted(glob.glob(os.path.join(ROOT, 'Content', '**', '*.html'), recursive=True))
+
+def read(path):
+    return hi.acs.read_text_best_effort(path)
+
+def with_enabled(enabled):
+    return {name: dict(spec, enabled=enabled) for name, spec in SNIPPETS.items()}
+
+def test_load_snippets(tmp_path):
+    config = tmp_path / 'snippets.json'
+    config.write_text(json.dumps({'a': {'html': ['<x>', '<y>']}, 'b': {'html': '<z>\n\n', 'enabled': False}}), encoding='utf-8')
+    assert hi.load_snippets(str(config)) == {
+        'a': {'html': '<x>\n<y>\n', 'enabled': True, 'legacy': None},
+        'b': {'html': '<z>\n', 'enabled': False, 'legacy': None},
+    }
+    config.write_text(json.dumps({'a b': {'html': '<x>'}}), encoding='utf-8')
+    with pytest.raises(ValueError):
+        hi.load_snippets(str(config))
+
+def test_inserts_marked_block_before_head_close():
+    text = read(BARE_PAGE)
+    out = hi.apply_snippets(text, SNIPPETS)
+    assert out == text.replace('</head>', BLOCK + '</head>', 1)
+    assert hi.head_edits(out, SNIPPETS) == []
+
+def test_current_legacy_copy_is_left_alone():
+    text = read(LEGACY_PAGE)
+    assert hi.head_edits(text, SNIPPETS) == []
+    # Also when an editor reindented it
+    reformatted = text.replace(ANALYTICS, ''.join('    ' + line for line in ANALYTICS.splitlines(True)))
+    assert reformatted != text
+    assert hi.head_edits(reformatted, SNIPPETS) == []
+
+def test_outdated_legacy_copy_becomes_marked_block():
+    text = read(LEGACY_PAGE)
+    outdated = text.replace(ANALYTICS, ANALYTICS.replace('G-DQ5LVZVFDC', 'G-OLD0001'))
+    assert outdated != text
+    out = hi.apply_snippets(outdated, SNIPPETS)
+    assert out == text.replace(ANALYTICS, BLOCK)
+    assert hi.apply_snippets(out, SNIPPETS) == out
+
+def test_marked_block_is_updated_deduplicated_and_removed():
+    text = read(BARE_PAGE)
+    marked = hi.apply_snippets(text, SNIPPETS)
+    stale = marked.replace(BLOCK, BLOCK.replace("gtag('js', new Date());\n", ''))
+    assert hi.apply_snippets(stale, SNIPPETS) == marked
+    doubled = marked.replace(BLOCK, BLOCK + '  ' + BLOCK)
+    assert hi.apply_snippets(doubled, SNIPPETS) == marked
+    # A disabled snippet or one no longer configured is removed, marked or legacy
+    assert hi.apply_snippets(marked, with_enabled(False)) == text
+    assert hi.apply_snippets(marked, {}) == text
+    legacy = read(LEGACY_PAGE)
+    assert hi.apply_snippets(legacy, with_enabled(False)) == legacy.replace(ANALYTICS, '')
+
+def test_process_file_writes_only_changes(tmp_path):
+    legacy = str(tmp_path / 'legacy.html')
+    bare = str(tmp_path / 'bare.html')
+    shutil.copyfile(LEGACY_PAGE, legacy)
+    shutil.copyfile(BARE_PAGE, bare)
+    os.utime(legacy, ns=(0, 0))
+    assert hi.process_file(legacy, SNIPPETS) == (legacy, False)
+    assert os.stat(legacy).st_mtime_ns == 0
+    assert hi.process_file(bare, SNIPPETS, dry_run=True) == (bare, True)
+    assert read(bare) == read(BARE_PAGE)
+    assert hi.process_file(bare, SNIPPETS) == (bare, True)
+    assert read(bare) == hi.apply_snippets(read(BARE_PAGE), SNIPPETS)
+    assert hi.process_file(bare, SNIPPETS) == (bare, False)
+
+@pytest.mark.parametrize('path', CONTENT_PAGES, ids=lambda p: os.path.relpath(p, ROOT))
+def test_apply_is_stable_on_content(path):
+    out = hi.apply_snippets(read(path), SNIPPETS)
+    assert hi.apply_snippets(out, SNIPPETS) == out
+    assert out.count('googletagmanager.com/gtag/js') == 1
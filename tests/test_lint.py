@@ -0,0 +1,104 @@
+import glob
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+import lint  # type: ignore
+import report_demo_section_issues as rdsi  # type: ignore
+
+# A topic page cut down from Content/Algorithms/Brute Force/Bubble Sort.html, with one problem per rule;
+# the id and the draft link inside <script> are templates and must not count
+PAGE = (
+    '<!DOCTYPE html>\n'
+    '<html lang="en">\n'
+    '<head>\n'
+    '  <title>Bubble Sort</title>\n'
+    '  <script>const tpl = \'<div id="box"></div><a href="?path=Algorithms/Sorting DRAFT">\';</script>\n'
+    '</head>\n'
+    '<body>\n'
+    '<h1>Bubble Sort</h1>\n'
+    '<section id="problem-solved" section-title="Problem Solved">\n'
+    '  <h2>Problem Solved</h2>\n'
+    '  <p id="box">Bubble Sort solves the Sorting problem.</p>\n'
+    '</section>\n'
+    '<section id="design-and-strategy" section-title="Design and Strategy">\n'
+    '  <h2>Design and Strategy</h2>\n'
+    '  <section id="demo" section-title="Interactive Demo">\n'
+    '    <div class="embeddedDemoContainer"><iframe class="embeddedDemo" src="/Algorithms/Content/Demos/Brute Force/Bubble Sort Demo.html"></iframe></div>\n'
+    '  </section>\n'
+    '  <p>See <a href="?path=Algorithms/Brute Force/Selection Sort DRAFT">Selection Sort</a>.</p>\n'
+    '  <div class="embeddedDemoContainer"><iframe class="embeddedDemo" src="/Algorithms/Content/Demos/Brute Force/Bubble Sort Demo.html"></iframe></div>\n'
+    '</section>\n'
+    '<section id="box">\n'
+    '  <p>Untitled.</p>\n'
+    '</section>\n'
+    '<section id="problem-solved-2" section-title="Problem Solved">\n'
+    '  <h2>Problem Solved</h2>\n'
+    '</section>\n'
+    '<div class="embeddedDemoContainer"><iframe class="embeddedDemo" src="/Algorithms/Content/Demos/Brute Force/Bubble Sort Demo.html"></iframe></div>\n'
+    '</body>\n'
+    '</html>\n'
+)
+PAGE_REL = 'Algorithms/Brute Force/Bubble Sort.html'
+
+def finding(rule, severity, message, line, column):
+    return {'rule': rule, 'severity': severity, 'message': message, 'line': line, 'column': column}
+
+EXPECTED = [
+    finding('nested-canonical', 'warning', "Nested canonical section: 'Interactive Demo' at depth 2", 15, 3),
+    finding('draft-leak', 'error', 'Link to draft page: ?path=Algorithms/Brute Force/Selection Sort DRAFT', 18, 19),
+    finding('demo-placement', 'warning', "Trailing demo inside 'Design and Strategy'", 19, 3),
+    finding('missing-section-title', 'warning', '<section id="box"> has no section-title', 21, 1),
+    finding('duplicate-id', 'error', "Duplicate id 'box' (first used on line 11)", 21, 1),
+    finding('canonical-order', 'warning', "'Problem Solved' should come before 'Design and Strategy'", 24, 1),
+    finding('demo-placement', 'warning', 'Standalone demo (outside any section)', 27, 1),
+]
+
+CONTENT_PAGES = sorted(glob.glob(os.path.join(ROOT, 'Content', '**', '*.html'), recursive=True))
+
+def test_every_rule_reports_in_document_order():
+    assert lint.lint_html(PAGE, PAGE_REL) == EXPECTED
+    # A second run over the same text finds the same thing
+    assert lint.lint_html(PAGE, PAGE_REL) == EXPECTED
+
+def test_rule_selection_and_page_kinds():
+    assert lint.lint_html(PAGE, PAGE_REL, ('duplicate-id',)) == [f for f in EXPECTED if f['rule'] == 'duplicate-id']
+    # Problems pages skip the topic-page rules and their bare sections are expected
+    assert lint.lint_html(PAGE, 'Problems/Foundational/Sorting.html') == [
+        f for f in EXPECTED if f['rule'] in ('draft-leak', 'duplicate-id')]
+    # Drafts may link to drafts
+    assert 'draft-leak' not in {f['rule'] for f in lint.lint_html(PAGE, 'Algorithms/Brute Force/Bubble Sort DRAFT.html')}
+
+def test_report_groups_nested_canonical_first():
+    assert rdsi.analyze(PAGE) == [
+        "Nested canonical section: 'Interactive Demo' at depth 2",
+        "Trailing demo inside 'Design and Strategy'",
+        'Standalone demo (outside any section)',
+    ]
+
+def test_cli_formats_and_exit_status(tmp_path):
+    page = tmp_path / 'Bubble Sort.html'
+    page.write_text(PAGE, encoding='utf-8')
+    out = tmp_path / 'report.json'
+    assert lint.main(['--no-cache', '--format', 'json', '--output', str(out), str(page)]) == 1
+    report = json.loads(out.read_text(encoding='utf-8'))
+    assert [{k: v for k, v in f.items() if k != 'file'} for f in report] == EXPECTED
+    sarif = tmp_path / 'report.sarif'
+    assert lint.main(['--no-cache', '--format', 'sarif', '--output', str(sarif), '--fail-on', 'never', str(page)]) == 0
+    run = json.loads(sarif.read_text(encoding='utf-8'))['runs'][0]
+    assert [r['ruleId'] for r in run['results']] == [f['rule'] for f in EXPECTED]
+    assert lint.main(['--no-cache', '--output', str(out), '--disable', 'duplicate-id,draft-leak', str(page)]) == 0
+
+@pytest.mark.parametrize('path', CONTENT_PAGES, ids=lambda p: os.path.relpath(p, ROOT))
+def test_content_findings_are_repeatable_and_located(path):
+    rel = os.path.relpath(path, os.path.join(ROOT, 'Content')).replace(os.sep, '/')
+    html = lint.acs.read_text_best_effort(path)
+    findings = lint.lint_html(html, rel)
+    assert lint.lint_html(html, rel) == findings
+    lines = html.split('\n')
+    for f in findings:
+        assert 1 <= f['line'] <= len(lines) and 1 <= f['column'] <= len(lines[f['line'] - 1]) + 1